@@ -0,0 +1,167 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+from src.metrics import metrics
+from src.logger import logger
+
+INDEX_NAME = "urls.jsonl"
+HASH_CHUNK = 64 * 1024
+
+class AssetStore:
+    """
+    Library-wide content-addressed image store under `<output>/.assets`.
+    Each distinct payload is kept once as `<sha256[:2]>/<sha256>`; articles'
+    assets/ files are hardlinks to it (copies where the filesystem has no
+    hardlinks). `urls.jsonl` maps every downloaded URL to its blob, so an image
+    seen by any earlier article is linked in without a network request.
+    Safe to share between threads and between shard processes.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_NAME)
+        self._urls: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    continue
+                self._urls[entry['url']] = entry['blob']
+        logger.debug(f"Asset store: {len(self._urls)} URLs indexed in {self.root}")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _link(blob: str, dest: str):
+        """Points dest at blob, replacing whatever dest was."""
+        temp_path = dest + ".link"
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        try:
+            os.link(blob, temp_path)
+        except OSError:
+            # No hardlinks here (FAT, some network mounts, other device): fall back to a copy
+            shutil.copyfile(blob, temp_path)
+        os.replace(temp_path, dest)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Blob path holding this URL's bytes, or None if it was never stored (or was pruned)."""
+        with self._lock:
+            digest = self._urls.get(url)
+            if digest is None:
+                return None
+            blob = self._blob_path(digest)
+            if os.path.exists(blob):
+                return blob
+            del self._urls[url]
+        return None
+
+    def link_url(self, url: str, dest: str) -> bool:
+        """Materializes a stored URL at dest; False when it has to be downloaded."""
+        blob = self.lookup(url)
+        if blob is None:
+            return False
+        try:
+            self._link(blob, dest)
+        except OSError as e:
+            logger.debug(f"Asset store link failed for {url}: {e}")
+            return False
+        metrics.incr("assets.store_hits")
+        metrics.incr("assets.store_hit_bytes", os.path.getsize(dest))
+        return True
+
+    def adopt(self, url: str, path: str) -> str:
+        """
+        Moves a freshly written asset into the store: path becomes a link to the
+        blob of its bytes (an existing blob when another URL had the same bytes)
+        and the URL is indexed. Returns the blob path.
+        """
+        digest = self._hash_file(path)
+        blob = self._blob_path(digest)
+        with self._lock:
+            if os.path.exists(blob):
+                if not os.path.samefile(blob, path):
+                    self._link(blob, path)
+                    metrics.incr("assets.store_deduped")
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                try:
+                    os.link(path, blob)
+                except FileExistsError:
+                    # Another shard stored the same bytes first
+                    self._link(blob, path)
+                except OSError:
+                    shutil.copyfile(path, blob)
+            if self._urls.get(url) != digest:
+                self._urls[url] = digest
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'url': url, 'blob': digest}) + "\n")
+        return blob
+
+    def _links_supported(self) -> bool:
+        probe = os.path.join(self.root, ".probe")
+        try:
+            with open(probe, 'wb'):
+                pass
+            os.link(probe, probe + ".link")
+            os.remove(probe + ".link")
+            return True
+        except OSError:
+            return False
+        finally:
+            if os.path.exists(probe):
+                os.remove(probe)
+
+    def prune(self) -> Tuple[int, int]:
+        """
+        Deletes blobs no article links to any more (link count 1) and drops their
+        URLs from the index. Returns (blobs removed, bytes freed). Skipped where
+        hardlinks are unavailable, since copies cannot be traced back.
+        """
+        if not self._links_supported():
+            logger.warning(f"Asset store: hardlinks unsupported in {self.root}; not pruning")
+            return 0, 0
+        removed = freed = 0
+        with self._lock:
+            for entry in os.scandir(self.root):
+                if not entry.is_dir():
+                    continue
+                for blob in os.scandir(entry.path):
+                    stat = blob.stat()
+                    if stat.st_nlink == 1:
+                        os.remove(blob.path)
+                        removed += 1
+                        freed += stat.st_size
+            if removed:
+                self._urls = {url: digest for url, digest in self._urls.items()
+                              if os.path.exists(self._blob_path(digest))}
+                self._rewrite_index()
+        return removed, freed
+
+    def _rewrite_index(self):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for url, digest in self._urls.items():
+                f.write(json.dumps({'url': url, 'blob': digest}) + "\n")
+        os.replace(temp_path, self.index_path)
@@ -0,0 +1,268 @@
+import os
+import asyncio
+from typing import Optional, List
+from playwright.async_api import async_playwright, Page
+
+from src.main import XDownloader
+from src.utils import load_cookies, async_safe_navigate
+from src.logger import logger
+from src.config import Config
+from src.exporter import Exporter
+from src.models import DownloadResult
+from src.browser import launch_options, context_options, context_cookies
+from src.network import RouteFilter, AssetCapture, DataCapture, AssetClient, track_response_bytes
+from src.metrics import metrics
+from src.rate_limiter import rate_limiter
+from src.scroller import scroll_page_async, ArticleHarvest
+from src.exceptions import NavigationTimeoutError, ExtractionError
+
+class AsyncXDownloader(XDownloader):
+    """
+    Download engine on Playwright's async API.
+    Keeps many pages in flight from a single thread: navigation and scrolling are
+    awaited, while CPU-bound parsing and blocking file/HTTP work run in worker
+    threads. Plugins, extractors and RecordManager are shared with XDownloader.
+    """
+    def __init__(self, output_root: str, save_markdown: bool = True, pdf_export: bool = False, epub_export: bool = False):
+        super().__init__(output_root, save_markdown, pdf_export, epub_export)
+        # Created lazily inside the running loop
+        self._asset_semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_asset_semaphore(self) -> asyncio.Semaphore:
+        if self._asset_semaphore is None:
+            self._asset_semaphore = asyncio.Semaphore(Config.MAX_WORKERS)
+        return self._asset_semaphore
+
+    async def _prepare_page(self, page: Page, plugin):
+        key = page
+        if self._prepared_pages.get(key) == plugin.name:
+            return
+        if key in self._prepared_pages:
+            await page.unroute("**/*")
+        else:
+            page.on("close", self._forget_page)
+            page.on("response", track_response_bytes)
+            if Config.ASSET_CAPTURE:
+                self._captures[key] = AssetCapture(Config.ASSET_CAPTURE_HOSTS)
+                page.on("response", self._captures[key].on_response)
+            if Config.EXTRACTION_SOURCE == "data":
+                self._data_captures[key] = DataCapture(plugin.is_data_response)
+                page.on("response", self._data_captures[key].on_response)
+        if key in self._data_captures:
+            self._data_captures[key].accepts = plugin.is_data_response
+        route_filter = RouteFilter.from_rules(plugin.get_route_filter_rules())
+        if route_filter.enabled:
+            await page.route("**/*", route_filter.handle_async)
+        self._prepared_pages[key] = plugin.name
+
+    async def _navigate(self, page: Page, url: str, timeout: int, plugin):
+        await self._prepare_page(page, plugin)
+        self._reset_capture(page)
+        await asyncio.sleep(rate_limiter.reserve(url))
+        try:
+            with metrics.span("navigate", url):
+                response = await async_safe_navigate(page, url, timeout, plugin.get_wait_selector())
+        except Exception as e:
+            if self._is_navigation_timeout(e):
+                raise NavigationTimeoutError(f"Network Timeout: {str(e)}")
+            raise self._navigation_error(e, await page.content(), url)
+        self._report_navigation(url, response)
+
+    async def _scroll(self, page: Page, url: str, scroll_count: int, plugin) -> Optional[List[str]]:
+        if scroll_count <= 0:
+            return None
+        script = self._harvest_script(url, plugin)
+        harvest = ArticleHarvest()
+
+        async def snapshot():
+            try:
+                harvest.add(await page.evaluate(*script))
+            except Exception as e:
+                logger.debug(f"Article harvest failed: {e}", extra={"url": url})
+
+        with metrics.span("scroll", url):
+            if script:
+                await snapshot()
+            stats = await scroll_page_async(page, scroll_count, plugin.get_wait_selector(), self.scroll_mode,
+                                            on_step=snapshot if script else None,
+                                            done_script=plugin.get_scroll_done_script(url))
+        self._log_scroll(url, stats)
+        return self._harvested(harvest, url)
+
+    async def _extract_from_data(self, page: Page, url: str, plugin):
+        responses = self._data_responses(page)
+        if not responses:
+            return None
+        with metrics.span("api_data", url) as span:
+            payloads = []
+            for response in responses:
+                try:
+                    payloads.append(await response.body())
+                except Exception as e:
+                    logger.debug(f"API response body unavailable: {e}", extra={"url": url})
+            span.bytes = sum(len(p) for p in payloads)
+            return await asyncio.to_thread(self._build_data_extractor, plugin, payloads, url)
+
+    async def _navigate_and_extract(self, page: Page, url: str, scroll_count: int, timeout: int, plugin):
+        await self._navigate(page, url, timeout, plugin)
+        extractor = await self._extract_from_data(page, url, plugin)
+        if extractor is not None:
+            return extractor
+        harvested = await self._scroll(page, url, scroll_count, plugin)
+        return await self._extract_content(page, url, plugin, harvested)
+
+    async def _page_html(self, page: Page, url: str, plugin) -> str:
+        script = self._extraction_script(url, plugin)
+        if script:
+            try:
+                html = await page.evaluate(*script)
+            except Exception as e:
+                logger.debug(f"In-browser extraction failed: {e}", extra={"url": url})
+                html = None
+            if self._accept_extracted(html, url):
+                return html
+        return await page.content()
+
+    async def _extract_content(self, page: Page, url: str, plugin, harvested: Optional[List[str]] = None):
+        with metrics.span("page_content", url) as span:
+            html_content = await self._page_html(page, url, plugin)
+            span.bytes = len(html_content)
+        with metrics.span("parse", url):
+            extractor = await asyncio.to_thread(self._build_extractor, plugin, html_content, url, harvested)
+        if not extractor.is_valid():
+            raise ExtractionError("No article content found")
+        return extractor
+
+    async def _fetch_image(self, jar, src: str, path: str) -> bool:
+        async with self._get_asset_semaphore():
+            try:
+                if await asyncio.to_thread(self._download_task, self.asset_client, src, path, jar):
+                    metrics.add_span_bytes(os.path.getsize(path))
+                    return True
+            except Exception as exc:
+                logger.warning(f"Image failed: {src}. Error: {exc}")
+            return False
+
+    async def _take_captured_images(self, page: Page, download_tasks: list):
+        capture = self._captures.get(page)
+        if not capture:
+            return [], download_tasks
+        written, remaining = [], []
+        for img, src, path in download_tasks:
+            response = capture.lookup(src)
+            try:
+                body = await response.body() if response is not None else None
+                ok = await asyncio.to_thread(self._write_captured, body, path)
+            except Exception as e:
+                logger.debug(f"Captured body unavailable for {src}: {e}")
+                ok = False
+            (written if ok else remaining).append((img, src, path))
+        return written, remaining
+
+    async def _handle_images(self, page: Page, extractor, article_dir: str):
+        soup, download_tasks = await asyncio.to_thread(self._plan_image_downloads, extractor, article_dir)
+        written, download_tasks = await self._take_captured_images(page, download_tasks)
+
+        if download_tasks:
+            logger.info(f"Downloading {len(download_tasks)} images...")
+            metrics.incr("assets.http", len(download_tasks))
+            jar = AssetClient.cookie_jar(await page.context.cookies())
+            fetched = await asyncio.gather(*(
+                self._fetch_image(jar, src, path)
+                for _, src, path in download_tasks
+            ))
+            written += [task for task, ok in zip(download_tasks, fetched) if ok]
+            self.asset_client.report_stats()
+
+        await asyncio.to_thread(self._finish_images, written, article_dir)
+        return soup
+
+    async def _export_formats(self, page: Page, article_dir: str, article_meta, html_content: str):
+        assets_dir = os.path.join(article_dir, "assets")
+        if self.pdf_export:
+            with metrics.span("pdf", article_meta.url):
+                await Exporter.to_pdf_async(page, os.path.join(article_dir, f"{article_meta.folder_name}.html"),
+                                            os.path.join(article_dir, f"{article_meta.folder_name}.pdf"))
+        if self.epub_export:
+            with metrics.span("epub", article_meta.url):
+                await asyncio.to_thread(Exporter.to_epub, article_meta.title, article_meta.author, html_content, assets_dir,
+                                        os.path.join(article_dir, f"{article_meta.folder_name}.epub"))
+
+    async def process_url(self, page: Page, url: str, scroll_count: int, timeout: int, force: bool = False) -> Optional[DownloadResult]:
+        """Coroutine version of XDownloader.process_url with the same error taxonomy."""
+        if not force and self.record_manager.is_downloaded(url):
+            logger.info(f"⏭️  Skipping already downloaded: {url}")
+            return None
+
+        logger.info(f"Processing URL: {url}")
+
+        try:
+            plugin = self._get_plugin(url)
+            extractor = await self._navigate_and_extract(page, url, scroll_count, timeout, plugin)
+
+            with metrics.span("metadata", url):
+                article_meta = await asyncio.to_thread(extractor.extract_metadata_obj)
+            article_dir = os.path.join(self.output_root, article_meta.folder_name)
+
+            with metrics.span("images", url):
+                final_soup = await self._handle_images(page, extractor, article_dir)
+            html_content = await asyncio.to_thread(self._save_assets, article_dir, article_meta, final_soup, url)
+            await self._export_formats(page, article_dir, article_meta, html_content)
+
+            with metrics.span("finalize", url):
+                await asyncio.to_thread(self._finalize_success, article_dir, article_meta)
+            return None
+        except Exception as e:
+            return await asyncio.to_thread(self._handle_failure, url, e)
+
+    async def _page_worker(self, page: Page, args, url_queue: asyncio.Queue, failures: list):
+        """Drains the shared queue through one page."""
+        while True:
+            try:
+                url = url_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                result = await self.process_url(page, url, args.scroll, args.timeout, args.force)
+                if result:
+                    failures.append(result.__dict__)
+            except Exception as e:
+                logger.error(f"Unexpected error processing {url}: {e}")
+
+    async def run(self, args, urls_to_process: List[str]) -> list:
+        """
+        Processes URLs with `contexts` isolated contexts, each keeping up to
+        `pages_per_context` pages in flight. Returns the failures.
+        """
+        failures = []
+        url_queue: asyncio.Queue = asyncio.Queue()
+        for url in urls_to_process:
+            url_queue.put_nowait(url)
+
+        cookies = load_cookies(args.cookies)
+        num_contexts = max(1, getattr(args, "contexts", 1) or 1)
+        pages_per_context = max(1, getattr(args, "pages_per_context", Config.PAGES_PER_CONTEXT) or 1)
+        # Never open more pages than there are URLs
+        total_pages = min(num_contexts * pages_per_context, len(urls_to_process))
+
+        async with async_playwright() as p:
+            logger.info(f"Launching Chromium (Headless: {args.headless}, async engine, {total_pages} pages)")
+            browser = await p.chromium.launch(**launch_options(args.headless))
+            try:
+                workers = []
+                for i in range(num_contexts):
+                    if len(workers) >= total_pages:
+                        break
+                    context = await browser.new_context(**context_options())
+                    if cookies:
+                        await context.add_cookies(context_cookies(cookies))
+                    for _ in range(pages_per_context):
+                        if len(workers) >= total_pages:
+                            break
+                        page = await context.new_page()
+                        workers.append(self._page_worker(page, args, url_queue, failures))
+                await asyncio.gather(*workers)
+            finally:
+                await browser.close()
+
+        return failures
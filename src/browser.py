@@ -0,0 +1,19 @@
+from src.config import Config
+
+# Shared browser setup used by both the sync and async download engines.
+VIEWPORT = {"width": 1280, "height": 1080}
+
+def launch_options(headless: bool) -> dict:
+    """Keyword arguments for chromium.launch (headless flag + configured proxy)."""
+    options = {"headless": headless}
+    if Config.PROXY:
+        options["proxy"] = {"server": Config.PROXY}
+    return options
+
+def context_options() -> dict:
+    """Keyword arguments for browser.new_context."""
+    return {"viewport": VIEWPORT, "user_agent": Config.USER_AGENT}
+
+def context_cookies(cookies: list) -> list:
+    """Filters the loaded cookie set before it is added to a context."""
+    return [c for c in cookies if c.get('name') != 'lang']
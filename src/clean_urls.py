@@ -2,12 +2,20 @@ import os
 import argparse
 import sys
 
+# Add project root to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.plugin_manager import canonical_key
+
 def deduplicate_urls(file_path):
     if not os.path.exists(file_path):
         print(f"Error: File '{file_path}' not found.")
         return
 
-    seen_urls = set()
+    seen_keys = set()
     unique_lines = []
     removed_count = 0
 
@@ -21,11 +29,11 @@ def deduplicate_urls(file_path):
             unique_lines.append(line)
             continue
         
-        # Normalize URL for comparison (strip quotes/spaces)
-        url_norm = stripped.strip('"\'“”')
+        # Compare by canonical key: twitter.com/x.com, ?s=20 and /photo/1 variants are one item
+        key = canonical_key(stripped)
         
-        if url_norm not in seen_urls:
-            seen_urls.add(url_norm)
+        if key not in seen_keys:
+            seen_keys.add(key)
             unique_lines.append(line)
         else:
             removed_count += 1
@@ -38,7 +46,7 @@ def deduplicate_urls(file_path):
         print(f"No duplicates found in {file_path}.")
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Deduplicate URLs in a text file while preserving order and comments.")
+    parser = argparse.ArgumentParser(description="Deduplicate URLs (by canonical key) in a text file while preserving order and comments.")
     parser.add_argument("file", nargs="?", default="input/urls.txt", help="Path to the urls file (default: input/urls.txt)")
     args = parser.parse_args()
     
@@ -23,11 +23,68 @@ class ConfigLoader:
                 "scroll_count": 5,
                 "headless": True,
                 "max_workers": 8,
+                "contexts": 1,
+                "engine": "sync",
+                "shards": 1,
+                "pages_per_context": 4,
                 "items_per_page": 20,
                 "max_filename_length": 64,
                 "max_topic_length": 40,
                 "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             },
+            "scroll": {
+                "mode": "adaptive",
+                "max_steps": 20,
+                "time_budget": 20,
+                "stable_rounds": 2,
+                "settle_timeout": 1.5,
+                "poll_interval": 0.25,
+                "harvest": False
+            },
+            "rate_limits": {
+                "x.com": {"rate": 1.0, "burst": 3, "min_rate": 0.1, "max_rate": 3.0},
+                "twitter.com": {"rate": 1.0, "burst": 3, "min_rate": 0.1, "max_rate": 3.0},
+                "pbs.twimg.com": {"rate": 20.0, "burst": 20, "min_rate": 2.0, "max_rate": 50.0},
+                "video.twimg.com": {"rate": 2.0, "burst": 4, "min_rate": 0.2, "max_rate": 8.0}
+            },
+            "records": {
+                "backend": "sqlite",
+                "export_csv": True,
+                "fsync_batch": 20,
+                "fsync_interval": 1.0,
+                "compact_every": 1000
+            },
+            "pipeline": {
+                "enabled": False,
+                "workers": 2,
+                "depth": 8
+            },
+            "assets": {
+                "capture": True,
+                "capture_hosts": ["pbs.twimg.com"],
+                "store": True,
+                "store_dir": ".assets",
+                "dns_cache_ttl": 300,
+                "dns_negative_ttl": 30
+            },
+            "images": {
+                "recompress": False,
+                "format": "",
+                "quality": 80,
+                "max_dimension": 0,
+                "workers": 2
+            },
+            "network": {
+                "x_com": {
+                    "resource_types": ["media", "font"],
+                    "url_patterns": []
+                }
+            },
+            "extraction": {
+                "parser": "lxml",
+                "mode": "soup",
+                "source": "dom"
+            },
             "selectors": {
                 "x_com": {
                     "article": "article",
@@ -87,12 +144,60 @@ class Config:
     DEFAULT_SCROLL_COUNT = _loader.get("app.scroll_count")
     HEADLESS = _loader.get("app.headless")
     MAX_WORKERS = _loader.get("app.max_workers")
+    CONTEXTS = _loader.get("app.contexts")
+    ENGINE = _loader.get("app.engine")
+    SHARDS = _loader.get("app.shards")
+    PAGES_PER_CONTEXT = _loader.get("app.pages_per_context")
     ITEMS_PER_PAGE = _loader.get("app.items_per_page")
     MAX_FILENAME_LENGTH = _loader.get("app.max_filename_length")
     MAX_TOPIC_LENGTH = _loader.get("app.max_topic_length")
     USER_AGENT = _loader.get("app.user_agent")
     PROXY = _loader.get("app.proxy")
 
+    # Per-host rate limits
+    RATE_LIMITS = _loader.get("rate_limits")
+
+    # Record store
+    RECORDS_BACKEND = _loader.get("records.backend")
+    RECORDS_EXPORT_CSV = _loader.get("records.export_csv")
+    RECORDS_FSYNC_BATCH = _loader.get("records.fsync_batch")
+    RECORDS_FSYNC_INTERVAL = _loader.get("records.fsync_interval")
+    RECORDS_COMPACT_EVERY = _loader.get("records.compact_every")
+
+    # Post-processing pipeline
+    PIPELINE_ENABLED = _loader.get("pipeline.enabled")
+    PIPELINE_WORKERS = _loader.get("pipeline.workers")
+    PIPELINE_DEPTH = _loader.get("pipeline.depth")
+
+    # Assets
+    ASSET_CAPTURE = _loader.get("assets.capture")
+    ASSET_CAPTURE_HOSTS = _loader.get("assets.capture_hosts")
+    ASSET_STORE = _loader.get("assets.store")
+    ASSET_STORE_DIR = _loader.get("assets.store_dir")
+    DNS_CACHE_TTL = _loader.get("assets.dns_cache_ttl")
+    DNS_NEGATIVE_TTL = _loader.get("assets.dns_negative_ttl")
+
+    # Image post-processing
+    IMAGE_RECOMPRESS = _loader.get("images.recompress")
+    IMAGE_FORMAT = _loader.get("images.format")
+    IMAGE_QUALITY = _loader.get("images.quality")
+    IMAGE_MAX_DIMENSION = _loader.get("images.max_dimension")
+    IMAGE_WORKERS = _loader.get("images.workers")
+
+    # Extraction
+    HTML_PARSER = _loader.get("extraction.parser")
+    EXTRACTION_MODE = _loader.get("extraction.mode")
+    EXTRACTION_SOURCE = _loader.get("extraction.source")
+
+    # Scrolling
+    SCROLL_MODE = _loader.get("scroll.mode")
+    SCROLL_MAX_STEPS = _loader.get("scroll.max_steps")
+    SCROLL_TIME_BUDGET = _loader.get("scroll.time_budget")
+    SCROLL_STABLE_ROUNDS = _loader.get("scroll.stable_rounds")
+    SCROLL_SETTLE_TIMEOUT = _loader.get("scroll.settle_timeout")
+    SCROLL_POLL_INTERVAL = _loader.get("scroll.poll_interval")
+    SCROLL_HARVEST = _loader.get("scroll.harvest")
+
     # Selectors
     class Selectors:
         _x = _loader.get("selectors.x_com")
@@ -2,8 +2,10 @@ import os
 import uuid
 from bs4 import BeautifulSoup
 from playwright.sync_api import Page
+from playwright.async_api import Page as AsyncPage
 from ebooklib import epub
 from .logger import logger
+from .media import SNIFF_BYTES, media_type_for, sniff_image_type
 
 class Exporter:
     @staticmethod
@@ -34,6 +36,27 @@ class Exporter:
             logger.error(f"PDF generation failed: {e}")
             return False
 
+    @staticmethod
+    async def to_pdf_async(page: AsyncPage, local_html_path: str, output_pdf_path: str):
+        """
+        Async-engine variant of to_pdf.
+        """
+        try:
+            file_uri = f"file://{os.path.abspath(local_html_path)}"
+            logger.info(f"Generating PDF: {output_pdf_path}")
+
+            await page.goto(file_uri, wait_until="networkidle")
+            await page.pdf(
+                path=output_pdf_path,
+                format="A4",
+                margin={"top": "20px", "bottom": "20px", "left": "20px", "right": "20px"},
+                print_background=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"PDF generation failed: {e}")
+            return False
+
     @staticmethod
     def to_epub(title: str, author: str, html_content: str, assets_dir: str, output_epub_path: str):
         """
@@ -78,7 +101,7 @@ class Exporter:
                     epub_img = epub.EpubImage()
                     epub_img.uid = filename
                     epub_img.file_name = epub_img_path
-                    epub_img.media_type = 'image/jpeg' # Assuming JPG for now based on downloader
+                    epub_img.media_type = sniff_image_type(img_content[:SNIFF_BYTES]) or media_type_for(filename)
                     epub_img.content = img_content
                     
                     book.add_item(epub_img)
@@ -1,12 +1,21 @@
 import os
+import sys
 import json
 import shutil
 from collections import defaultdict
 from datetime import datetime
 import argparse
 
+# Add project root to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.plugin_manager import canonical_key
+
 def find_duplicates(output_dir="output", delete=False):
-    # Dictionary to store entries: url -> list of {path, time, folder_name}
+    # Dictionary to store entries: canonical key -> list of {path, time, folder_name, url}
     records = defaultdict(list)
     
     print(f"Scanning {output_dir} for duplicates...")
@@ -37,9 +46,11 @@ def find_duplicates(output_dir="output", delete=False):
                             timestamp = entry.stat().st_mtime
                         
                         if url:
-                            records[url].append({
+                            # Same key = same item, whichever URL variant downloaded it
+                            records[canonical_key(url)].append({
                                 'path': entry.path,
                                 'folder': entry.name,
+                                'url': url,
                                 'time': timestamp,
                                 'time_str': dl_time_str or "Unknown"
                             })
@@ -53,7 +64,7 @@ def find_duplicates(output_dir="output", delete=False):
     duplicates_found = 0
     bytes_saved = 0
     
-    for url, entries in records.items():
+    for key, entries in records.items():
         if len(entries) > 1:
             duplicates_found += 1
             # Sort by time descending (Keep the newest)
@@ -62,7 +73,7 @@ def find_duplicates(output_dir="output", delete=False):
             keep = entries[0]
             remove_list = entries[1:]
             
-            print(f"\n🔗 Duplicate URL: {url}")
+            print(f"\n🔗 Duplicate item: {key} ({keep['url']})")
             print(f"   ✅ KEEP: {keep['folder']} (Time: {keep['time_str']})")
             
             for item in remove_list:
@@ -96,7 +107,7 @@ def find_duplicates(output_dir="output", delete=False):
             print(f"Cleanup complete. Reclaimed approx {bytes_saved / 1024 / 1024:.2f} MB.")
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Find and remove duplicate articles based on URL in meta.json")
+    parser = argparse.ArgumentParser(description="Find and remove duplicate articles based on the canonical key of the URL in meta.json")
     parser.add_argument("--delete", action="store_true", help="Actually delete the duplicate folders (default is dry-run)")
     args = parser.parse_args()
     
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import sys
+import time
 import argparse
 import json
 from datetime import datetime
@@ -11,7 +12,10 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from src.record_manager import RecordManager
+from src.record_manager import open_record_manager, SQLiteRecordQuery
+from src.plugin_manager import canonical_key
+from src.asset_store import AssetStore
+from src.config import Config
 from src.indexer import IndexGenerator
 from src.logger import logger
 
@@ -34,7 +38,7 @@ def get_real_html_path(folder_path):
 def cmd_sync(args):
     """Scans output directory and updates records.csv efficiently."""
     output_root = args.output
-    manager = RecordManager(args.csv)
+    manager = open_record_manager(args.csv)
     
     print(f"🔍 Scanning {output_root} for meta.json files...")
     
@@ -73,7 +77,7 @@ def cmd_sync(args):
     
     for url in to_remove:
         print(f"   Removing orphan: {url}")
-        del manager._records[url]
+        manager.remove_record(url)
         changes_made = True
     
     if changes_made:
@@ -99,23 +103,62 @@ def cmd_sync(args):
             if changes_made: manager._commit()
         except: pass
 
+    # Images only deleted articles linked to
+    store_dir = os.path.join(output_root, Config.ASSET_STORE_DIR)
+    if os.path.isdir(store_dir):
+        removed, freed = AssetStore(store_dir).prune()
+        if removed:
+            print(f"🧹 Pruned {removed} unused images from the asset store ({freed / 1024 / 1024:.2f} MB).")
+
     # Always trigger index regeneration
     print("📊 Regenerating index.html...")
     IndexGenerator(output_root).generate(records=manager.get_all_records())
+    manager.close()
     print("✨ Sync complete.")
 
 def cmd_stats(args):
-    manager = RecordManager(args.csv)
+    manager = open_record_manager(args.csv)
     s = manager.get_stats()
     print(f"\n📊 Stats: Total {s['total']} | Success {s['success']} | Failed {s['failed']}")
 
 def cmd_export(args):
-    manager = RecordManager(args.csv)
-    filtered = [r['url'] for r in manager._records.values() if not args.status or r['status'] == args.status]
+    manager = open_record_manager(args.csv)
+    filtered = [r['url'] for r in manager.query(status=args.status)]
     with open(args.file, 'w', encoding='utf-8') as f:
         for url in filtered: f.write(f"{url}\n")
     print(f"✅ Exported {len(filtered)} URLs to {args.file}")
 
+def cmd_query(args):
+    """
+    Filters records through the store's indexes; prints a page of rows or
+    grouped counts. With the sqlite backend the query runs as SQL on
+    records.db, without loading the store. The reported time includes opening it.
+    """
+    started = time.perf_counter()
+    manager = (SQLiteRecordQuery.open(args.csv) if Config.RECORDS_BACKEND == "sqlite" else None) \
+        or open_record_manager(args.csv)
+    filters = dict(status=args.status, author=args.author, source=args.source, tweet_id=args.tweet_id,
+                   key=canonical_key(args.url) if args.url else None, since=args.since, until=args.until)
+    if args.count_by:
+        result = sorted(manager.count_by(args.count_by, **filters).items(), key=lambda kv: -kv[1])
+        elapsed = (time.perf_counter() - started) * 1000
+        for value, count in result:
+            print(f"{count:>8}  {value or '(empty)'}")
+        print(f"\n{len(result)} groups in {elapsed:.1f} ms")
+        return
+
+    total = manager.count(**filters)
+    offset = (args.page - 1) * args.limit
+    rows = manager.query(order_by=args.order_by, descending=not args.asc, offset=offset, limit=args.limit, **filters)
+    elapsed = (time.perf_counter() - started) * 1000
+    if args.json:
+        print(json.dumps([dict(r) for r in rows], ensure_ascii=False, indent=2))
+    else:
+        for r in rows:
+            print(f"{r['published_date']:<10}  {r['status']:<7}  @{r['author']:<16}  {r['title'][:60]}  {r['url']}")
+    pages = max(1, -(-total // args.limit))
+    print(f"\nPage {args.page}/{pages} ({len(rows)} of {total} matches) in {elapsed:.1f} ms")
+
 def main():
     parser = argparse.ArgumentParser(description="Helper tool for X-Downloader.")
     parser.add_argument("--csv", default="output/records.csv", help="Database CSV path")
@@ -130,10 +173,27 @@ def main():
     p_exp.add_argument("--status", choices=['success', 'failed'])
     p_exp.add_argument("file", nargs="?", default="exported_urls.txt")
     
+    p_query = sub.add_parser("query", help="Query records by indexed fields")
+    p_query.add_argument("--status", choices=['success', 'failed'])
+    p_query.add_argument("--author", help="Author handle without @")
+    p_query.add_argument("--source", help="Record source (cli, sync_scan, ...)")
+    p_query.add_argument("--tweet-id", help="Status ID from the URL")
+    p_query.add_argument("--url", help="Any URL of the item (matched by canonical key, e.g. twitter.com or ?s=20 variants)")
+    p_query.add_argument("--since", help="Published on or after (YYYY-MM-DD)")
+    p_query.add_argument("--until", help="Published on or before (YYYY-MM-DD)")
+    p_query.add_argument("--count-by", choices=['status', 'author', 'source', 'published_date'],
+                         help="Print counts grouped by this field instead of rows")
+    p_query.add_argument("--order-by", default="timestamp", help="Sort field (default: timestamp, newest first)")
+    p_query.add_argument("--asc", action="store_true", help="Sort ascending")
+    p_query.add_argument("--limit", type=int, default=20, help="Rows per page")
+    p_query.add_argument("--page", type=int, default=1, help="Page number (1-based)")
+    p_query.add_argument("--json", action="store_true", help="Print rows as JSON")
+    
     args = parser.parse_args()
     if args.command == "sync": cmd_sync(args)
     elif args.command == "stats": cmd_stats(args)
     elif args.command == "export": cmd_export(args)
+    elif args.command == "query": cmd_query(args)
     else: parser.print_help()
 
 if __name__ == "__main__":
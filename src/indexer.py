@@ -1,5 +1,7 @@
 import os
 import json
+from itertools import chain
+from typing import Iterable, Optional
 from urllib.parse import quote
 from datetime import datetime
 from jinja2 import Environment, FileSystemLoader
@@ -14,33 +16,73 @@ class IndexGenerator:
     def __init__(self, output_root: str, ordered_urls: list = None):
         self.output_root = output_root
         self.ordered_urls = ordered_urls or []
+        # url -> formatted article, kept for incremental updates
+        self._articles = {}
 
-    def generate(self, records: list = None):
+    def generate(self, records: Optional[Iterable] = None):
         """
         Builds index.html. 
-        Uses provided records (from RecordManager memory cache) for fast generation,
+        Uses provided records (from RecordManager memory cache, any iterable) for fast generation,
         or falls back to scanning the disk if no records are provided.
         """
         articles = []
         
+        if records is not None:
+            # Iterators are always truthy; peek to tell "no records" from "some records"
+            records = iter(records)
+            first = next(records, None)
+            records = chain([first], records) if first is not None else None
+
         if records:
             # --- Fast Path: Use provided memory-cached records ---
+            self._articles = {}
             for rec in records:
-                if rec.get('status') != 'success':
-                    continue
-                
-                folder_name = rec.get('folder_name')
-                if not folder_name:
-                    continue
-                
-                # Lightweight Liveness Check: Only check if folder exists, don't read meta.json
-                full_folder_path = os.path.join(self.output_root, folder_name)
-                if os.path.isdir(full_folder_path):
-                    articles.append(self._format_record_for_index(rec))
+                article = self._index_entry(rec)
+                if article:
+                    self._articles[rec.get('url')] = article
+            articles = list(self._articles.values())
         else:
             # --- Legacy/Fallback Path: Scan disk (slow, 800+ IOs) ---
             articles = self._scan_disk_for_articles()
 
+        self._render(articles)
+
+    def update(self, changed_records: list) -> bool:
+        """
+        Incremental refresh for long-lived sessions: applies only the changed
+        records to the cached article list and re-renders if anything moved.
+        Call generate() once first to seed the cache.
+        """
+        changed = False
+        for rec in changed_records:
+            url = rec.get('url')
+            article = self._index_entry(rec)
+            if article:
+                self._articles[url] = article
+                changed = True
+            elif self._articles.pop(url, None) is not None:
+                changed = True
+
+        if changed:
+            self._render(list(self._articles.values()))
+        return changed
+
+    def _index_entry(self, rec: dict):
+        """Returns the formatted article for a successful record whose folder exists, else None."""
+        if rec.get('status') != 'success':
+            return None
+        
+        folder_name = rec.get('folder_name')
+        if not folder_name:
+            return None
+        
+        # Lightweight Liveness Check: Only check if folder exists, don't read meta.json
+        full_folder_path = os.path.join(self.output_root, folder_name)
+        if os.path.isdir(full_folder_path):
+            return self._format_record_for_index(rec)
+        return None
+
+    def _render(self, articles: list):
         # Sort Logic (Initial backend sort)
         # Sort by timestamp (new) or download_time (legacy) descending
         articles.sort(key=lambda x: x.get('timestamp') or x.get('download_time', '0000-00-00'), reverse=True)
@@ -69,12 +111,14 @@ class IndexGenerator:
         except Exception as e:
             print(f"Index generation failed: {e}")
 
-    def _format_record_for_index(self, rec: dict) -> dict:
-        """Normalizes a CSV record for the Jinja2 template using stored paths."""
+    def _format_record_for_index(self, rec) -> dict:
+        """Normalizes a stored record for the Jinja2 template using stored paths."""
         local_path = rec.get('local_path', '')
         
-        # Build article object
-        meta = rec.copy()
+        # Build article object: only what the page renders and sorts on, not a full row copy
+        meta = {field: rec.get(field, '') for field in ('url', 'title', 'author', 'timestamp')}
+        if rec.get('download_time'):
+            meta['download_time'] = rec.get('download_time')
         
         if local_path:
             # path is stored as "folder/file.html", we need to quote each part
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Any
+from urllib.parse import urlparse
+from typing import List, Tuple, Any, Optional
 from bs4 import Tag
 from .models import ArticleMetadata
+from .utils import make_soup
 
 class IExtractor(ABC):
     """
@@ -22,6 +24,14 @@ class IExtractor(ABC):
         """Return the final HTML string to be saved."""
         pass
 
+    def get_clean_soup(self) -> Any:
+        """
+        Return the final document as a parsed tree, whose img tags the
+        downloader relinks before saving. Defaults to parsing get_clean_html();
+        extractors that already hold a tree override it to skip the re-parse.
+        """
+        return make_soup(self.get_clean_html())
+
     @abstractmethod
     def get_content_images(self, soup: Any) -> List[Tuple[Tag, str]]:
         """
@@ -51,6 +61,69 @@ class IPlugin(ABC):
         pass
 
     @abstractmethod
-    def get_extractor(self, html_content: str, url: str) -> IExtractor:
-        """Return an instance of the extractor for this page."""
+    def get_extractor(self, html_content: str, url: str, harvested: Optional[List[str]] = None) -> IExtractor:
+        """
+        Return an instance of the extractor for this page. `harvested` holds the
+        article fragments collected by get_harvest_script while scrolling, in
+        page order; when given they replace the articles of html_content.
+        """
         pass
+
+    def get_route_filter_rules(self) -> dict:
+        """
+        Return request-blocking rules applied while the page loads:
+        {"resource_types": [...], "url_patterns": [...]} (glob patterns).
+        An empty dict disables filtering.
+        """
+        return {}
+
+    def get_extraction_script(self, url: str) -> Optional[Tuple[str, Any]]:
+        """
+        Return (js, arg) for page.evaluate that builds, inside the browser, a
+        minimal HTML document holding only what get_extractor needs, so the
+        whole page never crosses the Playwright pipe. The script returns that
+        HTML string, or null when it cannot find the content (the downloader
+        then falls back to page.content()). None disables in-browser extraction.
+        """
+        return None
+
+    def get_scroll_done_script(self, url: str) -> Optional[Tuple[str, Any]]:
+        """
+        Return (js, arg) for page.evaluate that returns true once the page holds
+        everything worth scrolling for (e.g. a tweet's whole thread); adaptive
+        scrolling then stops without waiting for the page to settle. None: stop
+        only on a stable page, the step cap or the time budget.
+        """
+        return None
+
+    def get_harvest_script(self, url: str) -> Optional[Tuple[str, Any]]:
+        """
+        Return (js, arg) for page.evaluate, run before scrolling and after every
+        scroll step, that returns [[id, html], ...] for content items which
+        appeared since its last call. Pages that unmount items scrolled past
+        (virtualised timelines) then keep everything the user would have seen.
+        None disables harvesting.
+        """
+        return None
+
+    def is_data_response(self, url: str) -> bool:
+        """Return True for API responses (JSON the page is rendered from) that get_data_extractor can read."""
+        return False
+
+    def get_data_extractor(self, payloads: List[bytes], url: str) -> Optional[IExtractor]:
+        """
+        Return an extractor built from the bodies of the captured API
+        responses, or None when they do not hold the page's content (the DOM
+        is scraped then, after scrolling).
+        """
+        return None
+
+    def canonical_key(self, url: str) -> str:
+        """
+        Return a stable key for the content behind the URL, so mirror hosts,
+        tracking parameters and sub-pages of one item dedupe to the same key.
+        Defaults to "<name>:<host><path>" without query or fragment.
+        """
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        return f"{self.name}:{host}{parsed.path.rstrip('/')}"
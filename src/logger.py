@@ -2,6 +2,7 @@ import logging
 import os
 import sys
 import json
+import multiprocessing
 from datetime import datetime
 
 class JsonFormatter(logging.Formatter):
@@ -20,16 +21,22 @@ class JsonFormatter(logging.Formatter):
         # Include extra attributes if available (e.g., passed via extra={...})
         if hasattr(record, "url"):
             log_record["url"] = record.url
+        # Stage timing spans (see Metrics.span)
+        for field in ("stage", "duration_ms", "bytes"):
+            if hasattr(record, field):
+                log_record[field] = getattr(record, field)
             
         return json.dumps(log_record, ensure_ascii=False)
 
-def setup_logger(log_dir="logs", log_level=logging.INFO):
+def setup_logger(log_dir=None, log_level=logging.INFO):
     """
     Configures and returns a logger that outputs to:
     1. Standard text log file (daily rotated)
     2. Console (stdout)
     3. JSONL structured log file (latest run)
+    The directory defaults to $X_DOWNLOADER_LOG_DIR, else ./logs.
     """
+    log_dir = log_dir or os.environ.get("X_DOWNLOADER_LOG_DIR") or "logs"
     # Ensure logs directory exists
     os.makedirs(log_dir, exist_ok=True)
     
@@ -65,12 +72,22 @@ def setup_logger(log_dir="logs", log_level=logging.INFO):
     logger.addHandler(console_handler)
 
     # --- Handler 3: JSONL File (Structured) ---
-    # mode='w' ensures we start fresh each run, easier for parsing 'latest'
-    json_handler = logging.FileHandler(json_log_file, mode='w', encoding="utf-8")
+    # mode='w' ensures we start fresh each run, easier for parsing 'latest'.
+    # Spawned worker processes re-import this module and must not wipe the parent's run.
+    json_mode = 'w' if multiprocessing.parent_process() is None else 'a'
+    json_handler = logging.FileHandler(json_log_file, mode=json_mode, encoding="utf-8")
     json_handler.setFormatter(JsonFormatter())
     logger.addHandler(json_handler)
 
+    # --- Span logger: per-stage timings go to the JSONL file only ---
+    spans = logging.getLogger("x_downloader.spans")
+    spans.setLevel(logging.INFO)
+    spans.propagate = False
+    spans.handlers.clear()
+    spans.addHandler(json_handler)
+
     return logger
 
 # Initialize a default logger instance
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
+span_logger = logging.getLogger("x_downloader.spans")
\ No newline at end of file
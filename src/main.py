@@ -1,16 +1,19 @@
 import os
 import sys
-import time
 import argparse
+import asyncio
 import hashlib
 import json
-import requests
+import queue
+import multiprocessing
+import threading
+import weakref
 from datetime import datetime
-from typing import Optional, List
-from concurrent.futures import ThreadPoolExecutor
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from typing import Optional, List, Callable
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from requests.cookies import RequestsCookieJar
 from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import TimeoutError as AsyncPlaywrightTimeoutError
 from markdownify import markdownify as md
 from bs4 import BeautifulSoup
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -27,69 +30,79 @@ from src.logger import logger
 from src.indexer import IndexGenerator
 from src.config import Config
 from src.exporter import Exporter
-from src.record_manager import RecordManager
+from src.record_manager import open_record_manager
 from src.models import ArticleMetadata, DownloadResult
-from src.plugin_manager import PluginManager
+from src.plugin_manager import PluginManager, canonical_key
+from src.browser import launch_options, context_options, context_cookies
+from src.network import RouteFilter, AssetCapture, DataCapture, AssetClient, track_response_bytes
+from src.metrics import metrics
+from src.scroller import scroll_page, ScrollStats, ArticleHarvest
+from src.pipeline import PostProcessPipeline
+from src.asset_store import AssetStore
+from src.media import fix_extension, recompress, recompression_available
+from src.rate_limiter import rate_limiter
 from src.exceptions import (
     XDownloaderError, NavigationTimeoutError, PlatformBlockedError,
     ExtractionError, PluginNotFoundError
 )
 
 class XDownloader:
-    def __init__(self, output_root: str, save_markdown: bool = True, pdf_export: bool = False, epub_export: bool = False):
+    def __init__(self, output_root: str, save_markdown: bool = True, pdf_export: bool = False, epub_export: bool = False,
+                 records_path: Optional[str] = None, records_backend: Optional[str] = None):
         self.output_root = output_root
         self.save_markdown = save_markdown
         self.pdf_export = pdf_export
         self.epub_export = epub_export
-        self.record_manager = RecordManager(os.path.join(output_root, "records.csv"))
+        self.record_manager = open_record_manager(records_path or os.path.join(output_root, "records.csv"), records_backend)
         self.plugin_manager = PluginManager()
         
         # Performance: Global thread pool for parallel image downloads
         self.executor = ThreadPoolExecutor(max_workers=Config.MAX_WORKERS)
-
-    def _create_session(self) -> requests.Session:
-        """Creates a fresh, robust session with retries and proxy config."""
-        session = requests.Session()
-        session.trust_env = True
-        
-        # Configure Retries for SSL/Connection resilience
-        retries = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            raise_on_status=False
-        )
-        adapter = HTTPAdapter(max_retries=retries, pool_connections=20, pool_maxsize=20)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        if Config.PROXY:
-            session.proxies = {
-                "http": Config.PROXY,
-                "https": Config.PROXY,
-            }
-
-        session.headers.update({
-            "User-Agent": Config.USER_AGENT,
-            "Referer": "https://x.com/",
-            "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-        })
-        return session
+        # One keep-alive connection pool for every article's assets
+        self.asset_client = AssetClient(pool_size=max(20, Config.MAX_WORKERS))
+        self.scroll_mode = Config.SCROLL_MODE
+        # Per-page state, keyed by the Page itself (never id(page), which a later page can
+        # reuse) and dropped when the page closes or is collected; see _forget_page
+        # page -> plugin name whose route filter is installed on it
+        self._prepared_pages = weakref.WeakKeyDictionary()
+        # page -> AssetCapture holding the image responses of the current URL
+        self._captures = weakref.WeakKeyDictionary()
+        # page -> DataCapture holding the API responses of the current URL (extraction.source "data")
+        self._data_captures = weakref.WeakKeyDictionary()
+        # Optional background stage for post-navigation work (see enable_pipeline)
+        self.pipeline: Optional[PostProcessPipeline] = None
+        # Library-wide image blobs that articles' assets/ hardlink to
+        self.asset_store: Optional[AssetStore] = (
+            AssetStore(os.path.join(output_root, Config.ASSET_STORE_DIR)) if Config.ASSET_STORE else None)
+        # Optional recompression stage (images.recompress), its process pool created on first use
+        self.recompress_images = bool(Config.IMAGE_RECOMPRESS)
+        if self.recompress_images and not recompression_available():
+            logger.warning("images.recompress needs Pillow (pip install Pillow); keeping images as downloaded.")
+            self.recompress_images = False
+        self._recompress_pool: Optional[ProcessPoolExecutor] = None
+        self._recompress_pool_lock = threading.Lock()
 
     def close(self):
         """Cleanly shutdown global resources."""
+        if self.pipeline:
+            self.pipeline.shutdown()
         self.executor.shutdown(wait=True)
+        if self._recompress_pool:
+            self._recompress_pool.shutdown(wait=True)
+        self.asset_client.close()
+        self.record_manager.close()
         logger.info("Downloader resources released.")
 
     @staticmethod
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10), reraise=True)
-    def _download_task(session: requests.Session, url: str, save_path: str) -> bool:
-        """Executes a single image download task."""
+    def _download_task(client: AssetClient, url: str, save_path: str, cookies: Optional[RequestsCookieJar] = None) -> bool:
+        """Executes a single image download task on the shared client with the article's cookies."""
         if not is_safe_url(url):
             return False
-            
-        with session.get(url, stream=True, timeout=20) as r:
+
+        rate_limiter.acquire(url)
+        with client.get(url, cookies=cookies, stream=True, timeout=20) as r:
+            rate_limiter.on_response(url, r.status_code)
             r.raise_for_status()
             with open(save_path, 'wb') as f:
                 for chunk in r.iter_content(chunk_size=8192):
@@ -102,84 +115,375 @@ class XDownloader:
         except ValueError as e:
             raise PluginNotFoundError(str(e))
 
-    def _navigate_and_scroll(self, page: Page, url: str, scroll_count: int, timeout: int, plugin):
+    @staticmethod
+    def _is_navigation_timeout(e: Exception) -> bool:
+        return isinstance(e, (PlaywrightTimeoutError, AsyncPlaywrightTimeoutError)) or "timeout" in str(e).lower()
+
+    @staticmethod
+    def _navigation_error(e: Exception, page_content: str, url: str) -> XDownloaderError:
+        """Maps a non-timeout navigation failure to the matching domain error."""
+        # Simple check for block/deleted
+        page_content = page_content.lower()
+        if "suspended" in page_content or "blocked" in page_content or "captcha" in page_content:
+            # Back off the whole host, not just this URL
+            rate_limiter.on_blocked(url)
+            return PlatformBlockedError(f"Platform Blocked: {str(e)}")
+        
+        return XDownloaderError(f"Navigation: {str(e)}")
+
+    @staticmethod
+    def _report_navigation(url: str, response):
+        """Feeds the main document status into the host's adaptive rate."""
+        status = getattr(response, "status", None)
+        if isinstance(status, int):
+            rate_limiter.on_response(url, status)
+
+    def _prepare_page(self, page: Page, plugin):
+        """Installs the plugin's route filter and byte tracking the first time a page is used."""
+        key = page
+        if self._prepared_pages.get(key) == plugin.name:
+            return
+        if key in self._prepared_pages:
+            page.unroute("**/*")
+        else:
+            page.on("close", self._forget_page)
+            page.on("response", track_response_bytes)
+            if Config.ASSET_CAPTURE:
+                self._captures[key] = AssetCapture(Config.ASSET_CAPTURE_HOSTS)
+                page.on("response", self._captures[key].on_response)
+            if Config.EXTRACTION_SOURCE == "data":
+                self._data_captures[key] = DataCapture(plugin.is_data_response)
+                page.on("response", self._data_captures[key].on_response)
+        if key in self._data_captures:
+            self._data_captures[key].accepts = plugin.is_data_response
+        route_filter = RouteFilter.from_rules(plugin.get_route_filter_rules())
+        if route_filter.enabled:
+            page.route("**/*", route_filter.handle)
+        self._prepared_pages[key] = plugin.name
+
+    def _forget_page(self, page):
+        """Drops a closed page's route filter record and captures."""
+        for state in (self._prepared_pages, self._captures, self._data_captures):
+            state.pop(page, None)
+
+    def _navigate(self, page: Page, url: str, timeout: int, plugin):
+        self._prepare_page(page, plugin)
+        self._reset_capture(page)
+        rate_limiter.acquire(url)
         try:
-            safe_navigate(page, url, timeout, plugin.get_wait_selector())
+            with metrics.span("navigate", url):
+                response = safe_navigate(page, url, timeout, plugin.get_wait_selector())
         except Exception as e:
-            is_timeout = isinstance(e, PlaywrightTimeoutError) or "timeout" in str(e).lower()
-            if is_timeout:
+            if self._is_navigation_timeout(e):
                 raise NavigationTimeoutError(f"Network Timeout: {str(e)}")
-            
-            # Simple check for block/deleted
-            page_content = page.content().lower()
-            if "suspended" in page_content or "blocked" in page_content or "captcha" in page_content:
-                raise PlatformBlockedError(f"Platform Blocked: {str(e)}")
-            
-            raise XDownloaderError(f"Navigation: {str(e)}")
+            raise self._navigation_error(e, page.content(), url)
+        self._report_navigation(url, response)
+
+    def _scroll(self, page: Page, url: str, scroll_count: int, plugin) -> Optional[List[str]]:
+        """Scrolls the page; returns the articles harvested on the way (None when nothing was harvested)."""
+        if scroll_count <= 0:
+            return None
+        script = self._harvest_script(url, plugin)
+        harvest = ArticleHarvest()
+
+        def snapshot():
+            try:
+                harvest.add(page.evaluate(*script))
+            except Exception as e:
+                logger.debug(f"Article harvest failed: {e}", extra={"url": url})
+
+        with metrics.span("scroll", url):
+            if script:
+                snapshot()
+            stats = scroll_page(page, scroll_count, plugin.get_wait_selector(), self.scroll_mode,
+                                on_step=snapshot if script else None,
+                                done_script=plugin.get_scroll_done_script(url))
+        self._log_scroll(url, stats)
+        return self._harvested(harvest, url)
+
+    @staticmethod
+    def _harvest_script(url: str, plugin):
+        return plugin.get_harvest_script(url) if Config.SCROLL_HARVEST else None
+
+    @staticmethod
+    def _harvested(harvest: ArticleHarvest, url: str) -> Optional[List[str]]:
+        if not len(harvest):
+            return None
+        logger.debug(f"Harvested {len(harvest)} articles while scrolling", extra={"url": url})
+        metrics.incr("scroll.harvested_urls")
+        metrics.incr("scroll.harvested_articles", len(harvest))
+        return harvest.articles()
+
+    def _data_responses(self, page) -> list:
+        capture = self._data_captures.get(page)
+        return capture.responses() if capture else []
+
+    @staticmethod
+    def _build_data_extractor(plugin, payloads: list, url: str):
+        """The plugin's extractor over captured API data, or None to scrape the DOM."""
+        try:
+            extractor = plugin.get_data_extractor(payloads, url)
+        except Exception as e:
+            logger.warning(f"API data extraction failed, using the DOM: {e}", extra={"url": url})
+            extractor = None
+        if extractor is not None and extractor.is_valid():
+            metrics.incr("extraction.data")
+            return extractor
+        logger.debug("No usable API data; scraping the DOM", extra={"url": url})
+        return None
+
+    def _extract_from_data(self, page: Page, url: str, plugin):
+        """Extractor built from the API responses the page loaded, or None (no data captured or not usable)."""
+        responses = self._data_responses(page)
+        if not responses:
+            return None
+        with metrics.span("api_data", url) as span:
+            payloads = []
+            for response in responses:
+                try:
+                    payloads.append(response.body())
+                except Exception as e:
+                    logger.debug(f"API response body unavailable: {e}", extra={"url": url})
+            span.bytes = sum(len(p) for p in payloads)
+            return self._build_data_extractor(plugin, payloads, url)
+
+    def _navigate_and_extract(self, page: Page, url: str, scroll_count: int, timeout: int, plugin):
+        """Loads the URL and returns its extractor: from API data when available, else scroll and scrape the DOM."""
+        self._navigate(page, url, timeout, plugin)
+        extractor = self._extract_from_data(page, url, plugin)
+        if extractor is not None:
+            return extractor
+        harvested = self._scroll(page, url, scroll_count, plugin)
+        return self._extract_content(page, url, plugin, harvested)
+
+    @staticmethod
+    def _log_scroll(url: str, stats: ScrollStats):
+        logger.info(f"Scrolled in {stats.elapsed:.1f}s ({stats.mode}, {stats.steps} steps, stop: {stats.reason})",
+                    extra={"url": url})
+        metrics.incr(f"scroll.{stats.mode}.urls")
+        metrics.incr(f"scroll.{stats.mode}.seconds", stats.elapsed)
+
+    @staticmethod
+    def _extraction_script(url: str, plugin):
+        return plugin.get_extraction_script(url) if Config.EXTRACTION_MODE == "browser" else None
 
-        if scroll_count > 0:
-            logger.info(f"Scrolling {scroll_count} times...")
-            for _ in range(scroll_count):
-                page.evaluate("window.scrollBy(0, 1000)")
-                time.sleep(1.2)
+    @staticmethod
+    def _accept_extracted(html: Optional[str], url: str) -> bool:
+        """True when the in-browser script produced a document; otherwise the full page is serialised."""
+        if isinstance(html, str) and html:
+            metrics.incr("extraction.in_browser")
+            return True
+        logger.debug("In-browser extraction found nothing; using the full page", extra={"url": url})
+        metrics.incr("extraction.full_page")
+        return False
+
+    def _page_html(self, page: Page, url: str, plugin) -> str:
+        """The HTML handed to the extractor: the plugin's in-browser extract when available, else page.content()."""
+        script = self._extraction_script(url, plugin)
+        if script:
+            try:
+                html = page.evaluate(*script)
+            except Exception as e:
+                logger.debug(f"In-browser extraction failed: {e}", extra={"url": url})
+                html = None
+            if self._accept_extracted(html, url):
+                return html
+        return page.content()
 
-    def _extract_content(self, page: Page, url: str, plugin):
-        extractor = plugin.get_extractor(page.content(), url)
+    @staticmethod
+    def _build_extractor(plugin, html_content: str, url: str, harvested: Optional[List[str]] = None):
+        if harvested:
+            return plugin.get_extractor(html_content, url, harvested=harvested)
+        return plugin.get_extractor(html_content, url)
+
+    def _extract_content(self, page: Page, url: str, plugin, harvested: Optional[List[str]] = None):
+        with metrics.span("page_content", url) as span:
+            html_content = self._page_html(page, url, plugin)
+            span.bytes = len(html_content)
+        with metrics.span("parse", url):
+            extractor = self._build_extractor(plugin, html_content, url, harvested)
         if not extractor.is_valid():
             raise ExtractionError("No article content found")
         return extractor
 
-    def _handle_images(self, page: Page, extractor, article_dir: str):
+    @staticmethod
+    def _relink_image(img, local_filepath: str, article_dir: str):
+        img['src'] = os.path.relpath(local_filepath, article_dir)
+        if img.has_attr('srcset'): del img['srcset']
+
+    def _store_asset(self, src: str, path: str):
+        """Hands a newly written image to the asset store; a store failure never fails the image."""
+        if self.asset_store is None:
+            return
+        try:
+            self.asset_store.adopt(src, path)
+        except Exception as e:
+            logger.debug(f"Asset store skipped {src}: {e}")
+
+    def _reset_capture(self, page):
+        for captures in (self._captures, self._data_captures):
+            capture = captures.get(page)
+            if capture:
+                capture.reset()
+
+    @staticmethod
+    def _write_captured(body: Optional[bytes], path: str) -> bool:
+        if not body:
+            return False
+        with open(path, 'wb') as f:
+            f.write(body)
+        metrics.add_span_bytes(len(body))
+        metrics.incr("assets.captured")
+        metrics.incr("assets.captured_bytes", len(body))
+        return True
+
+    def _captured_body_lookup(self, page: Page) -> Optional[Callable[[str], Optional[bytes]]]:
+        """Returns src -> captured body (read lazily from the browser), or None when capture is off."""
+        capture = self._captures.get(page)
+        if not capture:
+            return None
+
+        def lookup(src: str) -> Optional[bytes]:
+            response = capture.lookup(src)
+            return response.body() if response is not None else None
+        return lookup
+
+    def _use_captured_images(self, captured_body, download_tasks: list):
+        """Writes images the browser already fetched; returns (tasks written, tasks that still need HTTP)."""
+        if not captured_body:
+            return [], download_tasks
+        written, remaining = [], []
+        for img, src, path in download_tasks:
+            try:
+                ok = self._write_captured(captured_body(src), path)
+            except Exception as e:
+                logger.debug(f"Captured body unavailable for {src}: {e}")
+                ok = False
+            (written if ok else remaining).append((img, src, path))
+        return written, remaining
+
+    def _recompression_pool(self) -> ProcessPoolExecutor:
+        with self._recompress_pool_lock:
+            if self._recompress_pool is None:
+                # spawn: forking a process that runs Playwright and worker threads is unsafe
+                self._recompress_pool = ProcessPoolExecutor(
+                    max_workers=Config.IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            return self._recompress_pool
+
+    def _recompress(self, written: list) -> list:
+        """Runs images.recompress over written (img, src, path) tasks in the process pool; returns the tasks with final paths."""
+        pool = self._recompression_pool()
+        options = (Config.IMAGE_FORMAT, Config.IMAGE_QUALITY, Config.IMAGE_MAX_DIMENSION)
+        futures = [(task, os.path.getsize(task[2]), pool.submit(recompress, task[2], *options)) for task in written]
+        result = []
+        for (img, src, path), size, future in futures:
+            try:
+                smaller = future.result()
+            except Exception as e:
+                logger.debug(f"Recompression failed for {src}: {e}")
+                smaller = None
+            if smaller:
+                metrics.incr("images.recompressed")
+                metrics.incr("images.bytes_saved", size - os.path.getsize(smaller))
+                path = smaller
+            result.append((img, src, path))
+        return result
+
+    def _finish_images(self, written: list, article_dir: str):
+        """
+        Post-download stage for newly written (img, src, path) images: gives each
+        file the extension of its real type, recompresses it when configured,
+        hands it to the asset store and points its tag at it.
+        """
+        named = []
+        for img, src, path in written:
+            try:
+                named.append((img, src, fix_extension(path)))
+            except OSError as e:
+                logger.warning(f"Image failed: {src}. Error: {e}")
+        if self.recompress_images and named:
+            named = self._recompress(named)
+        for img, src, path in named:
+            self._store_asset(src, path)
+            self._relink_image(img, path, article_dir)
+
+    def _plan_image_downloads(self, extractor, article_dir: str):
+        """
+        Renders the clean HTML and relinks images already present on disk or in
+        the asset store. Returns the soup and the (img, src, local_path)
+        downloads still pending. Files are named by the md5 of their URL; the
+        extension is only known once the bytes are in (see _finish_images).
+        """
         assets_dir = os.path.join(article_dir, "assets")
         os.makedirs(assets_dir, exist_ok=True)
+        # md5 stem -> file name already on disk, whatever its extension
+        on_disk = {os.path.splitext(name)[0]: name for name in os.listdir(assets_dir)}
+
+        soup = extractor.get_clean_soup()
+        images = extractor.get_content_images(soup)
+
+        download_tasks = []
+        for img, src in images:
+            stem = hashlib.md5(src.encode()).hexdigest()
+            local_filepath = os.path.join(assets_dir, on_disk.get(stem, stem + ".jpg"))
+
+            if stem in on_disk:
+                self._relink_image(img, local_filepath, article_dir)
+            elif self.asset_store and self.asset_store.link_url(src, local_filepath):
+                # Blobs are already final (sniffed/recompressed); only the extension is unknown here
+                local_filepath = fix_extension(local_filepath)
+                on_disk[stem] = os.path.basename(local_filepath)
+                self._relink_image(img, local_filepath, article_dir)
+            else:
+                download_tasks.append((img, src, local_filepath))
+        return soup, download_tasks
 
-        # Create a fresh session for this article's assets to prevent connection pool pollution
-        with self._create_session() as session:
-            # Sync cookies from Playwright
-            pw_cookies = page.context.cookies()
-            for cookie in pw_cookies:
-                session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'])
-
-            raw_html = extractor.get_clean_html()
-            soup = BeautifulSoup(raw_html, "html.parser")
-            images = extractor.get_content_images(soup)
-            
-            download_tasks = []
-            for img, src in images:
-                filename = hashlib.md5(src.encode()).hexdigest() + ".jpg"
-                local_filepath = os.path.join(assets_dir, filename)
-                
-                if not os.path.exists(local_filepath):
-                    download_tasks.append((img, src, local_filepath))
-                else:
-                    img['src'] = os.path.relpath(local_filepath, article_dir)
-                    if img.has_attr('srcset'): del img['srcset']
-
-            if download_tasks:
-                logger.info(f"Downloading {len(download_tasks)} images...")
-                futures = {
-                    self.executor.submit(self._download_task, session, src, path): (img, src, path)
-                    for img, src, path in download_tasks
-                }
-                for future in futures:
-                    img, src, path = futures[future]
-                    try:
-                        if future.result():
-                            img['src'] = os.path.relpath(path, article_dir)
-                            if img.has_attr('srcset'): del img['srcset']
-                    except Exception as exc:
-                        logger.warning(f"Image failed: {src}. Error: {exc}")
-        
+    def _handle_images(self, page: Page, extractor, article_dir: str):
+        return self._localize_images(extractor, article_dir, page.context.cookies(), self._captured_body_lookup(page))
+
+    def _localize_images(self, extractor, article_dir: str, cookies: list, captured_body=None, plan=None):
+        """
+        Writes the article's images locally (browser capture first, then HTTP)
+        and returns the relinked soup. `plan` is a _plan_image_downloads result
+        made earlier; the images are planned here otherwise.
+        """
+        soup, download_tasks = plan or self._plan_image_downloads(extractor, article_dir)
+        written, download_tasks = self._use_captured_images(captured_body, download_tasks)
+
+        if download_tasks:
+            logger.info(f"Downloading {len(download_tasks)} images...")
+            metrics.incr("assets.http", len(download_tasks))
+            # Shared connection pool, this article's browser cookies only
+            jar = AssetClient.cookie_jar(cookies)
+            futures = {
+                self.executor.submit(self._download_task, self.asset_client, src, path, jar): (img, src, path)
+                for img, src, path in download_tasks
+            }
+            for future in futures:
+                img, src, path = futures[future]
+                try:
+                    if future.result():
+                        written.append((img, src, path))
+                        metrics.add_span_bytes(os.path.getsize(path))
+                except Exception as exc:
+                    logger.warning(f"Image failed: {src}. Error: {exc}")
+            self.asset_client.report_stats()
+
+        self._finish_images(written, article_dir)
         return soup
 
     def _save_assets(self, article_dir: str, article_meta, final_soup: BeautifulSoup, url: str):
-        html_content = str(final_soup)
-        self._save_html(article_dir, article_meta.folder_name, html_content)
+        with metrics.span("html", url) as span:
+            html_content = str(final_soup)
+            self._save_html(article_dir, article_meta.folder_name, html_content)
+            span.bytes = len(html_content)
         
         if self.save_markdown:
-            markdown_content = f"# Source: {url}\n\n"
-            markdown_content += f"\n\n---\n\n{md(html_content)}"
-            self._save_markdown(article_dir, article_meta.folder_name, markdown_content)
+            with metrics.span("markdown", url) as span:
+                markdown_content = f"# Source: {url}\n\n"
+                markdown_content += f"\n\n---\n\n{md(html_content)}"
+                self._save_markdown(article_dir, article_meta.folder_name, markdown_content)
+                span.bytes = len(markdown_content)
         
         with open(os.path.join(article_dir, "meta.json"), "w", encoding="utf-8") as f:
             json.dump(article_meta.to_dict(), f, indent=2, ensure_ascii=False)
@@ -189,11 +493,46 @@ class XDownloader:
     def _export_formats(self, page: Page, article_dir: str, article_meta, html_content: str):
         assets_dir = os.path.join(article_dir, "assets")
         if self.pdf_export:
-            Exporter.to_pdf(page, os.path.join(article_dir, f"{article_meta.folder_name}.html"), 
-                           os.path.join(article_dir, f"{article_meta.folder_name}.pdf"))
+            with metrics.span("pdf", article_meta.url):
+                Exporter.to_pdf(page, os.path.join(article_dir, f"{article_meta.folder_name}.html"), 
+                               os.path.join(article_dir, f"{article_meta.folder_name}.pdf"))
         if self.epub_export:
-            Exporter.to_epub(article_meta.title, article_meta.author, html_content, assets_dir, 
-                           os.path.join(article_dir, f"{article_meta.folder_name}.epub"))
+            with metrics.span("epub", article_meta.url):
+                Exporter.to_epub(article_meta.title, article_meta.author, html_content, assets_dir, 
+                               os.path.join(article_dir, f"{article_meta.folder_name}.epub"))
+
+    def _finalize_success(self, article_dir: str, article_meta):
+        """Seals meta.json with the final success status and records it."""
+        article_meta.status = 'success'
+        article_meta.local_path = f"{article_meta.folder_name}/{article_meta.folder_name}.html"
+        
+        # Re-save meta.json to disk with the final success status
+        with open(os.path.join(article_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(article_meta.to_dict(), f, indent=2, ensure_ascii=False)
+            
+        self.record_manager.save_record(article_meta.to_dict())
+
+        logger.info(f"✅ Success: {article_meta.title}")
+
+    def _handle_failure(self, url: str, e: Exception) -> Optional[DownloadResult]:
+        """Logs and records a failed URL according to the error taxonomy."""
+        result = DownloadResult(url=url, success=False, error_msg=str(e))
+
+        if isinstance(e, (NavigationTimeoutError, PlatformBlockedError)):
+            logger.error(f"❌ {type(e).__name__}: {url} - {e}")
+            meta = ArticleMetadata(url=url, status='failed', failure_reason=str(e))
+        elif isinstance(e, ExtractionError):
+            logger.error(f"❌ Extraction Error: {url} - {e}")
+            meta = ArticleMetadata(url=url, status='failed', failure_reason="No article content found")
+        elif isinstance(e, PluginNotFoundError):
+            logger.error(f"❌ Plugin Error: {url} - {e}")
+            return result
+        else:
+            logger.critical(f"Critical error on {url}: {e}", exc_info=True)
+            meta = ArticleMetadata(url=url, status='failed', failure_reason=f"Critical: {str(e)}")
+
+        self.record_manager.save_record(meta.to_dict())
+        return result
 
     def process_url(self, page: Page, url: str, scroll_count: int, timeout: int, force: bool = False) -> Optional[DownloadResult]:
         """Processes a single URL with fine-grained error handling."""
@@ -202,54 +541,66 @@ class XDownloader:
             return None
 
         logger.info(f"Processing URL: {url}")
-        result = DownloadResult(url=url, success=False)
         
         try:
             plugin = self._get_plugin(url)
-            self._navigate_and_scroll(page, url, scroll_count, timeout, plugin)
-            extractor = self._extract_content(page, url, plugin)
+            extractor = self._navigate_and_extract(page, url, scroll_count, timeout, plugin)
             
-            article_meta = extractor.extract_metadata_obj()
+            with metrics.span("metadata", url):
+                article_meta = extractor.extract_metadata_obj()
             article_dir = os.path.join(self.output_root, article_meta.folder_name)
+
+            if self.pipeline:
+                # Hand the DOM snapshot to the background stage; the page moves on
+                self._submit_post_process(page, url, extractor, article_meta, article_dir)
+                return None
             
-            final_soup = self._handle_images(page, extractor, article_dir)
+            with metrics.span("images", url):
+                final_soup = self._handle_images(page, extractor, article_dir)
             html_content = self._save_assets(article_dir, article_meta, final_soup, url)
             self._export_formats(page, article_dir, article_meta, html_content)
 
             # Finalize Success: Update status and write the final 'sealed' meta.json
-            article_meta.status = 'success'
-            article_meta.local_path = f"{article_meta.folder_name}/{article_meta.folder_name}.html"
-            
-            # Re-save meta.json to disk with the final success status
-            with open(os.path.join(article_dir, "meta.json"), "w", encoding="utf-8") as f:
-                json.dump(article_meta.to_dict(), f, indent=2, ensure_ascii=False)
-                
-            self.record_manager.save_record(article_meta.to_dict())
-
-            logger.info(f"✅ Success: {article_meta.title}")
+            with metrics.span("finalize", url):
+                self._finalize_success(article_dir, article_meta)
             return None
-        except (NavigationTimeoutError, PlatformBlockedError) as e:
-            logger.error(f"❌ {type(e).__name__}: {url} - {e}")
-            meta = ArticleMetadata(url=url, status='failed', failure_reason=str(e))
-            self.record_manager.save_record(meta.to_dict())
-            result.error_msg = str(e)
-            return result
-        except ExtractionError as e:
-            logger.error(f"❌ Extraction Error: {url} - {e}")
-            meta = ArticleMetadata(url=url, status='failed', failure_reason="No article content found")
-            self.record_manager.save_record(meta.to_dict())
-            result.error_msg = str(e)
-            return result
-        except PluginNotFoundError as e:
-            logger.error(f"❌ Plugin Error: {url} - {e}")
-            result.error_msg = str(e)
-            return result
         except Exception as e:
-            logger.critical(f"Critical error on {url}: {e}", exc_info=True)
-            meta = ArticleMetadata(url=url, status='failed', failure_reason=f"Critical: {str(e)}")
-            self.record_manager.save_record(meta.to_dict())
-            result.error_msg = str(e)
-            return result
+            return self._handle_failure(url, e)
+
+    def _submit_post_process(self, page: Page, url: str, extractor, article_meta, article_dir: str):
+        """Snapshots what still needs the browser, then queues the rest of the URL."""
+        cookies = page.context.cookies()
+        capture = self._captures.get(page)
+        # Planned now so only the article's own pending images cross the Playwright pipe
+        plan = self._plan_image_downloads(extractor, article_dir) if capture else None
+        captured = capture.snapshot_bodies(src for _, src, _ in plan[1]) if capture else {}
+
+        def job():
+            try:
+                with metrics.span("images", url):
+                    final_soup = self._localize_images(extractor, article_dir, cookies,
+                                                       captured.get if captured else None, plan)
+                html_content = self._save_assets(article_dir, article_meta, final_soup, url)
+                self._export_formats(None, article_dir, article_meta, html_content)
+                with metrics.span("finalize", url):
+                    self._finalize_success(article_dir, article_meta)
+                return None
+            except Exception as e:
+                result = self._handle_failure(url, e)
+                return result.__dict__ if result else None
+
+        self.pipeline.submit(job)
+
+    def enable_pipeline(self):
+        """Moves post-processing to a bounded background stage (not with PDF export, which needs the page)."""
+        if self.pdf_export:
+            logger.warning("Pipelined post-processing is disabled with --pdf (PDF rendering needs the browser page).")
+            return
+        self.pipeline = PostProcessPipeline(Config.PIPELINE_WORKERS, Config.PIPELINE_DEPTH)
+
+    def drain_pipeline(self) -> list:
+        """Waits for queued post-processing and returns its failures."""
+        return self.pipeline.drain() if self.pipeline else []
 
     def _save_html(self, folder: str, title: str, content: str):
         path = os.path.join(folder, f"{title}.html")
@@ -261,45 +612,141 @@ class XDownloader:
         with open(path, "w", encoding="utf-8") as f:
             f.write(content)
 
-def _process_urls_in_session(downloader: XDownloader, args, urls_to_process: List[str]):
-    failures = []
-    
-    browser = None
-    context = None
-    try:
-        with sync_playwright() as p:
-            logger.info(f"Launching Chromium (Headless: {args.headless})")
-            
-            launch_kwargs = {"headless": args.headless}
-            if Config.PROXY:
-                launch_kwargs["proxy"] = {"server": Config.PROXY}
-                
-            browser = p.chromium.launch(**launch_kwargs)
-            context = browser.new_context(viewport={"width": 1280, "height": 1080}, user_agent=Config.USER_AGENT)
-
-            cookies = load_cookies(args.cookies)
-            if cookies:
-                context.add_cookies([c for c in cookies if c.get('name') != 'lang'])
-                logger.info(f"Cookies loaded.")
-
-            page = context.new_page()
+def _launch_browser(p, args):
+    """Launches Chromium with the CLI headless flag and configured proxy."""
+    logger.info(f"Launching Chromium (Headless: {args.headless})")
+    return p.chromium.launch(**launch_options(args.headless))
+
+def _new_context(browser, cookies: list):
+    """Creates an isolated browser context seeded with the shared cookie set."""
+    context = browser.new_context(**context_options())
+    if cookies:
+        context.add_cookies(context_cookies(cookies))
+        logger.info(f"Cookies loaded.")
+    return context
+
+def _drain_url_queue(downloader: XDownloader, args, page: Page, url_queue: queue.Queue, failures: list, stop_event: threading.Event):
+    """Pulls URLs from the shared queue until it is empty or the batch is stopped."""
+    while not stop_event.is_set():
+        try:
+            url = url_queue.get_nowait()
+        except queue.Empty:
+            return
 
-            for url in urls_to_process:
-                try:
-                    result = downloader.process_url(page, url, args.scroll, args.timeout, args.force)
-                    if result:
-                        failures.append(result.__dict__)
-                except KeyboardInterrupt:
-                    logger.warning(f"\n⚠️  Interrupted by user. Cleaning up...")
-                    break
-                except Exception as e:
-                    logger.error(f"Unexpected error processing {url}: {e}")
-                    continue
+        try:
+            result = downloader.process_url(page, url, args.scroll, args.timeout, args.force)
+            if result:
+                failures.append(result.__dict__)
+        except KeyboardInterrupt:
+            logger.warning(f"\n⚠️  Interrupted by user. Cleaning up...")
+            stop_event.set()
+            return
+        except Exception as e:
+            logger.error(f"Unexpected error processing {url}: {e}")
+            continue
 
-            if browser:
+def _context_worker(downloader: XDownloader, args, cookies: list, url_queue: queue.Queue, failures: list, stop_event: threading.Event):
+    """
+    One browser context consuming the shared URL queue.
+    The sync Playwright API is bound to the thread that started it, so every
+    worker owns its own driver and browser; contexts never share pages.
+    """
+    try:
+        with sync_playwright() as p:
+            browser = _launch_browser(p, args)
+            try:
+                context = _new_context(browser, cookies)
+                page = context.new_page()
+                _drain_url_queue(downloader, args, page, url_queue, failures, stop_event)
+            finally:
                 browser.close()
     except Exception as e:
         logger.critical(f"Critical browser error: {e}")
+
+def _run_url_queue(downloader: XDownloader, args, url_queue, num_contexts: int) -> list:
+    """Drains a (possibly process-shared) URL queue through N browser contexts and returns the failures."""
+    failures = []
+    cookies = load_cookies(args.cookies)
+    stop_event = threading.Event()
+
+    if num_contexts == 1:
+        _context_worker(downloader, args, cookies, url_queue, failures, stop_event)
+        failures.extend(downloader.drain_pipeline())
+        return failures
+
+    logger.info(f"Starting {num_contexts} browser contexts...")
+    workers = [
+        threading.Thread(
+            target=_context_worker,
+            args=(downloader, args, cookies, url_queue, failures, stop_event),
+            name=f"context-{i}",
+            daemon=True
+        )
+        for i in range(num_contexts)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            while worker.is_alive():
+                worker.join(timeout=0.5)
+    except KeyboardInterrupt:
+        logger.warning(f"\n⚠️  Interrupted by user. Waiting for active URLs to finish...")
+        stop_event.set()
+        for worker in workers:
+            worker.join()
+    failures.extend(downloader.drain_pipeline())
+    return failures
+
+def _run_browser_batch(downloader: XDownloader, args, urls_to_process: List[str]) -> list:
+    """Processes URLs through one or more browser contexts and returns the failures."""
+    url_queue = queue.Queue()
+    for url in urls_to_process:
+        url_queue.put(url)
+
+    num_contexts = max(1, min(getattr(args, "contexts", 1) or 1, len(urls_to_process)))
+    return _run_url_queue(downloader, args, url_queue, num_contexts)
+
+def _pending_urls(record_manager, urls: List[str], force: bool) -> List[str]:
+    """
+    Drops URLs naming the same item as an earlier one (same canonical key) and,
+    unless forced, items already downloaded under any URL, before a browser
+    is launched for them.
+    """
+    seen = set()
+    pending = []
+    duplicates = skipped = 0
+    for url in urls:
+        key = canonical_key(url)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        if not force and record_manager.is_downloaded(url):
+            skipped += 1
+            continue
+        pending.append(url)
+    if duplicates:
+        logger.info(f"🔁 Skipping {duplicates} duplicate URLs (same item as an earlier URL).")
+    if skipped:
+        logger.info(f"⏭️  Skipping {skipped} already downloaded URLs.")
+    return pending
+
+def _process_urls_in_session(downloader: XDownloader, args, urls_to_process: List[str]):
+    failures = []
+    try:
+        urls_to_process = _pending_urls(downloader.record_manager, urls_to_process, getattr(args, "force", False))
+        if not urls_to_process:
+            logger.info("Nothing new to download.")
+        elif (getattr(args, "shards", 1) or 1) > 1:
+            from src.sharding import run_sharded_batch
+            failures = run_sharded_batch(downloader, args, urls_to_process)
+        elif getattr(args, "engine", "sync") == "async":
+            failures = asyncio.run(downloader.run(args, urls_to_process))
+        else:
+            failures = _run_browser_batch(downloader, args, urls_to_process)
+    except KeyboardInterrupt:
+        logger.warning(f"\n⚠️  Interrupted by user. Cleaning up...")
     finally:
         # Emergency cleanup if context manager fails
         try:
@@ -317,8 +764,111 @@ def _process_urls_in_session(downloader: XDownloader, args, urls_to_process: Lis
             json.dump(failures, f, indent=2, ensure_ascii=False)
     
     logger.info("Finished.")
+    _log_run_summary()
     return failures
 
+def _log_run_summary():
+    """Prints the run's network/asset counters and resets them for the next run."""
+    lines = metrics.summary_lines()
+    if lines:
+        logger.info("Run summary:")
+        for line in lines:
+            logger.info(f"   {line}")
+    metrics.reset()
+
+class WarmSession:
+    """
+    Long-lived browser session for interactive mode.
+    Chromium, the context (with cookies), the page, the downloader (RecordManager,
+    image thread pool) and the index cache survive between turns, so a turn only
+    pays for its own URLs.
+    """
+    def __init__(self, args):
+        self.args = args
+        self.downloader = XDownloader(args.output, args.markdown, args.pdf, args.epub)
+        self.downloader.scroll_mode = getattr(args, "scroll_mode", None) or Config.SCROLL_MODE
+        if getattr(args, "pipeline", False):
+            self.downloader.enable_pipeline()
+        self.indexer = IndexGenerator(args.output)
+        self._index_seeded = False
+        self._playwright = None
+        self._browser = None
+        self.page = None
+
+    def _ensure_browser(self):
+        if self._browser is not None and self._browser.is_connected() and not self.page.is_closed():
+            return
+        self._close_browser()
+        self._playwright = sync_playwright().start()
+        self._browser = _launch_browser(self._playwright, self.args)
+        context = _new_context(self._browser, load_cookies(self.args.cookies))
+        self.page = context.new_page()
+
+    def _close_browser(self):
+        try:
+            if self._browser is not None:
+                self._browser.close()
+        except Exception:
+            pass
+        try:
+            if self._playwright is not None:
+                self._playwright.stop()
+        except Exception:
+            pass
+        self._playwright = self._browser = self.page = None
+
+    def _refresh_index(self):
+        if not self._index_seeded:
+            logger.info("Generating Index...")
+            self.downloader.record_manager.pop_dirty_records()
+            self.indexer.generate(records=self.downloader.record_manager.get_all_records())
+            self._index_seeded = True
+        elif not self.indexer.update(self.downloader.record_manager.pop_dirty_records()):
+            logger.info("Index unchanged.")
+
+    def process(self, urls: List[str]) -> list:
+        """Runs one interactive turn on the warm page and returns its failures."""
+        failures = []
+        url_queue = queue.Queue()
+        for url in _pending_urls(self.downloader.record_manager, urls, self.args.force):
+            url_queue.put(url)
+
+        try:
+            if not url_queue.empty():
+                self._ensure_browser()
+            _drain_url_queue(self.downloader, self.args, self.page, url_queue, failures, threading.Event())
+            failures.extend(self.downloader.drain_pipeline())
+        except Exception as e:
+            logger.critical(f"Critical browser error: {e}")
+            # Relaunch on the next turn
+            self._close_browser()
+
+        self._refresh_index()
+        if failures:
+            fail_path = os.path.join(self.args.output, "failures.json")
+            with open(fail_path, "w", encoding="utf-8") as f:
+                json.dump(failures, f, indent=2, ensure_ascii=False)
+        logger.info("Finished.")
+        _log_run_summary()
+        return failures
+
+    def close(self):
+        self._close_browser()
+        self.downloader.close()
+
+def _create_downloader(args) -> XDownloader:
+    """Builds the download engine selected on the command line."""
+    if getattr(args, "engine", "sync") == "async":
+        # The async engine already overlaps pages, so it has no separate post-processing stage
+        from src.async_downloader import AsyncXDownloader
+        downloader = AsyncXDownloader(args.output, args.markdown, args.pdf, args.epub)
+    else:
+        downloader = XDownloader(args.output, args.markdown, args.pdf, args.epub)
+        if getattr(args, "pipeline", False):
+            downloader.enable_pipeline()
+    downloader.scroll_mode = getattr(args, "scroll_mode", None) or Config.SCROLL_MODE
+    return downloader
+
 def main():
     parser = argparse.ArgumentParser(description="Universal Article Downloader (Plugin Architecture)")
     parser.add_argument("input", nargs="?", help="URL or file with URLs")
@@ -328,10 +878,17 @@ def main():
     parser.add_argument("--no-headless", action="store_false", dest="headless", help="Show browser window")
     parser.add_argument("--scroll", type=int, default=Config.DEFAULT_SCROLL_COUNT)
     parser.add_argument("--timeout", type=int, default=Config.DEFAULT_TIMEOUT)
+    parser.add_argument("--pipeline", action="store_true", default=Config.PIPELINE_ENABLED,
+                        help="Post-process (images, files, records) in the background while the browser moves on")
+    parser.add_argument("--scroll-mode", choices=["adaptive", "fixed"], default=Config.SCROLL_MODE, help="Scroll strategy")
     parser.add_argument("--markdown", action="store_true", help="Save as Markdown")
     parser.add_argument("--pdf", action="store_true", help="Export as PDF")
     parser.add_argument("--epub", action="store_true", help="Export as EPUB")
     parser.add_argument("--force", action="store_true", help="Force redownload")
+    parser.add_argument("--contexts", type=int, default=Config.CONTEXTS, help="Number of parallel browser contexts")
+    parser.add_argument("--engine", choices=["sync", "async"], default=Config.ENGINE, help="Download engine")
+    parser.add_argument("--shards", type=int, default=Config.SHARDS, help="Worker processes, each with its own browser")
+    parser.add_argument("--pages-per-context", type=int, default=Config.PAGES_PER_CONTEXT, help="Concurrent pages per context (async engine)")
     
     parser.set_defaults(headless=Config.HEADLESS, markdown=False)
     args = parser.parse_args()
@@ -371,12 +928,23 @@ def main():
             return
             
         logger.info(f"Processing {len(urls)} valid URLs...")
-        downloader = XDownloader(args.output, args.markdown, args.pdf, args.epub)
+        downloader = _create_downloader(args)
         _process_urls_in_session(downloader, args, urls)
         return # Exit after processing
 
     # Otherwise, enter true interactive mode
     logger.info("Entering interactive mode. Enter URL or file path, or type 'quit' to exit.")
+    # The warm session drives a single sync page; other engines keep a fresh session per turn
+    session = None
+    if args.engine == "sync" and (args.shards or 1) <= 1 and (args.contexts or 1) <= 1:
+        session = WarmSession(args)
+    try:
+        _interactive_loop(args, session)
+    finally:
+        if session:
+            session.close()
+
+def _interactive_loop(args, session: Optional[WarmSession]):
     while True:
         try:
             user_input = input(">>> ").strip()
@@ -416,8 +984,12 @@ def main():
         
         logger.info(f"Processing {len(interactive_urls)} valid URLs from input...")
         
+        if session:
+            session.process(interactive_urls)
+            continue
+
         # Create a new downloader for each interactive turn to ensure clean sessions
-        current_downloader = XDownloader(args.output, args.markdown, args.pdf, args.epub)
+        current_downloader = _create_downloader(args)
         _process_urls_in_session(current_downloader, args, interactive_urls)
 if __name__ == "__main__":
     main()
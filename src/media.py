@@ -0,0 +1,111 @@
+import os
+from typing import Optional
+
+# recompress() runs in worker processes: it logs nothing and lets failures
+# propagate to the caller (XDownloader._recompress), which logs them.
+
+# Real image type -> file extension used in assets/
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+    "image/bmp": ".bmp",
+    "image/svg+xml": ".svg",
+}
+MEDIA_TYPES = {ext: media_type for media_type, ext in EXTENSIONS.items()}
+MEDIA_TYPES[".jpeg"] = "image/jpeg"
+SNIFF_BYTES = 64
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Media type from an image's leading bytes (magic numbers), or None if unrecognised."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    if head.startswith(b"BM"):
+        return "image/bmp"
+    text = head.lstrip().lower()
+    if text.startswith(b"<svg") or (text.startswith(b"<?xml") and b"<svg" in head.lower()):
+        return "image/svg+xml"
+    return None
+
+def media_type_for(path: str) -> str:
+    """Media type implied by a file's extension (JPEG for unknown extensions, as assets used to be)."""
+    return MEDIA_TYPES.get(os.path.splitext(path)[1].lower(), "image/jpeg")
+
+def fix_extension(path: str) -> str:
+    """Renames a freshly written image so its extension matches its content; returns the final path."""
+    with open(path, "rb") as f:
+        media_type = sniff_image_type(f.read(SNIFF_BYTES))
+    ext = EXTENSIONS.get(media_type)
+    root, current = os.path.splitext(path)
+    if ext is None or current.lower() == ext:
+        return path
+    fixed = root + ext
+    os.replace(path, fixed)
+    return fixed
+
+_pillow_available: Optional[bool] = None
+
+def recompression_available() -> bool:
+    """True when Pillow (the optional dependency of images.recompress) can be imported."""
+    global _pillow_available
+    if _pillow_available is None:
+        try:
+            import PIL  # noqa: F401
+            _pillow_available = True
+        except ImportError:
+            _pillow_available = False
+    return _pillow_available
+
+def recompress(path: str, convert_to: str = "", quality: int = 80, max_dimension: int = 0) -> Optional[str]:
+    """
+    Re-encodes one image (process-pool worker): optionally converts it to
+    WebP/AVIF and caps its longest side at `max_dimension` pixels. The result
+    replaces the original only when it is smaller. Returns the new path (the
+    extension may change) or None when the file was left untouched.
+    Animated GIFs and SVGs are never touched; an image Pillow cannot decode
+    or encode (e.g. AVIF without the plugin) raises, leaving the file as is.
+    """
+    from PIL import Image
+
+    root, ext = os.path.splitext(path)
+    if ext.lower() == ".svg":
+        return None
+    with Image.open(path) as image:
+        if getattr(image, "is_animated", False):
+            return None
+        target_format = (convert_to or image.format or "").upper()
+        if target_format == "JPG":
+            target_format = "JPEG"
+        resized = max_dimension and max(image.size) > max_dimension
+        if not resized and target_format == image.format:
+            return None
+        if resized:
+            image.thumbnail((max_dimension, max_dimension))
+        if target_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        target_path = root + EXTENSIONS.get(f"image/{target_format.lower()}", ext)
+        temp_path = target_path + ".tmp"
+        try:
+            image.save(temp_path, format=target_format, quality=quality)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    if os.path.getsize(temp_path) >= os.path.getsize(path):
+        os.remove(temp_path)
+        return None
+    os.replace(temp_path, target_path)
+    if target_path != path:
+        os.remove(path)
+    return target_path
@@ -0,0 +1,222 @@
+import time
+import heapq
+import random
+import threading
+import contextvars
+from contextlib import contextmanager
+from collections import defaultdict
+from typing import Dict, List
+
+from src.logger import span_logger
+
+# Stages in the order a URL goes through them (summary ordering)
+STAGES = ("navigate", "scroll", "page_content", "parse", "metadata", "images",
+          "html", "markdown", "pdf", "epub", "finalize")
+# Per-stage reservoir size for the percentile estimate; bounds memory on huge batches
+SPAN_SAMPLES = 10000
+SLOWEST_URLS = 5
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Span:
+    """One timed stage of one URL; `bytes` is filled in by the stage if it has a size."""
+    __slots__ = ("stage", "url", "bytes", "duration")
+
+    def __init__(self, stage: str, url: str):
+        self.stage = stage
+        self.url = url
+        self.bytes = 0
+        self.duration = 0.0
+
+class Metrics:
+    """
+    Process-wide run counters, printed as the run summary at the end of a batch.
+    Thread-safe so browser contexts and image workers can report concurrently.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._url_seconds: Dict[str, float] = defaultdict(float)
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self, prefix: str = "") -> Dict[str, float]:
+        """Returns a copy of the counters, optionally limited to one prefix."""
+        with self._lock:
+            return {k: v for k, v in self._counters.items() if k.startswith(prefix)}
+
+    def merge(self, counters: Dict[str, float]):
+        """Adds counters from another process (e.g. a shard worker)."""
+        with self._lock:
+            for name, value in counters.items():
+                self._counters[name] += value
+
+    @contextmanager
+    def span(self, stage: str, url: str):
+        """
+        Times a stage of a URL and writes a span record to the JSONL log.
+        Costs two clock reads and one log line, so it stays on in production.
+        """
+        span = Span(stage, url)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            self.record_span(span)
+
+    @staticmethod
+    def add_span_bytes(num: int):
+        """Adds bytes to the innermost open span (no-op outside a span)."""
+        span = _current_span.get()
+        if span is not None:
+            span.bytes += num
+
+    def record_span(self, span: Span):
+        with self._lock:
+            self._counters[f"span.{span.stage}.count"] += 1
+            self._counters[f"span.{span.stage}.seconds"] += span.duration
+            self._add_sample(span.stage, span.duration, self._counters[f"span.{span.stage}.count"])
+            self._url_seconds[span.url] += span.duration
+        span_logger.info(f"span {span.stage}", extra={
+            "url": span.url, "stage": span.stage,
+            "duration_ms": round(span.duration * 1000, 1), "bytes": span.bytes
+        })
+
+    def _add_sample(self, stage: str, value: float, seen: float):
+        # Reservoir sampling: every duration has the same chance to be kept
+        samples = self._samples[stage]
+        if len(samples) < SPAN_SAMPLES:
+            samples.append(value)
+        else:
+            slot = random.randrange(int(seen))
+            if slot < SPAN_SAMPLES:
+                samples[slot] = value
+
+    def span_state(self) -> dict:
+        """Span samples and per-URL totals, for shipping from a shard worker."""
+        with self._lock:
+            return {
+                "samples": {k: list(v) for k, v in self._samples.items()},
+                "url_seconds": dict(self._url_seconds),
+            }
+
+    def merge_spans(self, state: dict):
+        """Adds span samples and per-URL totals from another process (e.g. a shard worker)."""
+        with self._lock:
+            for stage, values in state.get("samples", {}).items():
+                combined = self._samples[stage] + list(values)
+                if len(combined) > SPAN_SAMPLES:
+                    combined = random.sample(combined, SPAN_SAMPLES)
+                self._samples[stage] = combined
+            for url, seconds in state.get("url_seconds", {}).items():
+                self._url_seconds[url] += seconds
+
+    def percentiles(self, stage: str, points=(50, 95, 99)) -> Dict[int, float]:
+        with self._lock:
+            samples = sorted(self._samples.get(stage, ()))
+        if not samples:
+            return {}
+        return {p: samples[min(len(samples) - 1, int(len(samples) * p / 100))] for p in points}
+
+    def slowest_urls(self, n: int = SLOWEST_URLS) -> List[tuple]:
+        with self._lock:
+            return heapq.nlargest(n, self._url_seconds.items(), key=lambda item: item[1])
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+            self._url_seconds.clear()
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        blocked = self.snapshot("network.blocked.")
+        if blocked:
+            total = int(sum(blocked.values()))
+            by_type = ", ".join(f"{k.rsplit('.', 1)[-1]}={int(v)}" for k, v in sorted(blocked.items()))
+            lines.append(f"Blocked requests: {total} ({by_type})")
+        loaded = self.get("network.bytes_loaded")
+        if loaded:
+            lines.append(f"Bytes loaded by browser: {format_bytes(loaded)} "
+                         f"across {int(self.get('network.responses'))} responses")
+        from_data = self.get("extraction.data")
+        in_browser = self.get("extraction.in_browser")
+        full_page = self.get("extraction.full_page")
+        if from_data or in_browser or full_page:
+            lines.append(f"Extraction: {int(from_data)} from API data, {int(in_browser)} in browser, "
+                         f"{int(full_page)} from the full page")
+        captured = self.get("assets.captured")
+        fetched = self.get("assets.http")
+        stored = self.get("assets.store_hits")
+        if captured or fetched or stored:
+            lines.append(f"Images: {int(stored)} from asset store "
+                         f"({format_bytes(self.get('assets.store_hit_bytes'))} linked, no request), "
+                         f"{int(captured)} from browser capture "
+                         f"({format_bytes(self.get('assets.captured_bytes'))} not re-downloaded), "
+                         f"{int(fetched)} over HTTP")
+        recompressed = self.get("images.recompressed")
+        if recompressed:
+            lines.append(f"Recompressed images: {int(recompressed)} "
+                         f"({format_bytes(self.get('images.bytes_saved'))} saved)")
+        sent = self.get("assets.http_requests")
+        if sent:
+            opened = self.get("assets.http_connections")
+            lines.append(f"Asset connections: {int(sent)} requests over {int(opened)} new connections "
+                         f"({1 - opened / sent:.0%} reused)")
+        lookups = self.get("dns.cache_hits") + self.get("dns.cache_misses")
+        if lookups:
+            lines.append(f"SSRF host checks: {int(lookups)} lookups, "
+                         f"{self.get('dns.cache_hits') / lookups:.0%} from cache")
+        waits = self.snapshot("ratelimit.wait_seconds.")
+        throttles = self.snapshot("ratelimit.throttled.")
+        for host in sorted({k.split(".", 2)[2] for k in list(waits) + list(throttles)}):
+            lines.append(f"Rate limiting ({host}): waited {waits.get(f'ratelimit.wait_seconds.{host}', 0):.1f}s, "
+                         f"{int(throttles.get(f'ratelimit.throttled.{host}', 0))} throttle signals")
+        jobs = self.get("pipeline.jobs")
+        if jobs:
+            lines.append(f"Pipeline: {int(jobs)} background jobs, "
+                         f"browser waited {self.get('pipeline.backpressure_seconds'):.1f}s on backpressure")
+        for mode in ("adaptive", "fixed"):
+            urls = self.get(f"scroll.{mode}.urls")
+            if urls:
+                avg = self.get(f"scroll.{mode}.seconds") / urls
+                lines.append(f"Scrolling ({mode}): {int(urls)} URLs, avg {avg:.1f}s per URL")
+        harvested = self.get("scroll.harvested_urls")
+        if harvested:
+            lines.append(f"Scroll harvest: {int(self.get('scroll.harvested_articles'))} articles "
+                         f"across {int(harvested)} URLs")
+        lines.extend(self._span_lines())
+        return lines
+
+    def _span_lines(self) -> List[str]:
+        with self._lock:
+            stages = [s for s in STAGES if s in self._samples]
+            stages += sorted(set(self._samples) - set(STAGES))
+        lines = []
+        for stage in stages:
+            pct = self.percentiles(stage)
+            count = int(self.get(f"span.{stage}.count"))
+            lines.append(f"Stage {stage}: n={count} p50={pct[50]:.2f}s p95={pct[95]:.2f}s p99={pct[99]:.2f}s")
+        slowest = self.slowest_urls()
+        if slowest:
+            lines.append("Slowest URLs: " + ", ".join(f"{url} ({seconds:.1f}s)" for url, seconds in slowest))
+        return lines
+
+def format_bytes(num: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if num < 1024 or unit == "GB":
+            return f"{num:.1f} {unit}" if unit != "B" else f"{int(num)} B"
+        num /= 1024
+
+# Initialize Singleton
+metrics = Metrics()
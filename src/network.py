@@ -0,0 +1,277 @@
+import re
+import fnmatch
+import weakref
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util import connection as urllib3_connection
+from urllib3.util.retry import Retry
+
+from src.config import Config
+from src.utils import host_resolver
+from src.metrics import metrics
+from src.logger import logger
+
+class RouteFilter:
+    """
+    Playwright route handler that aborts non-essential requests (video, fonts,
+    analytics beacons, ad scripts) before they leave the browser.
+    Rules come from the plugin (see IPlugin.get_route_filter_rules).
+    """
+    def __init__(self, resource_types: Iterable[str] = (), url_patterns: Iterable[str] = ()):
+        self.resource_types = frozenset(t.lower() for t in resource_types or ())
+        patterns = list(url_patterns or ())
+        # One alternation instead of N fnmatch calls per request
+        self._pattern = re.compile("|".join(fnmatch.translate(p) for p in patterns)) if patterns else None
+
+    @classmethod
+    def from_rules(cls, rules: dict) -> "RouteFilter":
+        rules = rules or {}
+        return cls(rules.get("resource_types", ()), rules.get("url_patterns", ()))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self._pattern)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+        return bool(self._pattern and self._pattern.match(url))
+
+    def _record(self, resource_type: str):
+        metrics.incr(f"network.blocked.{resource_type}")
+
+    def handle(self, route):
+        """Route handler for the sync API."""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self._record(request.resource_type)
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        """Route handler for the async API."""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self._record(request.resource_type)
+            await route.abort()
+        else:
+            await route.continue_()
+
+def track_response_bytes(response):
+    """Response listener feeding the 'bytes loaded' line of the run summary."""
+    metrics.incr("network.responses")
+    try:
+        length = response.headers.get("content-length")
+        if length:
+            metrics.incr("network.bytes_loaded", int(length))
+    except (ValueError, AttributeError) as e:
+        logger.debug(f"Unreadable content-length on {response.url}: {e}")
+
+class AssetCapture:
+    """
+    Remembers image responses the browser already received while rendering,
+    keyed by URL, so the downloader can write their bodies instead of fetching
+    the same bytes again. Bodies are pulled from the browser only for the
+    article's own images; the map is reset on every navigation.
+    """
+    def __init__(self, hosts: Iterable[str]):
+        self.hosts = frozenset(hosts or ())
+        self._responses = {}
+
+    def reset(self):
+        self._responses.clear()
+
+    def on_response(self, response):
+        try:
+            if response.status != 200 or response.request.resource_type != "image":
+                return
+            if urlparse(response.url).hostname not in self.hosts:
+                return
+        except Exception:
+            return
+        self._responses[response.url] = response
+
+    def lookup(self, url: str) -> Optional[object]:
+        return self._responses.get(url)
+
+    def snapshot_bodies(self, urls: Iterable[str]) -> dict:
+        """Reads the captured bodies of `urls` now (url -> bytes), for work that runs after the page moved on."""
+        bodies = {}
+        for url in urls:
+            response = self._responses.get(url)
+            if response is None:
+                continue
+            try:
+                bodies[url] = response.body()
+            except Exception as e:
+                logger.debug(f"Captured body unavailable for {url}: {e}")
+        return bodies
+
+class DataCapture:
+    """
+    Collects the API responses (XHR/fetch) a plugin reads its content from,
+    e.g. X's GraphQL TweetDetail calls, while a page loads. `accepts` is the
+    current plugin's is_data_response; bodies are read only when extraction
+    asks for them, and the list is reset on every navigation.
+    """
+    def __init__(self, accepts: Callable[[str], bool]):
+        self.accepts = accepts
+        self._responses = []
+
+    def reset(self):
+        self._responses.clear()
+
+    def on_response(self, response):
+        try:
+            if response.status != 200 or response.request.resource_type not in ("xhr", "fetch"):
+                return
+            if not self.accepts(response.url):
+                return
+        except Exception:
+            return
+        self._responses.append(response)
+
+    def responses(self) -> list:
+        return list(self._responses)
+
+class _PinnedConnectionMixin:
+    """
+    Opens the socket to an address the SSRF guard approved (host_resolver)
+    instead of resolving the hostname again, closing the DNS-rebinding window
+    between check and connect. TLS still verifies against the hostname.
+    Through a proxy the proxy resolves the target, so nothing is pinned.
+    """
+    def _new_conn(self):
+        if getattr(self, "proxy", None) is not None or getattr(self, "_tunnel_host", None):
+            return super()._new_conn()
+        addresses = host_resolver.safe_addresses(self.host)
+        if not addresses:
+            raise NewConnectionError(self, f"Refusing to connect to unsafe or unresolvable host {self.host}")
+        error = None
+        for address in addresses:
+            try:
+                return urllib3_connection.create_connection(
+                    (address, self.port), self.timeout,
+                    source_address=self.source_address, socket_options=self.socket_options)
+            except TimeoutError:
+                error = ConnectTimeoutError(
+                    self, f"Connection to {self.host} ({address}) timed out. (connect timeout={self.timeout})")
+            except OSError as e:
+                error = NewConnectionError(self, f"Failed to establish a new connection to {address}: {e}")
+        raise error
+
+class _PinnedHTTPConnection(_PinnedConnectionMixin, HTTPConnection):
+    pass
+
+class _PinnedHTTPSConnection(_PinnedConnectionMixin, HTTPSConnection):
+    pass
+
+class _PinnedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PinnedHTTPConnection
+
+class _PinnedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PinnedHTTPSConnection
+
+class _PinnedAdapter(HTTPAdapter):
+    """HTTPAdapter whose direct (non-proxied) connections use the pinned classes."""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _PinnedHTTPConnectionPool,
+            "https": _PinnedHTTPSConnectionPool,
+        }
+
+class AssetClient:
+    """
+    One pooled HTTP client for every asset download of a run. Connections (and
+    their TLS sessions) to pbs.twimg.com are kept alive across articles instead
+    of being rebuilt per article. Cookies are scoped per request: each article
+    passes its browser context's jar and the shared session never stores any.
+    Connection reuse is reported to the run metrics by report_stats().
+    """
+    def __init__(self, pool_size: int = 20):
+        self.session = self._build_session(pool_size)
+        self._lock = threading.Lock()
+        # pool -> (requests, connections) already reported
+        self._reported = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def _build_session(pool_size: int) -> requests.Session:
+        """A robust session with retries and proxy config."""
+        session = requests.Session()
+        session.trust_env = True
+        # Set-Cookie from one article's images must not reach the next article's requests
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+        # Configure Retries for SSL/Connection resilience. 429/503 are throttle
+        # signals: they are not retried here but surface to _download_task, whose
+        # own retries go back through rate_limiter.acquire()/on_response()
+        retries = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[500, 502, 504],
+            raise_on_status=False
+        )
+        adapter = _PinnedAdapter(max_retries=retries, pool_connections=20, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        if Config.PROXY:
+            session.proxies = {
+                "http": Config.PROXY,
+                "https": Config.PROXY,
+            }
+
+        session.headers.update({
+            "User-Agent": Config.USER_AGENT,
+            "Referer": "https://x.com/",
+            "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        return session
+
+    @staticmethod
+    def cookie_jar(cookies: list) -> RequestsCookieJar:
+        """Browser cookies (Playwright dicts) as a jar for one article's requests."""
+        jar = RequestsCookieJar()
+        for cookie in cookies:
+            jar.set(cookie['name'], cookie['value'], domain=cookie['domain'])
+        return jar
+
+    def get(self, url: str, cookies: Optional[RequestsCookieJar] = None, **kwargs) -> requests.Response:
+        return self.session.get(url, cookies=cookies, **kwargs)
+
+    def _pools(self) -> list:
+        pools = []
+        for adapter in {id(a): a for a in self.session.adapters.values()}.values():
+            for manager in [adapter.poolmanager, *adapter.proxy_manager.values()]:
+                with manager.pools.lock:
+                    pools.extend(manager.pools._container.values())
+        return pools
+
+    def report_stats(self):
+        """Adds the requests sent and connections opened since the last call to the run metrics."""
+        sent = opened = 0
+        with self._lock:
+            for pool in self._pools():
+                done_requests, done_connections = self._reported.get(pool, (0, 0))
+                sent += pool.num_requests - done_requests
+                opened += pool.num_connections - done_connections
+                self._reported[pool] = (pool.num_requests, pool.num_connections)
+        if sent:
+            metrics.incr("assets.http_requests", sent)
+            metrics.incr("assets.http_connections", opened)
+
+    def close(self):
+        self.report_stats()
+        self.session.close()
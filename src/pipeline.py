@@ -0,0 +1,58 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, List
+
+from src.metrics import metrics
+from src.logger import logger
+
+class PostProcessPipeline:
+    """
+    Bounded background stage for work that no longer needs the browser
+    (image download, HTML/Markdown writing, record commits).
+    At most `depth` jobs may be queued or running; submit() blocks the browser
+    thread when the stage is full, which is the backpressure.
+    """
+    def __init__(self, workers: int, depth: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="postprocess")
+        self._slots = threading.BoundedSemaphore(max(depth, workers))
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._failures: list = []
+
+    def submit(self, job: Callable[[], object]):
+        """Queues a job; the job returns a failure dict or None."""
+        started = time.perf_counter()
+        self._slots.acquire()
+        metrics.incr("pipeline.backpressure_seconds", time.perf_counter() - started)
+        metrics.incr("pipeline.jobs")
+        future = self._executor.submit(self._run, job)
+        with self._lock:
+            self._futures.append(future)
+
+    def _run(self, job):
+        try:
+            failure = job()
+            if failure:
+                with self._lock:
+                    self._failures.append(failure)
+        except Exception as e:
+            logger.critical(f"Post-processing job crashed: {e}", exc_info=True)
+        finally:
+            self._slots.release()
+
+    def drain(self) -> list:
+        """Waits for every submitted job and returns (and clears) their failures."""
+        while True:
+            with self._lock:
+                pending = [f for f in self._futures if not f.done()]
+                if not pending:
+                    self._futures.clear()
+                    failures, self._failures = self._failures, []
+                    return failures
+            for future in pending:
+                future.result()
+
+    def shutdown(self):
+        self.drain()
+        self._executor.shutdown(wait=True)
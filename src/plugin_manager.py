@@ -1,5 +1,6 @@
-from typing import List
+from typing import List, Optional
 from .interfaces import IPlugin
+from .utils import validate_and_fix_url
 from .plugins.x_com import XComPlugin
 
 class PluginManager:
@@ -19,3 +20,24 @@ class PluginManager:
             if plugin.can_handle(url):
                 return plugin
         raise ValueError(f"No plugin found capable of handling URL: {url}")
+
+    def canonical_key(self, url: str) -> str:
+        """
+        Dedupe key for a URL: the handling plugin's canonical_key() after the
+        usual input clean-up (quotes, missing scheme). URLs no plugin handles
+        are their own key.
+        """
+        fixed = validate_and_fix_url(url) or (url or "").strip()
+        for plugin in self.plugins:
+            if plugin.can_handle(fixed):
+                return plugin.canonical_key(fixed)
+        return fixed
+
+_default_manager: Optional[PluginManager] = None
+
+def canonical_key(url: str) -> str:
+    """PluginManager.canonical_key on a shared registry (for records, CLI dedupe and the maintenance scripts)."""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = PluginManager()
+    return _default_manager.canonical_key(url)
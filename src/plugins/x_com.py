@@ -1,15 +1,192 @@
 import os
 import re
+import copy
+import threading
 from urllib.parse import urlparse
-from typing import List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
+import soupsieve
 from bs4 import BeautifulSoup, Tag
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, Template
 
 from ..interfaces import IPlugin, IExtractor
 from ..models import ArticleMetadata
-from ..utils import sanitize_filename, get_filename_from_url
+from ..utils import sanitize_filename, get_filename_from_url, make_soup
 from ..config import ConfigLoader
 from ..logger import logger
+from .x_graphql import graphql_extractor, is_graphql_tweet_url
+
+# The status ID is the same on x.com, twitter.com and every /photo/, /analytics ... sub-page
+STATUS_ID = re.compile(r'/status/(\d+)')
+HANDLE = re.compile(r'(@\w+)')
+# Page titles look like `Someone on X: "text" / X`
+TITLE_QUOTE = re.compile(r'[:：]\s*["“](.+?)["”]\s*/\s*X$')
+META_REFRESH = re.compile("refresh", re.I)
+UNSAFE_TAGS = ["script", "noscript", "iframe", "object", "embed"]
+# Placeholder rendered into the template for each article, then swapped for the cleaned tree
+ARTICLE_SLOT = '<div data-article-slot="{}"></div>'
+
+# In-browser counterpart of XExtractor's anchoring: returns a small document with
+# the page title, the CSS rules that apply to the kept articles, and the article
+# itself (the one linking to the status ID, else every top-level article).
+EXTRACT_JS = """({selectors, tweetId}) => {
+    let articles = [];
+    for (const sel of selectors) {
+        try { articles = Array.from(document.querySelectorAll(sel)); } catch (e) { continue; }
+        if (articles.length) break;
+    }
+    if (!articles.length) return null;
+
+    const links = (a) => Array.from(a.querySelectorAll("a[href]"), l => l.getAttribute("href"));
+    const main = tweetId && articles.find(a => links(a).some(h => h.includes("/status/" + tweetId)));
+    let kept = main ? [main] : articles;
+    kept = kept.filter(a => !kept.some(o => o !== a && o.contains(a)));
+
+    // Pseudo-classes/elements never match a static snapshot; test the element part only
+    const applies = (selector) => {
+        const bare = selector.replace(/::?[\\w-]+(\\([^)]*\\))?/g, "") || "*";
+        try {
+            return kept.some(a => a.matches(bare) || a.querySelector(bare));
+        } catch (e) {
+            return true;
+        }
+    };
+    const css = [];
+    for (const style of document.querySelectorAll("style")) {
+        let rules;
+        try { rules = style.sheet ? style.sheet.cssRules : []; } catch (e) { continue; }
+        for (const rule of rules) {
+            if (rule.selectorText === undefined || applies(rule.selectorText)) css.push(rule.cssText);
+        }
+    }
+
+    const title = document.createElement("title");
+    title.textContent = document.title;
+    return "<html><head>" + title.outerHTML + "<style>" + css.join("\\n") + "</style></head><body>"
+        + kept.map(a => a.outerHTML).join("\\n") + "</body></html>";
+}"""
+
+# Adaptive scrolling's stop check: true once the URL's tweet is mounted and the
+# author's own thread below it has ended, i.e. a tweet by someone else follows the
+# author's last one with no "Show more" cell in between. Further scrolling would
+# only load other people's replies.
+THREAD_COMPLETE_JS = """({selectors, tweetId}) => {
+    let articles = [];
+    for (const sel of selectors) {
+        try { articles = Array.from(document.querySelectorAll(sel)); } catch (e) { continue; }
+        if (articles.length) break;
+    }
+    articles = articles.filter(a => !articles.some(o => o !== a && o.contains(a)));
+    // Author and ID from the timestamp link, which points at the tweet itself
+    const own = (a) => {
+        const time = a.querySelector("a[href*='/status/'] time");
+        const link = time ? time.closest("a") : a.querySelector("a[href*='/status/']");
+        const match = link && /^(?:https?:\\/\\/[^\\/]+)?\\/([^\\/]+)\\/status\\/(\\d+)/.exec(link.getAttribute("href"));
+        return match ? {author: match[1].toLowerCase(), id: match[2]} : null;
+    };
+    const tweets = articles.map(own);
+    const index = tweets.findIndex(t => t && t.id === tweetId);
+    if (index < 0) return false;
+    let last = index, next = -1;
+    for (let i = index + 1; i < tweets.length; i++) {
+        if (!tweets[i]) continue;
+        if (tweets[i].author !== tweets[index].author) { next = i; break; }
+        last = i;
+    }
+    if (next < 0) return false;
+    const FOLLOWING = Node.DOCUMENT_POSITION_FOLLOWING;
+    for (const el of document.querySelectorAll("[role='button'], [role='link'], button")) {
+        if (!/^\\s*show (more|additional|replies)/i.test(el.textContent) || articles.some(a => a.contains(el))) continue;
+        if ((articles[last].compareDocumentPosition(el) & FOLLOWING)
+                && (el.compareDocumentPosition(articles[next]) & FOLLOWING)) return false;
+    }
+    return true;
+}"""
+
+# Run before scrolling and after every step: the top-level articles not reported
+# yet, as [[tweet id, outerHTML], ...] in page order. X unmounts tweets scrolled
+# past, so the caller keeps these snapshots rather than relying on the final DOM.
+# A node React re-uses for another tweet is reported again under its new ID.
+HARVEST_JS = """({selectors}) => {
+    let articles = [];
+    for (const sel of selectors) {
+        try { articles = Array.from(document.querySelectorAll(sel)); } catch (e) { continue; }
+        if (articles.length) break;
+    }
+    const reported = window.__xdlHarvested || (window.__xdlHarvested = new WeakMap());
+    const fresh = [];
+    for (const a of articles) {
+        if (articles.some(o => o !== a && o.contains(a))) continue;
+        // The timestamp links to the tweet itself; other status links may be quotes
+        const time = a.querySelector("a[href*='/status/'] time");
+        const link = time ? time.closest("a") : a.querySelector("a[href*='/status/']");
+        const match = link && /\\/status\\/(\\d+)/.exec(link.getAttribute("href"));
+        if (!match || reported.get(a) === match[1]) continue;
+        reported.set(a, match[1]);
+        fresh.push([match[1], a.outerHTML]);
+    }
+    return fresh;
+}"""
+
+class ExtractionContext:
+    """
+    Per-process state shared by every XExtractor: the configured selector
+    lists compiled once with soupsieve, and the Jinja environment with its
+    cached article template. Nothing here depends on earlier pages: fallbacks
+    are always tried in configured priority order.
+    """
+    def __init__(self, selectors: dict):
+        self.selectors = selectors
+        self._compiled: Dict[str, List[Tuple[str, Any]]] = {}
+        for key, value in selectors.items():
+            compiled = []
+            for sel in ([value] if isinstance(value, str) else value or []):
+                try:
+                    compiled.append((sel, soupsieve.compile(sel)))
+                except Exception as e:
+                    logger.warning(f"Ignoring invalid selector for '{key}': {sel} ({e})")
+            self._compiled[key] = compiled
+
+        templates_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+        self.env = Environment(loader=FileSystemLoader(templates_dir))
+        self._template: Optional[Template] = None
+
+    @property
+    def template(self) -> Template:
+        if self._template is None:
+            self._template = self.env.get_template("article.html")
+        return self._template
+
+    def ordered(self, key: str) -> List[Tuple[str, Any]]:
+        """(selector, compiled) for a key, in config order."""
+        return self._compiled.get(key, [])
+
+    def select_one(self, element, key: str):
+        """First match of the highest-priority selector that matches."""
+        for _, compiled in self.ordered(key):
+            found = compiled.select_one(element)
+            if found:
+                return found
+        return None
+
+    def select_all(self, element, key: str) -> list:
+        """All matches of the first of the key's selectors that matches anything."""
+        for _, compiled in self.ordered(key):
+            found = compiled.select(element)
+            if found:
+                return found
+        return []
+
+_context: Optional[ExtractionContext] = None
+_context_lock = threading.Lock()
+
+def extraction_context() -> ExtractionContext:
+    """The process-wide ExtractionContext, built from selectors.x_com on first use."""
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = ExtractionContext(ConfigLoader().get("selectors.x_com", {}))
+    return _context
 
 class XComPlugin(IPlugin):
     @property
@@ -38,76 +215,139 @@ class XComPlugin(IPlugin):
             return False
 
     def get_wait_selector(self) -> str:
-        selectors = ConfigLoader().get("selectors.x_com", {})
+        selectors = extraction_context().selectors
         # Prefer specific tweet content, fallback to generic article
         return selectors.get("article", "article")
 
-    def get_extractor(self, html_content: str, url: str) -> IExtractor:
-        return XExtractor(html_content, url)
+    def get_extractor(self, html_content: str, url: str, harvested: Optional[List[str]] = None) -> IExtractor:
+        return XExtractor(html_content, url, harvested)
+
+    def get_route_filter_rules(self) -> dict:
+        # Video, fonts and tracking are never needed to extract the article DOM
+        return ConfigLoader().get("network.x_com", {})
+
+    def get_extraction_script(self, url: str) -> Optional[Tuple[str, Any]]:
+        selectors = [sel for sel, _ in extraction_context().ordered("article")] or ["article"]
+        match = STATUS_ID.search(url)
+        return EXTRACT_JS, {"selectors": selectors, "tweetId": match.group(1) if match else ""}
+
+    def get_scroll_done_script(self, url: str) -> Optional[Tuple[str, Any]]:
+        match = STATUS_ID.search(urlparse(url).path)
+        if not match:
+            return None
+        selectors = [sel for sel, _ in extraction_context().ordered("article")] or ["article"]
+        return THREAD_COMPLETE_JS, {"selectors": selectors, "tweetId": match.group(1)}
+
+    def get_harvest_script(self, url: str) -> Optional[Tuple[str, Any]]:
+        selectors = [sel for sel, _ in extraction_context().ordered("article")] or ["article"]
+        return HARVEST_JS, {"selectors": selectors}
+
+    def is_data_response(self, url: str) -> bool:
+        return is_graphql_tweet_url(url)
+
+    def get_data_extractor(self, payloads: List[bytes], url: str) -> Optional[IExtractor]:
+        match = STATUS_ID.search(urlparse(url).path)
+        return graphql_extractor(payloads, url, match.group(1) if match else "", extraction_context().template)
+
+    def canonical_key(self, url: str) -> str:
+        """"x_com:<status id>" for tweets; other pages by path (handles are case-insensitive)."""
+        match = STATUS_ID.search(urlparse(url).path)
+        if match:
+            return f"{self.name}:{match.group(1)}"
+        return f"{self.name}:{urlparse(url).path.rstrip('/').lower()}"
 
 class XExtractor(IExtractor):
-    def __init__(self, html_content: str, url: str):
-        self.soup = BeautifulSoup(html_content, "html.parser")
+    def __init__(self, html_content: str, url: str, harvested: Optional[List[str]] = None):
+        # The only parse of the page; everything below works on this tree
+        page = make_soup(html_content)
         self.url = url
-        self.selectors = ConfigLoader().get("selectors.x_com", {})
-
-        # Initialize Jinja2
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_src = os.path.dirname(current_dir)
-        templates_dir = os.path.join(project_src, "templates")
-        self.env = Environment(loader=FileSystemLoader(templates_dir))
+        # Compiled selectors and the template, shared by every extractor in the process
+        self.context = extraction_context()
+        self.selectors = self.context.selectors
 
         # --- Precise Anchoring Logic ---
         self.main_article = None
         self.tweet_id = None
+        # True when main_article was found by the URL's status ID (not just the first article)
+        self.anchored = False
 
         # 1. Extract Tweet ID from URL
-        match = re.search(r'/status/(\d+)', url)
+        match = STATUS_ID.search(url)
         if match:
             self.tweet_id = match.group(1)
 
-        candidates = self._select_all(self.soup, "article")
+        # Articles harvested while scrolling replace the (virtualised) final DOM's;
+        # title and styles still come from the page
+        self.harvested = bool(harvested)
+        if harvested:
+            self.articles = self._select_all(make_soup("".join(harvested)), "article")
+        else:
+            self.articles = self._select_all(page, "article")
+        self.styles = page.find_all("style")
 
         if self.tweet_id:
-            for art in candidates:
-                if art.find("a", href=re.compile(f"/status/{self.tweet_id}")):
+            status_path = f"/status/{self.tweet_id}"
+            for art in self.articles:
+                if art.find("a", href=lambda href: href and status_path in href):
                     self.main_article = art
+                    self.anchored = True
                     break
 
-        if not self.main_article and candidates:
-            self.main_article = candidates[0]
+        if not self.main_article and self.articles:
+            self.main_article = self.articles[0]
+
+        self.soup = self._trim(page)
+
+    def _trim(self, page: BeautifulSoup) -> BeautifulSoup:
+        """
+        Moves what extraction reads (title, styles, articles) into a small
+        document of its own, so the rest of the page DOM is freed once the
+        constructor returns.
+        """
+        trimmed = make_soup("")
+        moved = set()
+        keep = ([page.title] if page.title else []) + self.styles + self.articles
+        for tag in keep:
+            # Nested matches travel with the ancestor already moved
+            if any(id(parent) in moved for parent in tag.parents):
+                continue
+            moved.add(id(tag))
+            trimmed.append(tag.extract())
+        return trimmed
 
     def _select_one(self, element, selector_key: str):
         """Try multiple selectors from config for a single element."""
-        selectors = self.selectors.get(selector_key)
-        if not selectors:
-            return None
-        if isinstance(selectors, str):
-            selectors = [selectors]
-
-        for sel in selectors:
-            found = element.select_one(sel)
-            if found:
-                return found
-        return None
+        return self.context.select_one(element, selector_key)
 
     def _select_all(self, element, selector_key: str):
         """Try multiple selectors from config and return all matches for the first successful one."""
-        selectors = self.selectors.get(selector_key)
-        if not selectors:
-            return []
-        if isinstance(selectors, str):
-            selectors = [selectors]
-
-        for sel in selectors:
-            found = element.select(sel)
-            if found:
-                return found
-        return []
+        return self.context.select_all(element, selector_key)
 
     def is_valid(self) -> bool:
         return self.main_article is not None
 
+    def _handle(self, article) -> str:
+        user_div = self._select_one(article, "user_name")
+        match = HANDLE.search(user_div.get_text(separator=" ", strip=True)) if user_div else None
+        return match.group(1).lower() if match else ""
+
+    def _thread(self) -> list:
+        """
+        The main article and the same-author articles directly around it: the
+        author's own thread as X lays out a conversation (ancestors above,
+        self-replies first below). Other people's replies end the run.
+        """
+        index = next(i for i, a in enumerate(self.articles) if a is self.main_article)
+        handle = self._handle(self.main_article)
+        if not handle:
+            return [self.main_article]
+        start, end = index, index + 1
+        while start > 0 and self._handle(self.articles[start - 1]) == handle:
+            start -= 1
+        while end < len(self.articles) and self._handle(self.articles[end]) == handle:
+            end += 1
+        return self.articles[start:end]
+
     def extract_metadata_obj(self) -> ArticleMetadata:
         meta = ArticleMetadata(url=self.url)
         if not self.main_article:
@@ -124,7 +364,7 @@ class XExtractor(IExtractor):
             user_div = self._select_one(self.main_article, "user_name")
             if user_div:
                 text = user_div.get_text(separator=" ", strip=True)
-                match = re.search(r'(@\w+)', text)
+                match = HANDLE.search(text)
                 if match:
                     meta.author = match.group(1).strip('@')
                 else:
@@ -142,7 +382,7 @@ class XExtractor(IExtractor):
             if not topic:
                 page_title = self.soup.title.string if self.soup.title else ""
                 if page_title:
-                    match = re.search(r'[:：]\s*["“](.+?)["”]\s*/\s*X$', page_title)
+                    match = TITLE_QUOTE.search(page_title)
                     if match:
                         topic = match.group(1).strip()
 
@@ -169,52 +409,58 @@ class XExtractor(IExtractor):
 
         return meta
 
-    def get_clean_html(self) -> str:
-        clean_soup = BeautifulSoup(str(self.soup), "html.parser")
-
-        for tag in clean_soup(["script", "noscript", "iframe", "object", "embed"]):
+    @staticmethod
+    def _sanitize(tree):
+        """Strips active content (scripts, embeds, meta refresh, on* handlers) from a tree in place."""
+        for tag in tree(UNSAFE_TAGS):
             tag.decompose()
 
-        for meta in clean_soup.find_all("meta", attrs={"http-equiv": re.compile("refresh", re.I)}):
+        for meta in tree.find_all("meta", attrs={"http-equiv": META_REFRESH}):
             meta.decompose()
 
-        for tag in clean_soup.find_all(True):
+        for tag in [tree, *tree.find_all(True)]:
             for attr in list(tag.attrs):
                 if attr.lower().startswith("on"):
                     del tag[attr]
-
-        main_art_in_clean = None
-        if self.tweet_id:
-            candidates = self._select_all(clean_soup, "article")
-            for art in candidates:
-                if art.find("a", href=re.compile(f"/status/{self.tweet_id}")):
-                    main_art_in_clean = art
-                    break
-
-        if main_art_in_clean:
-            articles = [main_art_in_clean]
+        return tree
+
+    def get_clean_soup(self) -> BeautifulSoup:
+        """
+        Renders the article template around sanitized copies of the article
+        trees. Only the articles are copied and the page is not parsed again;
+        the rendered template shell (title, styles and one placeholder per
+        article) is parsed, and the placeholders are swapped for the copies.
+        """
+        if not self.articles:
+            return self._sanitize(copy.copy(self.soup))
+
+        if not self.anchored:
+            sources = self.articles
+        elif self.harvested:
+            sources = self._thread()
         else:
-            articles = self._select_all(clean_soup, "article")
-
-        if not articles:
-            return str(clean_soup)
-
-        article_strings = [str(a) for a in articles]
-        page_title = clean_soup.title.string if clean_soup.title else "X Article"
-
-        style_tags = clean_soup.find_all("style")
-        injected_styles = "\n".join([str(s) for s in style_tags])
+            sources = [self.main_article]
+        articles = [self._sanitize(copy.copy(a)) for a in sources]
+        page_title = self.soup.title.string if self.soup.title else "X Article"
+        injected_styles = "\n".join([str(s) for s in self.styles])
 
         try:
-            template = self.env.get_template("article.html")
-            return template.render(
-                title=page_title, 
-                articles=article_strings, 
+            rendered = self.context.template.render(
+                title=page_title,
+                articles=[ARTICLE_SLOT.format(i) for i in range(len(articles))],
                 styles=injected_styles
             )
         except Exception as e:
             logger.error(f"Template rendering failed: {e}")
-            return str(clean_soup)
+            return self._sanitize(copy.copy(self.soup))
+
+        document = make_soup(rendered)
+        for i, article in enumerate(articles):
+            document.find(attrs={"data-article-slot": str(i)}).replace_with(article)
+        return document
+
+    def get_clean_html(self) -> str:
+        return str(self.get_clean_soup())
 
     def get_content_images(self, soup: Any) -> List[Tuple[Tag, str]]:
         images = []
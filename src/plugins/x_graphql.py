@@ -0,0 +1,256 @@
+import re
+import json
+import html
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Any
+from bs4 import BeautifulSoup, Tag
+from jinja2 import Template
+
+from ..interfaces import IExtractor
+from ..models import ArticleMetadata
+from ..utils import sanitize_filename, make_soup
+from ..logger import logger
+
+# GraphQL operations whose JSON carries the tweets of a status page
+OPERATIONS = ("TweetDetail", "TweetResultByRestId")
+GRAPHQL_PATH = re.compile(r'/graphql/[^/]+/(\w+)$')
+# Leading "@a @b " of a reply, which X shows as "Replying to" instead of text
+REPLY_MENTIONS = re.compile(r'^(@\w+\s+)+')
+CREATED_AT = "%a %b %d %H:%M:%S %z %Y"
+
+@dataclass
+class Tweet:
+    """The parts of a GraphQL tweet result an archived article shows."""
+    id: str
+    author: str
+    name: str
+    user_id: str
+    created: Optional[datetime]
+    text: str
+    # (t.co url, expanded url, display url)
+    links: List[Tuple[str, str, str]] = field(default_factory=list)
+    # (image url, video url or "")
+    media: List[Tuple[str, str]] = field(default_factory=list)
+    reply_to: str = ""
+    quoted: Optional["Tweet"] = None
+    # Longform X Articles keep their body outside TweetDetail; the DOM has it
+    is_article: bool = False
+
+    @property
+    def url(self) -> str:
+        return f"https://x.com/{self.author}/status/{self.id}"
+
+    @property
+    def plain_text(self) -> str:
+        """Text as shown on X: t.co links replaced by their display URLs."""
+        text = self.text
+        for short, _, display in self.links:
+            text = text.replace(short, display)
+        return text
+
+def is_graphql_tweet_url(url: str) -> bool:
+    match = GRAPHQL_PATH.search(url.split("?", 1)[0])
+    return bool(match) and match.group(1) in OPERATIONS
+
+def _user(result: dict) -> Tuple[str, str, str]:
+    user = result.get("core", {}).get("user_results", {}).get("result", {})
+    legacy, core = user.get("legacy", {}), user.get("core", {})
+    # Newer responses moved screen_name/name from legacy to core
+    return (core.get("screen_name") or legacy.get("screen_name") or "Unknown",
+            core.get("name") or legacy.get("name") or "",
+            user.get("rest_id", ""))
+
+def _best_video(media: dict) -> str:
+    variants = [v for v in media.get("video_info", {}).get("variants", []) if v.get("content_type") == "video/mp4"]
+    if not variants:
+        return ""
+    return max(variants, key=lambda v: v.get("bitrate", 0))["url"]
+
+def _image_url(media_url: str) -> str:
+    # pbs.twimg.com/media/<id>.jpg -> the sized variant the web client loads
+    base, dot, ext = media_url.rpartition(".")
+    if not dot or "/media/" not in base:
+        return media_url
+    return f"{base}?format={ext}&name=large"
+
+def parse_tweet(result: dict) -> Optional[Tweet]:
+    """Tweet from one tweet_results.result object (unwrapping visibility wrappers); None for tombstones."""
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet", {})
+    legacy = result.get("legacy")
+    if not result.get("rest_id") or not legacy:
+        return None
+    author, name, user_id = _user(result)
+    note = result.get("note_tweet", {}).get("note_tweet_results", {}).get("result", {})
+    entities = note.get("entity_set") or legacy.get("entities", {})
+    text = note.get("text") or legacy.get("full_text", "")
+
+    media = legacy.get("extended_entities", {}).get("media") or legacy.get("entities", {}).get("media") or []
+    for item in media:
+        # The trailing t.co link X appends for attached media
+        text = text.replace(item.get("url", "\0"), "")
+    if legacy.get("in_reply_to_status_id_str"):
+        text = REPLY_MENTIONS.sub("", text)
+
+    try:
+        created = datetime.strptime(legacy.get("created_at", ""), CREATED_AT)
+    except ValueError:
+        created = None
+    quoted = result.get("quoted_status_result", {}).get("result")
+    return Tweet(
+        id=result["rest_id"],
+        author=author,
+        name=name,
+        user_id=user_id or legacy.get("user_id_str", ""),
+        created=created,
+        text=html.unescape(text).strip(),
+        links=[(u["url"], u.get("expanded_url") or u["url"], u.get("display_url") or u["url"])
+               for u in entities.get("urls", []) if u.get("url")],
+        media=[(_image_url(m["media_url_https"]), _best_video(m)) for m in media if m.get("media_url_https")],
+        reply_to=legacy.get("in_reply_to_status_id_str") or "",
+        quoted=parse_tweet(quoted) if quoted else None,
+        is_article="article" in result,
+    )
+
+def collect_tweets(payloads: Iterable[Any]) -> Dict[str, Tweet]:
+    """
+    Every tweet in the given GraphQL response bodies (bytes, str or parsed
+    JSON), by ID. The JSON is walked generically rather than by instruction
+    path, so new timeline layouts keep working as long as tweets still appear
+    as tweet_results / tweetResult objects.
+    """
+    tweets: Dict[str, Tweet] = {}
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ("tweet_results", "tweetResult") and isinstance(value, dict) and "result" in value:
+                    tweet = parse_tweet(value["result"])
+                    if tweet is not None:
+                        tweets.setdefault(tweet.id, tweet)
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    for payload in payloads:
+        try:
+            walk(json.loads(payload) if isinstance(payload, (bytes, str)) else payload)
+        except ValueError as e:
+            logger.debug(f"Skipping unreadable GraphQL payload: {e}")
+    return tweets
+
+def build_thread(tweets: Dict[str, Tweet], focal_id: str) -> List[Tweet]:
+    """
+    The author's own thread around the focal tweet: its same-author ancestors,
+    the tweet itself, then the chain of the author's replies to it. Other
+    people's replies are left out. Empty when the focal tweet is missing.
+    """
+    focal = tweets.get(focal_id)
+    if focal is None:
+        return []
+    thread = [focal]
+    seen = {focal.id}
+    parent = tweets.get(focal.reply_to)
+    while parent is not None and parent.user_id == focal.user_id and parent.id not in seen:
+        thread.insert(0, parent)
+        seen.add(parent.id)
+        parent = tweets.get(parent.reply_to)
+
+    replies: Dict[str, List[Tweet]] = {}
+    for tweet in tweets.values():
+        if tweet.user_id == focal.user_id and tweet.reply_to:
+            replies.setdefault(tweet.reply_to, []).append(tweet)
+    current = focal
+    while replies.get(current.id):
+        current = min(replies[current.id], key=lambda t: int(t.id))
+        if current.id in seen:
+            break
+        thread.append(current)
+        seen.add(current.id)
+    return thread
+
+def render_text(tweet: Tweet) -> str:
+    """Tweet text as HTML: escaped, t.co links expanded, line breaks kept."""
+    text = html.escape(tweet.text)
+    for short, expanded, display in tweet.links:
+        text = text.replace(short, f'<a href="{html.escape(expanded)}">{html.escape(display)}</a>')
+    return text.replace("\n", "<br>")
+
+def render_tweet(tweet: Tweet, tag: str = "article") -> str:
+    """One tweet as markup using the same data-testids as X's DOM (so selectors and styles carry over)."""
+    parts = [f'<{tag} data-tweet-id="{tweet.id}">',
+             f'<div data-testid="User-Name"><span>{html.escape(tweet.name)}</span> '
+             f'<a href="https://x.com/{tweet.author}">@{tweet.author}</a></div>']
+    if tweet.created:
+        stamp = tweet.created.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        parts.append(f'<a href="{tweet.url}"><time datetime="{stamp}">{tweet.created:%Y-%m-%d %H:%M}</time></a>')
+    if tweet.text:
+        parts.append(f'<div data-testid="tweetText">{render_text(tweet)}</div>')
+    for image, video in tweet.media:
+        parts.append(f'<div data-testid="tweetPhoto"><img src="{html.escape(image)}"></div>')
+        if video:
+            parts.append(f'<p><a href="{html.escape(video)}">Video</a></p>')
+    if tweet.quoted:
+        parts.append(render_tweet(tweet.quoted, "blockquote"))
+    parts.append(f"</{tag}>")
+    return "".join(parts)
+
+class GraphQLExtractor(IExtractor):
+    """
+    Extractor for a status page built from the GraphQL responses the page
+    loaded instead of its DOM: the author's thread around the focal tweet,
+    rendered into the same article template.
+    """
+    def __init__(self, thread: List[Tweet], tweet_id: str, url: str, template: Template):
+        self.thread = thread
+        self.tweet_id = tweet_id
+        self.url = url
+        self.template = template
+        self.main_tweet = next((t for t in thread if t.id == tweet_id), None)
+
+    def is_valid(self) -> bool:
+        return self.main_tweet is not None
+
+    def _topic(self) -> str:
+        first_line = self.main_tweet.plain_text.split("\n", 1)[0] if self.main_tweet else ""
+        return first_line[:100] or "Image_Only"
+
+    def extract_metadata_obj(self) -> ArticleMetadata:
+        tweet = self.main_tweet
+        meta = ArticleMetadata(url=self.url, title=self._topic(), author=tweet.author)
+        if tweet.created:
+            meta.date = tweet.created.strftime("%Y-%m-%d")
+        # Same scheme as XExtractor, so both sources name folders alike
+        meta.folder_name = sanitize_filename(f"{meta.author}_{meta.title[:40]}_{self.tweet_id}_{meta.date}")
+        return meta
+
+    def get_clean_soup(self) -> BeautifulSoup:
+        title = f'{self.main_tweet.name} on X: "{self._topic()}" / X'
+        return make_soup(self.template.render(
+            title=html.escape(title),
+            articles=[render_tweet(t) for t in self.thread],
+            styles=""
+        ))
+
+    def get_clean_html(self) -> str:
+        return str(self.get_clean_soup())
+
+    def get_content_images(self, soup: Any) -> List[Tuple[Tag, str]]:
+        images = []
+        for article in soup.find_all("article"):
+            for img in article.find_all("img"):
+                src = img.get("src")
+                if src and "profile_images" not in src:
+                    images.append((img, src))
+        return images
+
+def graphql_extractor(payloads: Iterable[Any], url: str, tweet_id: str, template: Template) -> Optional[GraphQLExtractor]:
+    """A GraphQLExtractor for the status, or None when the payloads lack it (or it is an X Article)."""
+    if not tweet_id:
+        return None
+    thread = build_thread(collect_tweets(payloads), tweet_id)
+    if not thread or any(t.is_article for t in thread):
+        return None
+    return GraphQLExtractor(thread, tweet_id, url, template)
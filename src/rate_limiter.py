@@ -0,0 +1,128 @@
+import time
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from src.config import Config
+from src.metrics import metrics
+from src.logger import logger
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts with AIMD: every successful request
+    adds `increase` req/s (up to max_rate), every throttle signal multiplies the
+    rate by `decrease` (down to min_rate).
+    """
+    def __init__(self, rate: float, burst: float = 1, min_rate: float = None, max_rate: float = None,
+                 increase: float = 0.05, decrease: float = 0.5, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase = increase
+        self.decrease = decrease
+        self.clock = clock
+        self.tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Takes one token and returns how long the caller must wait before using it."""
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+
+    def scale(self, factor: float):
+        with self._lock:
+            self.rate *= factor
+            self.min_rate *= factor
+            self.max_rate *= factor
+
+class RateLimiter:
+    """
+    Shared per-host limiter for navigations and asset fetches.
+    Hosts come from `rate_limits` in config.yaml; a configured host also covers
+    its subdomains (x.com -> www.x.com). Unconfigured hosts are not limited.
+    """
+    def __init__(self, limits: Optional[dict] = None, clock=time.monotonic):
+        self._buckets: Dict[str, TokenBucket] = {
+            host.lower(): TokenBucket(clock=clock, **settings)
+            for host, settings in (limits or {}).items()
+        }
+
+    def _key(self, url: str) -> Optional[str]:
+        host = (urlparse(url).hostname or "").lower()
+        while host:
+            if host in self._buckets:
+                return host
+            if "." not in host:
+                break
+            host = host.split(".", 1)[1]
+        return None
+
+    def reserve(self, url: str) -> float:
+        """Returns the wait (seconds) before requesting url; for callers that sleep themselves (async)."""
+        key = self._key(url)
+        if key is None:
+            return 0.0
+        delay = self._buckets[key].reserve()
+        if delay:
+            metrics.incr(f"ratelimit.wait_seconds.{key}", delay)
+        return delay
+
+    def acquire(self, url: str):
+        """Blocks until url's host may be requested."""
+        delay = self.reserve(url)
+        if delay:
+            time.sleep(delay)
+
+    def on_response(self, url: str, status: int):
+        key = self._key(url)
+        if key is None:
+            return
+        if status in THROTTLE_STATUSES:
+            self._throttle(key, f"HTTP {status}")
+        elif status < 400:
+            self._buckets[key].on_success()
+
+    def on_blocked(self, url: str):
+        """Reports a PlatformBlockedError (CAPTCHA, suspension wall) for url's host."""
+        key = self._key(url)
+        if key is not None:
+            self._throttle(key, "platform block")
+
+    def _throttle(self, key: str, reason: str):
+        bucket = self._buckets[key]
+        bucket.on_throttle()
+        metrics.incr(f"ratelimit.throttled.{key}")
+        logger.warning(f"Rate limit for {key} lowered to {bucket.rate:.2f} req/s ({reason}).")
+
+    def scale(self, factor: float):
+        """Splits the configured budget, e.g. across shard processes."""
+        for bucket in self._buckets.values():
+            bucket.scale(factor)
+
+    def rates(self) -> Dict[str, float]:
+        return {key: bucket.rate for key, bucket in self._buckets.items()}
+
+# Initialize Singleton
+rate_limiter = RateLimiter(Config.RATE_LIMITS)
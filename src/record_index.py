@@ -0,0 +1,134 @@
+import re
+import gc
+import bisect
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Union
+
+# Only real dates take part in range queries ('NoDate' and friends do not)
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+# Canonical keys of tweets are "x_com:<status id>" (XComPlugin.canonical_key)
+TWEET_KEY_PREFIX = "x_com:"
+
+def tweet_id_of(key: str) -> str:
+    """Status ID of a tweet's canonical key ("" for anything else)."""
+    if not key or not key.startswith(TWEET_KEY_PREFIX):
+        return ""
+    tweet_id = key[len(TWEET_KEY_PREFIX):]
+    return tweet_id if tweet_id.isdigit() else ""
+
+class RecordIndex:
+    """
+    In-memory secondary indexes over RecordManager records: url sets per value
+    of status, author, source and published_date, the URL(s) of each canonical
+    key (tweet_id queries go through it), plus the sorted distinct published
+    dates for range queries. Maintained on
+    every change so lookups never scan the full record set.
+    """
+    FIELDS = ('status', 'author', 'source', 'key', 'tweet_id', 'published_date')
+    # Low-cardinality fields indexed as value -> set of URLs
+    _SET_FIELDS = ('status', 'author', 'source', 'published_date')
+
+    def __init__(self):
+        self._by: Dict[str, Dict[str, Set[str]]] = {field: defaultdict(set) for field in self._SET_FIELDS}
+        # canonical key -> URL, or a set of URLs when several URLs share one key
+        # (a set per key would cost ~200 bytes for every record of the library)
+        self._keys: Dict[str, Union[str, Set[str]]] = {}
+        self._dates = []
+
+    @staticmethod
+    def value(record: dict, field: str) -> str:
+        if field == 'tweet_id':
+            return tweet_id_of(record.get('key'))
+        return record.get(field) or ""
+
+    def _add_key(self, key: str, url: str):
+        current = self._keys.get(key)
+        if current is None:
+            self._keys[key] = url
+        elif isinstance(current, set):
+            current.add(url)
+        elif current != url:
+            self._keys[key] = {current, url}
+
+    def add(self, record: dict):
+        url = record['url']
+        for field in self._SET_FIELDS:
+            value = self.value(record, field)
+            bucket = self._by[field][value]
+            if field == 'published_date' and not bucket and _DATE.match(value):
+                bisect.insort(self._dates, value)
+            bucket.add(url)
+        self._add_key(record.get('key') or "", url)
+
+    def remove(self, record: dict):
+        url = record['url']
+        for field in self._SET_FIELDS:
+            value = self.value(record, field)
+            bucket = self._by[field].get(value)
+            if bucket is None:
+                continue
+            bucket.discard(url)
+            if not bucket:
+                del self._by[field][value]
+                if field == 'published_date':
+                    i = bisect.bisect_left(self._dates, value)
+                    if i < len(self._dates) and self._dates[i] == value:
+                        del self._dates[i]
+        key = record.get('key') or ""
+        current = self._keys.get(key)
+        if isinstance(current, set):
+            current.discard(url)
+            if len(current) == 1:
+                self._keys[key] = current.pop()
+        elif current == url:
+            del self._keys[key]
+
+    def rebuild(self, records: Iterable[dict]):
+        """Bulk build at load time; same result as add() per record, with the per-call overhead hoisted."""
+        self.__init__()
+        indexes = [(field, self._by[field]) for field in self._SET_FIELDS]
+        add_key = self._add_key
+        # Millions of new set entries would otherwise trigger repeated full GC passes
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for record in records:
+                url = record['url']
+                for field, index in indexes:
+                    index[record.get(field) or ""].add(url)
+                add_key(record.get('key') or "", url)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self._dates = sorted(d for d in self._by['published_date'] if _DATE.match(d))
+
+    def in_range(self, record: dict, since: Optional[str], until: Optional[str]) -> bool:
+        date = record.get('published_date') or ""
+        if not _DATE.match(date):
+            return False
+        return (not since or date >= since) and (not until or date <= until)
+
+    def urls(self, field: str, value: str) -> Set[str]:
+        if field in ('key', 'tweet_id'):
+            current = self._keys.get(TWEET_KEY_PREFIX + value if field == 'tweet_id' else value)
+            if current is None:
+                return set()
+            return current if isinstance(current, set) else {current}
+        return self._by[field].get(value, set())
+
+    def urls_between(self, since: Optional[str] = None, until: Optional[str] = None) -> Set[str]:
+        """URLs whose published_date is within [since, until] (ISO dates compare as strings)."""
+        lo = bisect.bisect_left(self._dates, since) if since else 0
+        hi = bisect.bisect_right(self._dates, until) if until else len(self._dates)
+        urls = set()
+        for date in self._dates[lo:hi]:
+            urls |= self._by['published_date'][date]
+        return urls
+
+    def counts(self, field: str) -> Dict[str, int]:
+        if field == 'key':
+            return {key: len(v) if isinstance(v, set) else 1 for key, v in self._keys.items()}
+        if field == 'tweet_id':
+            return {tweet_id_of(key): len(v) if isinstance(v, set) else 1
+                    for key, v in self._keys.items() if tweet_id_of(key)}
+        return {value: len(urls) for value, urls in self._by[field].items()}
@@ -1,20 +1,134 @@
 import csv
 import os
+import json
+import time
 import shutil
+import sys
+import heapq
+import sqlite3
+import threading
+from collections import Counter
+from collections.abc import Mapping
+from itertools import islice
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, Optional, Set
+from .config import Config
+from .record_index import RecordIndex, TWEET_KEY_PREFIX
+from .plugin_manager import canonical_key
 from .logger import logger
 
+RECORD_FIELDS = (
+    'url', 'status', 'title', 'author', 'published_date',
+    'folder_name', 'local_path', 'timestamp', 'failure_reason', 'source', 'key'
+)
+# Low-cardinality values shared by many rows; interned so each is stored once
+_INTERNED_FIELDS = ('status', 'author', 'published_date', 'source')
+_FIELD_SET = frozenset(RECORD_FIELDS)
+
+class Record(Mapping):
+    """
+    One stored row in __slots__ form, read like the dict rows it replaces
+    (record['title'], record.get(...), dict(record)). About a fifth of the size
+    of the equivalent dict; repeated values (status, author, date, source) are interned
+    and the usual local_path ("<folder>/<folder>.html") is derived, not stored.
+    Records are immutable: changes go through RecordManager.update_record_memory.
+    """
+    __slots__ = RECORD_FIELDS
+
+    @classmethod
+    def from_mapping(cls, data) -> "Record":
+        record = cls.__new__(cls)
+        for field in RECORD_FIELDS:
+            value = data.get(field) or ""
+            if field in _INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            object.__setattr__(record, field, value)
+        if record.local_path and record.local_path == record._default_local_path():
+            object.__setattr__(record, 'local_path', None)
+        return record
+
+    def _default_local_path(self) -> str:
+        return f"{self.folder_name}/{self.folder_name}.html"
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Record":
+        return cls.from_mapping(dict(zip(RECORD_FIELDS, row)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Record is immutable; use RecordManager.update_record_memory")
+
+    def __getitem__(self, key: str):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        value = getattr(self, key)
+        return self._default_local_path() if value is None else value
+
+    def get(self, key: str, default=None):
+        return self[key] if key in _FIELD_SET else default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RECORD_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RECORD_FIELDS)
+
+    def to_dict(self) -> dict:
+        return {field: self[field] for field in RECORD_FIELDS}
+
+    copy = to_dict
+
+    def __reduce__(self):
+        # Shard workers and pickling callers get a plain row back
+        return (Record.from_mapping, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"Record({self.to_dict()!r})"
+
+JOURNAL_SUFFIX = ".journal"
+# A journal renamed aside while a compaction writes the new snapshot
+COMPACTING_SUFFIX = ".journal.compacting"
+# Columns records.db keeps SQL indexes on (filters of SQLiteRecordQuery; tweet_id goes through key)
+SQL_INDEXED_FIELDS = ('status', 'author', 'published_date', 'key')
+# published_date values taking part in range queries (RecordIndex's _DATE)
+SQL_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*"
+
 class RecordManager:
-    def __init__(self, csv_path: str = "output/records.csv"):
+    """
+    CSV record store. Every change is appended to `<csv>.journal` (one JSON
+    line per record, fsync batched); the journal is compacted into records.csv
+    in the background every `compact_every` changes and at close(). Loading
+    replays the journal over the last CSV snapshot, so a crash loses at most
+    the last unsynced batch.
+    """
+    def __init__(self, csv_path: str = "output/records.csv", fsync_batch: Optional[int] = None,
+                 fsync_interval: Optional[float] = None, compact_every: Optional[int] = None):
         self.csv_path = csv_path
-        self.fieldnames = [
-            'url', 'status', 'title', 'author', 'published_date', 
-            'folder_name', 'local_path', 'timestamp', 'failure_reason', 'source'
-        ]
-        self._records: Dict[str, dict] = {}
-        self._ensure_csv_exists()
+        self.journal_path = csv_path + JOURNAL_SUFFIX
+        self.fsync_batch = fsync_batch or Config.RECORDS_FSYNC_BATCH
+        self.fsync_interval = fsync_interval if fsync_interval is not None else Config.RECORDS_FSYNC_INTERVAL
+        self.compact_every = compact_every or Config.RECORDS_COMPACT_EVERY
+        self.fieldnames = list(RECORD_FIELDS)
+        self._records: Dict[str, Record] = {}
+        # URLs changed since the last pop_dirty_records() (incremental indexing)
+        self._dirty = set()
+        # Guards memory + disk when several browser contexts save concurrently
+        self._lock = threading.RLock()
+        self._journal = None
+        self._journal_entries = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compactor: Optional[threading.Thread] = None
+        # Loaded records differ from records.csv (schema migration, key backfill)
+        self._snapshot_stale = False
+        # Secondary indexes for query()/count_by()
+        self._index = RecordIndex()
+        self._open_store()
         self._load_all_to_memory()
+        self._backfill_keys()
+        self._index.rebuild(self._records.values())
+
+    def _open_store(self):
+        self._ensure_csv_exists()
 
     def _ensure_csv_exists(self):
         """Initializes the CSV file with headers if it doesn't exist."""
@@ -29,45 +143,75 @@ class RecordManager:
                 logger.error(f"Failed to initialize CSV: {e}")
 
     def _load_all_to_memory(self):
-        """Loads records into memory with automatic schema migration."""
-        if not os.path.exists(self.csv_path):
-            return
+        """Loads the CSV snapshot, replays the journal over it, with automatic schema migration."""
+        needs_migration = False
+        if os.path.exists(self.csv_path):
+            try:
+                loaded_records, needs_migration = self._read_csv()
+                if loaded_records is not None:
+                    self._records = loaded_records
+                    logger.info(f"Loaded {len(self._records)} records.")
+            except Exception as e:
+                logger.error(f"Failed to load records: {e}")
+                self._handle_corruption()
 
-        try:
-            needs_migration = False
-            loaded_records = {}
-            
-            with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
-                f.seek(0, os.SEEK_END)
-                if f.tell() == 0: return
-                f.seek(0)
-
-                reader = csv.DictReader(f)
-                
-                # Check if we need to migrate (missing local_path or other fields)
-                if reader.fieldnames:
-                    missing_fields = set(self.fieldnames) - set(reader.fieldnames)
-                    if missing_fields:
-                        logger.warning(f"Schema mismatch. Missing fields: {missing_fields}. Migrating...")
-                        needs_migration = True
-
-                for row in reader:
-                    url = row.get('url')
-                    if url:
-                        # Defensive Filtering: Keep only known fields to prevent DictWriter errors
-                        filtered_row = {field: row.get(field, "") for field in self.fieldnames}
-                        loaded_records[url] = filtered_row
-            
-            self._records = loaded_records
-            logger.info(f"Loaded {len(self._records)} records.")
+        # Into memory only: another process (e.g. helper.py stats during a batch)
+        # may own the journal, so compaction is left to the owner's close()
+        replayed = self._replay_journals()
+        if replayed:
+            logger.info(f"Replayed {replayed} journaled changes.")
+        if needs_migration:
+            self._mark_snapshot_stale()
+            logger.info("Database schema migrated to latest version.")
+
+    def _replay_journals(self) -> int:
+        """Applies journal lines (an interrupted compaction's first) in write order."""
+        replayed = 0
+        for path in (self.csv_path + COMPACTING_SUFFIX, self.journal_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last line from a crash mid-write
+                        logger.warning(f"Skipping unreadable journal line in {path}")
+                        continue
+                    url = record.get('url')
+                    if url and record.get('_deleted'):
+                        self._records.pop(url, None)
+                        replayed += 1
+                    elif url:
+                        self._records[url] = Record.from_mapping(record)
+                        replayed += 1
+        return replayed
+
+    def _read_csv(self):
+        """Parses the CSV into (url -> record, needs_schema_migration); (None, False) for an empty file."""
+        needs_migration = False
+        loaded_records = {}
+        
+        with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0: return None, False
+            f.seek(0)
+
+            reader = csv.DictReader(f)
             
-            if needs_migration:
-                self._commit()
-                logger.info("Database schema migrated to latest version.")
-                
-        except Exception as e:
-            logger.error(f"Failed to load records: {e}")
-            self._handle_corruption()
+            # Check if we need to migrate (missing local_path or other fields)
+            if reader.fieldnames:
+                missing_fields = set(self.fieldnames) - set(reader.fieldnames)
+                if missing_fields:
+                    logger.warning(f"Schema mismatch. Missing fields: {missing_fields}. Migrating...")
+                    needs_migration = True
+
+            for row in reader:
+                url = row.get('url')
+                if url:
+                    # Defensive Filtering: Keep only known fields to prevent DictWriter errors
+                    loaded_records[url] = Record.from_mapping(row)
+        return loaded_records, needs_migration
 
     def _handle_corruption(self):
         """Backs up corrupted file and starts fresh."""
@@ -77,19 +221,45 @@ class RecordManager:
             logger.warning(f"⚠️ Database backup created: {backup_name}")
             self._records = {}
 
+    def _backfill_keys(self):
+        """Gives rows written before canonical keys existed their key (one-time rewrite)."""
+        missing = [record for record in self._records.values() if not record.key]
+        if not missing:
+            return
+        for record in missing:
+            self._records[record.url] = Record.from_mapping({**record.to_dict(), 'key': canonical_key(record.url)})
+        self._mark_snapshot_stale()
+        logger.info(f"Added canonical keys to {len(missing)} records.")
+
+    def save_records(self, records: list):
+        """Bulk save (e.g. merged shard results): memory, then a single compaction."""
+        with self._lock:
+            for record in records:
+                self.update_record_memory(record)
+            if records:
+                self._commit()
+
+    def _mark_snapshot_stale(self):
+        """records.csv is rewritten from memory at close(), by whoever owns the store."""
+        self._snapshot_stale = True
+
     def is_downloaded(self, url: str) -> bool:
-        record = self._records.get(url)
-        return record is not None and record.get('status') == 'success'
+        """True if this URL, or any URL with the same canonical key, was downloaded successfully."""
+        with self._lock:
+            record = self._records.get(url)
+            if record is not None and record.status == 'success':
+                return True
+            return any(self._records[other].status == 'success'
+                       for other in self._index.urls('key', canonical_key(url)) if other in self._records)
 
     def save_record(self, data: dict):
-        """Standard atomic save (updates memory and commits to disk)."""
+        """Standard save: updates memory and journals the change (O(1) disk work)."""
         self.update_record_memory(data)
-        self._commit()
 
-    def update_record_memory(self, data: dict):
-        """Updates memory cache only (for batch operations)."""
+    def update_record_memory(self, data: dict) -> bool:
+        """Updates the memory cache and journals the change; returns False if the change was refused."""
         url = data.get('url')
-        if not url: return
+        if not url: return False
 
         # Date and Time Logic (with legacy support)
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -113,33 +283,471 @@ class RecordManager:
             'local_path': data.get('local_path', ''),
             'timestamp': timestamp,
             'failure_reason': data.get('failure_reason', ''),
-            'source': data.get('source', 'cli')
+            'source': data.get('source', 'cli'),
+            'key': data.get('key') or canonical_key(url)
         }
 
         # Preservation Logic
-        existing = self._records.get(url)
-        if existing and existing['status'] == 'success' and new_record['status'] == 'failed':
+        with self._lock:
+            existing = self._records.get(url)
+            if existing and existing['status'] == 'success' and new_record['status'] == 'failed':
+                return False
+
+            if existing:
+                self._index.remove(existing)
+            new_record = Record.from_mapping(new_record)
+            self._records[url] = new_record
+            self._index.add(new_record)
+            self._dirty.add(url)
+            self._journal_record(new_record)
+        return True
+
+    def remove_record(self, url: str) -> bool:
+        """Deletes a record (e.g. its folder is gone); returns False if it did not exist."""
+        with self._lock:
+            existing = self._records.pop(url, None)
+            if existing is None:
+                return False
+            self._index.remove(existing)
+            self._dirty.discard(url)
+            self._journal_record({'url': url, '_deleted': True})
+        return True
+
+    def _journal_record(self, record: dict):
+        """Appends one change to the journal; fsync every `fsync_batch` lines or `fsync_interval` seconds."""
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+                if self._journal.tell() and not self._ends_with_newline():
+                    # Close off a torn last line (crash mid-write) so this change stays readable
+                    self._journal.write("\n")
+            self._journal.write(json.dumps(dict(record), ensure_ascii=False) + "\n")
+            self._journal.flush()
+            self._journal_entries += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_journal()
+        except Exception as e:
+            logger.error(f"Journal write failed: {e}")
             return
-        
-        self._records[url] = new_record
+        if self._journal_entries >= self.compact_every:
+            self._compact_in_background()
 
-    def _commit(self):
-        """Atomic write to disk."""
+    def _ends_with_newline(self) -> bool:
+        with open(self.journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _sync_journal(self):
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _rotate_journal(self) -> Optional[str]:
+        """Moves the live journal aside for compaction; new changes start a fresh journal."""
+        if self._journal is not None:
+            self._sync_journal()
+            self._journal.close()
+            self._journal = None
+        self._journal_entries = 0
+        if not os.path.exists(self.journal_path):
+            return None
+        rotated = self.csv_path + COMPACTING_SUFFIX
+        if os.path.exists(rotated):
+            # Leftover of an interrupted compaction: keep its lines ahead of ours
+            with open(rotated, 'a', encoding='utf-8') as out, open(self.journal_path, 'r', encoding='utf-8') as src:
+                shutil.copyfileobj(src, out)
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, rotated)
+        return rotated
+
+    def _compact_in_background(self):
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            rotated = self._rotate_journal()
+            snapshot = list(self._records.values())
+            self._snapshot_stale = False
+            self._compactor = threading.Thread(target=self._write_snapshot, args=(snapshot, rotated),
+                                               name="records-compaction", daemon=True)
+            self._compactor.start()
+
+    def _write_snapshot(self, records: list, rotated: Optional[str]):
+        """Atomically replaces records.csv, then drops the journal lines it now contains."""
         temp_path = self.csv_path + ".tmp"
         try:
             with open(temp_path, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=self.fieldnames)
                 writer.writeheader()
-                writer.writerows(self._records.values())
+                writer.writerows(records)
+                f.flush()
+                os.fsync(f.fileno())
             os.replace(temp_path, self.csv_path)
+            if rotated and os.path.exists(rotated):
+                os.remove(rotated)
         except Exception as e:
             logger.error(f"Commit failed: {e}")
 
+    def _commit(self):
+        """Synchronous compaction: writes every record to records.csv and clears the journal."""
+        with self._lock:
+            self._wait_for_compaction()
+            rotated = self._rotate_journal()
+            self._write_snapshot(list(self._records.values()), rotated)
+            self._snapshot_stale = False
+
+    def _wait_for_compaction(self):
+        compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+        self._compactor = None
+
+    def pop_dirty_records(self) -> list:
+        """Returns records changed since the previous call and resets the change set."""
+        with self._lock:
+            dirty = [self._records[url] for url in self._dirty if url in self._records]
+            self._dirty.clear()
+        return dirty
+
     def get_stats(self) -> dict:
-        total = len(self._records)
-        success = sum(1 for r in self._records.values() if r['status'] == 'success')
-        failed = sum(1 for r in self._records.values() if r['status'] == 'failed')
-        return {"total": total, "success": success, "failed": failed}
+        with self._lock:
+            by_status = self._index.counts('status')
+            total = len(self._records)
+        return {"total": total, "success": by_status.get('success', 0), "failed": by_status.get('failed', 0)}
+
+    def _candidates(self, since: Optional[str], until: Optional[str], filters: dict) -> Optional[Set[str]]:
+        """URLs matching every indexed filter (None when nothing is filtered)."""
+        unknown = set(filters) - set(RecordIndex.FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter on {sorted(unknown)}; indexed fields: {RecordIndex.FIELDS}")
+        sets = [self._index.urls(field, value) for field, value in filters.items() if value is not None]
+        if not sets:
+            return self._index.urls_between(since, until) if since or until else None
+        sets.sort(key=len)
+        urls = sets[0].intersection(*sets[1:])
+        if since or until:
+            # Cheaper to check the few matches than to union every date in the range
+            urls = {url for url in urls if self._index.in_range(self._records[url], since, until)}
+        return urls
+
+    def _matching(self, since, until, filters) -> Iterable[dict]:
+        candidates = self._candidates(since, until, filters)
+        if candidates is None:
+            return list(self._records.values())
+        return [self._records[url] for url in candidates if url in self._records]
+
+    def query(self, since: Optional[str] = None, until: Optional[str] = None, order_by: Optional[str] = None,
+              descending: bool = False, offset: int = 0, limit: Optional[int] = None, **filters) -> list:
+        """
+        Records matching the indexed filters (status, author, source, key,
+        tweet_id, published_date) and the published_date range [since, until].
+        Results are unordered unless order_by names a record field; offset/limit paginate.
+        """
+        with self._lock:
+            records = self._matching(since, until, filters)
+        end = offset + limit if limit is not None else None
+        if order_by:
+            key = lambda r: RecordIndex.value(r, order_by)
+            if end is not None:
+                top = heapq.nlargest(end, records, key=key) if descending else heapq.nsmallest(end, records, key=key)
+                return top[offset:]
+            return sorted(records, key=key, reverse=descending)[offset:]
+        return list(islice(records, offset, end))
+
+    def count(self, since: Optional[str] = None, until: Optional[str] = None, **filters) -> int:
+        with self._lock:
+            candidates = self._candidates(since, until, filters)
+            return len(self._records) if candidates is None else len(candidates)
+
+    def count_by(self, field: str, since: Optional[str] = None, until: Optional[str] = None, **filters) -> Dict[str, int]:
+        """Record counts grouped by one field, optionally within a filtered subset."""
+        with self._lock:
+            if field in RecordIndex.FIELDS and not since and not until and all(v is None for v in filters.values()):
+                return self._index.counts(field)
+            records = self._matching(since, until, filters)
+        return dict(Counter(RecordIndex.value(r, field) for r in records))
+
+    def get_all_records(self) -> Iterator[Record]:
+        """
+        Lazily yields every record. Only the list of references is snapshotted
+        (8 bytes per row), so concurrent saves are safe and no row is copied.
+        """
+        with self._lock:
+            snapshot = list(self._records.values())
+        return iter(snapshot)
+
+    def export_csv(self, path: Optional[str] = None):
+        """Writes every record to a CSV file (defaults to this store's own CSV)."""
+        path = path or self.csv_path
+        temp_path = path + ".tmp"
+        with self._lock:
+            self._wait_for_compaction()
+            with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=self.fieldnames)
+                writer.writeheader()
+                writer.writerows(self._records.values())
+            os.replace(temp_path, path)
+
+    def close(self):
+        """Compacts any journaled changes into records.csv and closes the journal."""
+        with self._lock:
+            if self._journal_entries or self._snapshot_stale or os.path.exists(self.journal_path) \
+                    or os.path.exists(self.csv_path + COMPACTING_SUFFIX):
+                self._commit()
+            else:
+                self._wait_for_compaction()
+
+class SQLiteRecordManager(RecordManager):
+    """
+    RecordManager backed by SQLite (WAL mode) instead of a rewritten CSV.
+    save_record upserts one row, so a batch costs O(1) disk work per URL rather
+    than O(n). The in-memory cache and the public API are unchanged.
+
+    On first open an existing records.csv next to the database is imported
+    once; with `export_csv` the CSV is rewritten from the database on close()
+    for tools that still read it.
+    """
+    def __init__(self, db_path: str = "output/records.db", csv_path: Optional[str] = None, export_csv: bool = False):
+        self.db_path = db_path
+        self.export_on_close = export_csv
+        self._conn: Optional[sqlite3.Connection] = None
+        super().__init__(csv_path or os.path.splitext(db_path)[0] + ".csv")
+
+    def _open_store(self):
+        """Opens (or creates) the database; the CSV is only a migration source here."""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        # Several browser-context threads share the connection; self._lock serializes them
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{field} TEXT" if field != 'url' else "url TEXT PRIMARY KEY" for field in self.fieldnames)
+        with self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS records ({columns})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+            # Databases from older versions lack newer columns (e.g. key); rows are backfilled after load
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(records)")}
+            for field in self.fieldnames:
+                if field not in existing:
+                    self._conn.execute(f"ALTER TABLE records ADD COLUMN {field} TEXT")
+            for field in SQL_INDEXED_FIELDS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS records_{field} ON records ({field})")
+
+    def _load_all_to_memory(self):
+        if not self._get_meta("csv_migrated"):
+            self._migrate_from_csv()
+        cursor = self._conn.execute(f"SELECT {', '.join(self.fieldnames)} FROM records")
+        self._records = {row[0]: Record.from_row(row) for row in cursor}
+        logger.info(f"Loaded {len(self._records)} records.")
+
+    def _migrate_from_csv(self):
+        """One-time import of the legacy records.csv (schema-migrated by the CSV loader)."""
+        if os.path.exists(self.csv_path):
+            try:
+                self._records = self._read_csv()[0] or {}
+            except Exception as e:
+                logger.error(f"Failed to read {self.csv_path} for migration: {e}")
+                self._handle_corruption()
+        # Changes the CSV backend journaled but never compacted
+        self._replay_journals()
+        if self._records:
+            self._commit()
+            logger.info(f"Migrated {len(self._records)} records from {self.csv_path} to {self.db_path}")
+        if os.path.exists(self.csv_path):
+            if self.export_on_close:
+                logger.warning(f"{self.db_path} is now the record store; {self.csv_path} is only rewritten "
+                               f"from it at the end of each run (records.export_csv).")
+            else:
+                logger.warning(f"{self.db_path} is now the record store; {self.csv_path} will no longer be "
+                               f"updated. Set records.export_csv: true to keep it in sync.")
+        for path in (self.journal_path, self.csv_path + COMPACTING_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('csv_migrated', ?)",
+                               (datetime.now().isoformat(),))
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _journal_record(self, record: dict):
+        """Rows are upserted by save_record/_commit; SQLite's WAL is the journal."""
+
+    def _upsert_sql(self) -> str:
+        columns = ", ".join(self.fieldnames)
+        placeholders = ", ".join("?" for _ in self.fieldnames)
+        updates = ", ".join(f"{f} = excluded.{f}" for f in self.fieldnames if f != 'url')
+        # Same preservation rule as update_record_memory, enforced by the database too
+        return (f"INSERT INTO records ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(url) DO UPDATE SET {updates} "
+                f"WHERE NOT (records.status = 'success' AND excluded.status = 'failed')")
+
+    def _row(self, record: dict) -> tuple:
+        return tuple(record.get(field, "") for field in self.fieldnames)
+
+    def save_record(self, data: dict):
+        """Updates memory and upserts the single affected row."""
+        url = data.get('url')
+        if not url: return
+        with self._lock:
+            self.update_record_memory(data)
+            try:
+                with self._conn:
+                    self._conn.execute(self._upsert_sql(), self._row(self._records[url]))
+            except Exception as e:
+                logger.error(f"Commit failed: {e}")
+
+    def save_records(self, records: list):
+        """Updates memory and upserts only the affected rows, in one transaction."""
+        with self._lock:
+            urls = [record['url'] for record in records if self.update_record_memory(record)]
+            try:
+                with self._conn:
+                    self._conn.executemany(self._upsert_sql(), (self._row(self._records[url]) for url in urls))
+            except Exception as e:
+                logger.error(f"Commit failed: {e}")
+
+    def remove_record(self, url: str) -> bool:
+        with self._lock:
+            removed = super().remove_record(url)
+            if removed:
+                try:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM records WHERE url = ?", (url,))
+                except Exception as e:
+                    logger.error(f"Commit failed: {e}")
+        return removed
+
+    def _mark_snapshot_stale(self):
+        """Rewritten at once: SQLite has no journal another process could lose."""
+        self._commit()
+
+    def _commit(self):
+        """Makes the database mirror memory (bulk edits: sync, shard merges, deletions)."""
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM records")
+                    self._conn.executemany(self._upsert_sql(), (self._row(r) for r in self._records.values()))
+            except Exception as e:
+                logger.error(f"Commit failed: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            if self.export_on_close:
+                self.export_csv()
+            self._conn.close()
+            self._conn = None
+
+class SQLiteRecordQuery:
+    """
+    Read-only query()/count()/count_by() answered by SQL on records.db's
+    indexes, for one-off lookups such as `helper.py query`: nothing is loaded
+    into memory, so a query on a large library does not pay for a full store
+    load. Filters and results match RecordManager.query.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+    @classmethod
+    def open(cls, csv_path: str) -> Optional["SQLiteRecordQuery"]:
+        """
+        A query view over the records.db beside `csv_path`, or None when that
+        database is not the complete store (missing, from an older schema, or
+        records.csv not imported yet); callers then load the store instead.
+        """
+        db_path = os.path.splitext(csv_path)[0] + ".db"
+        if not os.path.exists(db_path):
+            return None
+        view = None
+        try:
+            view = cls(db_path)
+            columns = {row[1] for row in view._conn.execute("PRAGMA table_info(records)")}
+            migrated = view._conn.execute("SELECT value FROM store_meta WHERE key = 'csv_migrated'").fetchone()
+            if migrated and set(RECORD_FIELDS) <= columns:
+                return view
+        except sqlite3.Error as e:
+            logger.debug(f"{db_path} cannot be queried directly: {e}")
+        if view:
+            view.close()
+        return None
+
+    @staticmethod
+    def _where(since: Optional[str], until: Optional[str], filters: dict) -> tuple:
+        unknown = set(filters) - set(RecordIndex.FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter on {sorted(unknown)}; indexed fields: {RecordIndex.FIELDS}")
+        clauses, params = [], []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            if field == 'tweet_id':
+                field, value = 'key', TWEET_KEY_PREFIX + value
+            if value:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+            else:
+                clauses.append(f"({field} IS NULL OR {field} = '')")
+        if since or until:
+            clauses.append("published_date GLOB ?")
+            params.append(SQL_DATE_GLOB)
+            if since:
+                clauses.append("published_date >= ?")
+                params.append(since)
+            if until:
+                clauses.append("published_date <= ?")
+                params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _value_sql(field: str) -> str:
+        """SQL for RecordIndex.value(record, field)."""
+        if field == 'tweet_id':
+            return f"CASE WHEN key GLOB '{TWEET_KEY_PREFIX}[0-9]*' THEN substr(key, {len(TWEET_KEY_PREFIX) + 1}) ELSE '' END"
+        if field not in RECORD_FIELDS:
+            raise ValueError(f"Unknown record field: {field}")
+        return f"COALESCE({field}, '')"
+
+    def query(self, since: Optional[str] = None, until: Optional[str] = None, order_by: Optional[str] = None,
+              descending: bool = False, offset: int = 0, limit: Optional[int] = None, **filters) -> list:
+        where, params = self._where(since, until, filters)
+        sql = f"SELECT {', '.join(RECORD_FIELDS)} FROM records{where}"
+        if order_by:
+            sql += f" ORDER BY {self._value_sql(order_by)} {'DESC' if descending else 'ASC'}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit if limit is not None else -1, offset]
+        return [Record.from_row(row) for row in self._conn.execute(sql, params)]
+
+    def count(self, since: Optional[str] = None, until: Optional[str] = None, **filters) -> int:
+        where, params = self._where(since, until, filters)
+        return self._conn.execute(f"SELECT COUNT(*) FROM records{where}", params).fetchone()[0]
+
+    def count_by(self, field: str, since: Optional[str] = None, until: Optional[str] = None, **filters) -> Dict[str, int]:
+        where, params = self._where(since, until, filters)
+        value = self._value_sql(field)
+        counts = dict(self._conn.execute(f"SELECT {value}, COUNT(*) FROM records{where} GROUP BY {value}", params))
+        if field == 'tweet_id' and not where:
+            # RecordIndex.counts lists tweets only
+            counts.pop("", None)
+        return counts
+
+    def close(self):
+        self._conn.close()
 
-    def get_all_records(self) -> list:
-        return list(self._records.values())
+def open_record_manager(csv_path: str = "output/records.csv", backend: Optional[str] = None) -> RecordManager:
+    """
+    Returns the record store configured under `records` in config.yaml.
+    `csv_path` is the classic records.csv location; the SQLite backend keeps
+    records.db beside it and imports the CSV on first use.
+    """
+    backend = backend or Config.RECORDS_BACKEND
+    if backend == "sqlite":
+        db_path = os.path.splitext(csv_path)[0] + ".db"
+        return SQLiteRecordManager(db_path, csv_path=csv_path, export_csv=Config.RECORDS_EXPORT_CSV)
+    return RecordManager(csv_path)
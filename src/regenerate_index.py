@@ -9,11 +9,14 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from src.indexer import IndexGenerator
+from src.record_manager import open_record_manager
 
 def main():
     parser = argparse.ArgumentParser(description="Regenerate index.html from existing downloads.")
     parser.add_argument("--output", "-o", default="output", help="Output directory containing downloaded articles")
     parser.add_argument("--input", "-i", default="input/urls.txt", help="Input file with URLs for sorting order")
+    parser.add_argument("--csv", default=None, help="Records path (default: <output>/records.csv); use --scan to read meta.json files instead")
+    parser.add_argument("--scan", action="store_true", help="Rebuild from meta.json files on disk (slow)")
     args = parser.parse_args()
 
     # Read URLs for sorting if available
@@ -30,7 +33,13 @@ def main():
 
     print(f"Regenerating index for {args.output}...")
     indexer = IndexGenerator(args.output, ordered_urls=urls)
-    indexer.generate()
+    records = None
+    if not args.scan:
+        # Successful records straight from the store's status index
+        manager = open_record_manager(args.csv or os.path.join(args.output, "records.csv"))
+        records = manager.query(status="success")
+        manager.close()
+    indexer.generate(records)
     print("Done.")
 
 if __name__ == "__main__":
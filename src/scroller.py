@@ -0,0 +1,213 @@
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.config import Config
+
+SCROLL_JS = "window.scrollBy(0, 1000)"
+
+# Returns [page height, matching article count, loading spinner visible]
+PROBE_JS = """(sel) => [
+    document.documentElement.scrollHeight,
+    document.querySelectorAll(sel).length,
+    !!document.querySelector("[role='progressbar']")
+]"""
+
+# Pause used by the legacy fixed mode after every scroll step
+FIXED_STEP_DELAY = 1.2
+
+class ArticleHarvest:
+    """
+    Articles snapshotted while scrolling. X virtualises long conversations and
+    drops nodes scrolled past, so the final DOM alone misses most of a long
+    thread. Snapshots are (tweet id, outerHTML) pairs, deduplicated by ID and
+    kept in first-seen (document) order; a node the page re-created replaces
+    the older copy in place.
+    """
+    def __init__(self):
+        self._articles: Dict[str, str] = {}
+
+    def add(self, snapshot) -> int:
+        """Adds one harvest script result; returns how many IDs were new."""
+        before = len(self._articles)
+        for key, html in snapshot or []:
+            self._articles[key] = html
+        return len(self._articles) - before
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def articles(self) -> List[str]:
+        return list(self._articles.values())
+
+@dataclass
+class ScrollStats:
+    """Outcome of scrolling one URL, logged for fixed vs adaptive comparison."""
+    mode: str
+    steps: int
+    elapsed: float
+    reason: str
+
+class AdaptiveScrollPolicy:
+    """
+    Stop rule for the adaptive scroll loop.
+    Scrolling ends when the plugin reports the target content complete (e.g.
+    the tweet's whole thread is loaded), when page height and article count
+    have not changed for `stable_rounds` consecutive steps (and no loading
+    spinner is visible), when `max_steps` is reached, or when the per-URL time
+    budget is spent.
+    """
+    def __init__(self, max_steps: int, time_budget: float, stable_rounds: int = 2, clock=time.monotonic):
+        self.max_steps = max_steps
+        self.time_budget = time_budget
+        self.stable_rounds = stable_rounds
+        self.clock = clock
+        self.started = clock()
+        self.steps = 0
+        self.stable = 0
+        self.complete = False
+        self._last: Optional[Tuple[int, int]] = None
+
+    def start(self, probe):
+        self._last = (probe[0], probe[1])
+
+    def over_budget(self) -> bool:
+        return self.clock() - self.started >= self.time_budget
+
+    def observe(self, probe) -> bool:
+        """Records a probe; True if the page grew or more articles appeared."""
+        current = (probe[0], probe[1])
+        progressed = current != self._last
+        self._last = current
+        return progressed
+
+    def end_step(self, progressed: bool, loading: bool):
+        self.steps += 1
+        if progressed or loading:
+            self.stable = 0
+        else:
+            self.stable += 1
+
+    def mark_complete(self, complete: bool):
+        self.complete = complete
+
+    def stop_reason(self) -> Optional[str]:
+        if self.complete:
+            return "complete"
+        if self.stable >= self.stable_rounds:
+            return "stable"
+        if self.steps >= self.max_steps:
+            return "max_steps"
+        if self.over_budget():
+            return "budget"
+        return None
+
+    def stats(self, reason: str) -> ScrollStats:
+        return ScrollStats("adaptive", self.steps, self.clock() - self.started, reason)
+
+def _policy(scroll_count: int) -> AdaptiveScrollPolicy:
+    # --scroll raises the step cap for very long threads, it never lowers it
+    return AdaptiveScrollPolicy(
+        max_steps=max(scroll_count, Config.SCROLL_MAX_STEPS),
+        time_budget=Config.SCROLL_TIME_BUDGET,
+        stable_rounds=Config.SCROLL_STABLE_ROUNDS,
+    )
+
+def _selector(wait_selector) -> str:
+    return ", ".join(wait_selector) if isinstance(wait_selector, list) else wait_selector
+
+def scroll_page(page, scroll_count: int, wait_selector, mode: str = None,
+                on_step: Optional[Callable[[], object]] = None,
+                done_script: Optional[Tuple[str, object]] = None) -> ScrollStats:
+    """
+    Scrolls a sync Playwright page using the configured (or given) mode,
+    calling on_step after every step. In adaptive mode `done_script`
+    ((js, arg), see IPlugin.get_scroll_done_script) is evaluated before the
+    first step and after each one; scrolling stops once it returns true.
+    """
+    mode = mode or Config.SCROLL_MODE
+    started = time.monotonic()
+    if mode == "fixed":
+        for _ in range(scroll_count):
+            page.evaluate(SCROLL_JS)
+            time.sleep(FIXED_STEP_DELAY)
+            if on_step:
+                on_step()
+        return ScrollStats("fixed", scroll_count, time.monotonic() - started, "fixed")
+
+    selector = _selector(wait_selector)
+    policy = _policy(scroll_count)
+    def check_done():
+        if done_script:
+            try:
+                policy.mark_complete(page.evaluate(*done_script) is True)
+            except Exception:
+                # A failing check never ends the scroll; the other stop rules still apply
+                policy.mark_complete(False)
+
+    policy.start(page.evaluate(PROBE_JS, selector))
+    check_done()
+    while (reason := policy.stop_reason()) is None:
+        page.evaluate(SCROLL_JS)
+        deadline = time.monotonic() + Config.SCROLL_SETTLE_TIMEOUT
+        progressed, loading = False, False
+        # Poll instead of sleeping a fixed interval: move on as soon as content lands
+        while True:
+            time.sleep(Config.SCROLL_POLL_INTERVAL)
+            probe = page.evaluate(PROBE_JS, selector)
+            loading = probe[2]
+            if policy.observe(probe):
+                progressed = True
+                break
+            if time.monotonic() >= deadline or policy.over_budget():
+                break
+        policy.end_step(progressed, loading)
+        check_done()
+        if on_step:
+            on_step()
+    return policy.stats(reason)
+
+async def scroll_page_async(page, scroll_count: int, wait_selector, mode: str = None,
+                            on_step: Optional[Callable[[], object]] = None,
+                            done_script: Optional[Tuple[str, object]] = None) -> ScrollStats:
+    """Async-engine twin of scroll_page (on_step is a coroutine function)."""
+    mode = mode or Config.SCROLL_MODE
+    started = time.monotonic()
+    if mode == "fixed":
+        for _ in range(scroll_count):
+            await page.evaluate(SCROLL_JS)
+            await asyncio.sleep(FIXED_STEP_DELAY)
+            if on_step:
+                await on_step()
+        return ScrollStats("fixed", scroll_count, time.monotonic() - started, "fixed")
+
+    selector = _selector(wait_selector)
+    policy = _policy(scroll_count)
+    async def check_done():
+        if done_script:
+            try:
+                policy.mark_complete(await page.evaluate(*done_script) is True)
+            except Exception:
+                policy.mark_complete(False)
+
+    policy.start(await page.evaluate(PROBE_JS, selector))
+    await check_done()
+    while (reason := policy.stop_reason()) is None:
+        await page.evaluate(SCROLL_JS)
+        deadline = time.monotonic() + Config.SCROLL_SETTLE_TIMEOUT
+        progressed, loading = False, False
+        while True:
+            await asyncio.sleep(Config.SCROLL_POLL_INTERVAL)
+            probe = await page.evaluate(PROBE_JS, selector)
+            loading = probe[2]
+            if policy.observe(probe):
+                progressed = True
+                break
+            if time.monotonic() >= deadline or policy.over_budget():
+                break
+        policy.end_step(progressed, loading)
+        await check_done()
+        if on_step:
+            await on_step()
+    return policy.stats(reason)
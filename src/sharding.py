@@ -0,0 +1,101 @@
+import os
+import copy
+import glob
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import List
+
+from src.main import XDownloader, _run_url_queue
+from src.record_manager import RecordManager
+from src.logger import logger
+from src.metrics import metrics
+from src.rate_limiter import rate_limiter
+
+SHARD_DIR_NAME = ".shards"
+
+def _shard_worker(shard_id: int, args, url_queue, records_path: str, num_shards: int = 1) -> tuple:
+    """
+    Entry point of one shard process.
+    Runs its own Chromium against the shared queue and writes outcomes to a
+    shard-local records CSV, so shards never contend on the main record store.
+    Returns (failures, metric counters, span samples).
+    """
+    logger.info(f"Shard {shard_id} started (pid {os.getpid()}).")
+    # Shards share the configured per-host budget instead of multiplying it
+    rate_limiter.scale(1 / num_shards)
+    # The coordinator already dropped downloaded URLs (_pending_urls) and this
+    # shard's store starts empty, so the per-URL is_downloaded check is skipped
+    args = copy.copy(args)
+    args.force = True
+    downloader = XDownloader(args.output, args.markdown, args.pdf, args.epub,
+                             records_path=records_path, records_backend="csv")
+    downloader.scroll_mode = getattr(args, "scroll_mode", None) or downloader.scroll_mode
+    if getattr(args, "pipeline", False):
+        downloader.enable_pipeline()
+    try:
+        num_contexts = max(1, getattr(args, "contexts", 1) or 1)
+        failures = _run_url_queue(downloader, args, url_queue, num_contexts)
+        return failures, metrics.snapshot(), metrics.span_state()
+    finally:
+        downloader.close()
+
+def _merge_shard_records(record_manager: RecordManager, shard_paths: List[str]) -> int:
+    """
+    Folds shard records into the main store in one bulk save (one CSV compaction,
+    or one SQLite transaction upserting just these rows). Returns the merged count.
+    """
+    records = []
+    for path in shard_paths:
+        records.extend(RecordManager(path).get_all_records())
+    record_manager.save_records(records)
+    for path in shard_paths:
+        os.remove(path)
+    return len(records)
+
+def run_sharded_batch(downloader: XDownloader, args, urls_to_process: List[str]) -> list:
+    """
+    Splits a batch across `args.shards` worker processes and merges their outcomes.
+    URLs are pulled one at a time from a shared queue, so a shard stuck on slow
+    pages simply takes fewer URLs while idle shards take the rest.
+    `urls_to_process` must already be filtered by _pending_urls: neither this
+    function nor the shards check the record store again.
+    Returns the combined failures.
+    """
+    record_manager = downloader.record_manager
+    failures = []
+    if not urls_to_process:
+        return failures
+
+    shard_dir = os.path.join(args.output, SHARD_DIR_NAME)
+    os.makedirs(shard_dir, exist_ok=True)
+    # Leftovers from an interrupted run are merged rather than lost
+    stale = glob.glob(os.path.join(shard_dir, "records_*.csv"))
+    if stale:
+        _merge_shard_records(record_manager, stale)
+
+    num_shards = min(args.shards, len(urls_to_process))
+    shard_paths = [os.path.join(shard_dir, f"records_{i}.csv") for i in range(num_shards)]
+    logger.info(f"Starting {num_shards} shard processes for {len(urls_to_process)} URLs...")
+
+    with Manager() as manager:
+        url_queue = manager.Queue()
+        for url in urls_to_process:
+            url_queue.put(url)
+
+        with ProcessPoolExecutor(max_workers=num_shards) as executor:
+            futures = [
+                executor.submit(_shard_worker, i, args, url_queue, shard_paths[i], num_shards)
+                for i in range(num_shards)
+            ]
+            for i, future in enumerate(futures):
+                try:
+                    shard_failures, shard_counters, shard_spans = future.result()
+                    failures.extend(shard_failures)
+                    metrics.merge(shard_counters)
+                    metrics.merge_spans(shard_spans)
+                except Exception as e:
+                    logger.error(f"Shard {i} crashed: {e}")
+
+    merged = _merge_shard_records(record_manager, [p for p in shard_paths if os.path.exists(p)])
+    logger.info(f"Merged {merged} records from {num_shards} shards.")
+    return failures
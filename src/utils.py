@@ -2,18 +2,85 @@ import os
 import re
 import hashlib
 import json
+import time
 import socket
+import threading
 import ipaddress
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
+from bs4 import BeautifulSoup, FeatureNotFound
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Page as AsyncPage
 from src.config import Config
 from src.logger import logger
+from src.metrics import metrics
+
+def _is_public(ip_str: str) -> bool:
+    ip = ipaddress.ip_address(ip_str)
+    return not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast or ip.is_unspecified)
+
+class HostResolver:
+    """
+    TTL-bounded DNS cache for the SSRF guard. A hostname resolves to the list
+    of its addresses only when every one of them is public; blocked or failed
+    lookups are cached too (for `negative_ttl`). The asset client connects to
+    these exact addresses (see network.AssetClient), so a record changing
+    between the check and the connect cannot point a download at a private IP.
+    """
+    def __init__(self, ttl: float = 300.0, negative_ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        # hostname -> (expires_at, safe addresses or None)
+        self._cache: Dict[str, Tuple[float, Optional[List[str]]]] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, hostname: str) -> Optional[List[str]]:
+        try:
+            # getaddrinfo handles IPv6 and multiple IPs
+            addr_info = socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
+        except Exception as e:
+            logger.error(f"Error resolving {hostname} for URL safety check: {e}")
+            return None
+        addresses = []
+        for family, _, _, _, sockaddr in addr_info:
+            ip_str = sockaddr[0]
+            if not _is_public(ip_str):
+                logger.warning(f"Blocked unsafe host (private/reserved IP): {hostname} -> {ip_str}")
+                return None
+            if ip_str not in addresses:
+                addresses.append(ip_str)
+        return addresses or None
+
+    def safe_addresses(self, hostname: str) -> Optional[List[str]]:
+        """The host's addresses if all are public, else None; served from the cache while fresh."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(hostname)
+        if entry is not None and entry[0] > now:
+            metrics.incr("dns.cache_hits")
+            return entry[1]
+        metrics.incr("dns.cache_misses")
+        addresses = self._resolve(hostname)
+        expires = now + (self.ttl if addresses else self.negative_ttl)
+        with self._lock:
+            if len(self._cache) >= self.max_entries and hostname not in self._cache:
+                # Oldest insertion first
+                del self._cache[next(iter(self._cache))]
+            self._cache[hostname] = (expires, addresses)
+        return addresses
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+host_resolver = HostResolver(Config.DNS_CACHE_TTL, Config.DNS_NEGATIVE_TTL)
 
 def is_safe_url(url: str) -> bool:
     """
     Check if a URL is safe for downloading to prevent SSRF.
     - Scheme must be http or https.
-    - Hostname must not resolve to a private/reserved IP address.
+    - Hostname must not resolve to a private/reserved IP address (cached, see HostResolver).
     """
     try:
         parsed = urlparse(url)
@@ -24,22 +91,28 @@ def is_safe_url(url: str) -> bool:
         if not hostname:
             return False
 
-        # Resolve hostname to IP
-        # Note: We use getaddrinfo to handle IPv6 and multiple IPs
-        addr_info = socket.getaddrinfo(hostname, None)
-        for family, _, _, _, sockaddr in addr_info:
-            ip_str = sockaddr[0]
-            ip = ipaddress.ip_address(ip_str)
-            
-            if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast or ip.is_unspecified:
-                logger.warning(f"Blocked unsafe URL (private/reserved IP): {url} -> {ip_str}")
-                return False
-        
-        return True
+        return host_resolver.safe_addresses(hostname) is not None
     except Exception as e:
         logger.error(f"Error validating URL safety: {url}. Error: {e}")
         return False
 
+_html_parser: Optional[str] = None
+
+def make_soup(markup: str) -> BeautifulSoup:
+    """
+    Parses HTML with the configured tree builder (extraction.parser), falling
+    back to the built-in html.parser when that builder is not installed.
+    """
+    global _html_parser
+    if _html_parser is None:
+        _html_parser = Config.HTML_PARSER or "html.parser"
+        try:
+            BeautifulSoup("", _html_parser)
+        except FeatureNotFound:
+            logger.warning(f"HTML parser '{_html_parser}' is not installed; using html.parser.")
+            _html_parser = "html.parser"
+    return BeautifulSoup(markup, _html_parser)
+
 def sanitize_filename(text: str) -> str:
     """
     Sanitizes a string to be safe for file systems.
@@ -117,35 +190,60 @@ def load_cookies(file_path: str) -> list:
     except (json.JSONDecodeError, UnicodeDecodeError):
         return parse_netscape_cookies(file_path)
 
+# Selector matched when X renders its "page does not exist" state
+ERROR_SELECTOR = "[data-testid='error-detail']"
+
+def _combined_wait_selector(wait_selector: str | list) -> str:
+    """Combined selector: success selectors OR error selector."""
+    if isinstance(wait_selector, list):
+        wait_selector = ", ".join(wait_selector)
+    return f"{wait_selector}, div[data-testid='tweetText'], div[data-testid='twitterArticleRichTextView'], {ERROR_SELECTOR}"
+
 def safe_navigate(page: Page, url: str, timeout: int, wait_selector: str | list):
     """
     Robust navigation.
+    Returns the main document response (may be None).
     """
     logger.info(f"Navigating to {url}...")
     
     try:
         # Use 'domcontentloaded' - 'networkidle' is too flaky on X.com
-        page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
-        
-        # 1. Handle list of selectors
-        if isinstance(wait_selector, list):
-            wait_selector = ", ".join(wait_selector)
-
-        # 2. Combined selector: success selectors OR error selector
-        error_selector = "[data-testid='error-detail']"
-        combined_selector = f"{wait_selector}, div[data-testid='tweetText'], div[data-testid='twitterArticleRichTextView'], {error_selector}"
+        response = page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
         
-        page.wait_for_selector(combined_selector, state="visible", timeout=timeout * 1000)
+        page.wait_for_selector(_combined_wait_selector(wait_selector), state="visible", timeout=timeout * 1000)
         
         # Check if we hit the error page
-        if page.locator(error_selector).is_visible():
+        if page.locator(ERROR_SELECTOR).is_visible():
             raise ValueError("Target content not found: Page does not exist (404/Deleted).")
+
+        return response
             
     except Exception as e:
         if "Target content not found" not in str(e):
             logger.warning(f"Navigation attempt failed for {url}: {e}")
         raise e
 
+async def async_safe_navigate(page: AsyncPage, url: str, timeout: int, wait_selector: str | list):
+    """
+    Coroutine twin of safe_navigate for the async engine.
+    """
+    logger.info(f"Navigating to {url}...")
+
+    try:
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout * 1000)
+
+        await page.wait_for_selector(_combined_wait_selector(wait_selector), state="visible", timeout=timeout * 1000)
+
+        if await page.locator(ERROR_SELECTOR).is_visible():
+            raise ValueError("Target content not found: Page does not exist (404/Deleted).")
+
+        return response
+
+    except Exception as e:
+        if "Target content not found" not in str(e):
+            logger.warning(f"Navigation attempt failed for {url}: {e}")
+        raise e
+
 def validate_and_fix_url(url: str) -> str | None:
     """
     Validates and attempts to fix common URL typos.
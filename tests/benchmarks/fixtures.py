@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Deterministic X.com-shaped fixtures for the benchmark suite.
+
+The saved HTML under tests/benchmarks/fixtures/ is produced by this module
+(`python3 tests/benchmarks/fixtures.py` rewrites it), so the pages only change
+when the generator does. Pages mimic the parts of a rendered X page that cost
+parse time: deep wrapper divs with long class lists, inline SVG icons, style
+and script blocks, and one <article> per tweet.
+"""
+import os
+import random
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+STATUS_ID = 1790000000000000000
+# Every fixture's focal tweet/article lives at this URL
+FIXTURE_URL = f"https://x.com/BenchUser/status/{STATUS_ID}"
+
+# name -> (kind, tweets or paragraphs, images per tweet/section)
+FIXTURE_SIZES = {
+    "tweet_small": ("thread", 1, 2),
+    "thread_medium": ("thread", 30, 1),
+    "thread_large": ("thread", 100, 2),
+    "article_longform": ("article", 80, 8),
+}
+
+_WORDS = ("latency throughput browser scroll image cache thread article render "
+          "parse network queue budget token worker shard index record fixture").split()
+_CLASSES = " ".join(f"css-{i:x}r r-{i * 7:x}q" for i in range(1, 9))
+_SVG = ('<svg viewBox="0 0 24 24" aria-hidden="true" class="r-4qtqp9 r-yyyyoo"><g>'
+        '<path d="M1.751 10c0-4.42 3.584-8 8.005-8h4.366c4.49 0 7.501 3.58 7.501 8 0 4.42-3.58 '
+        '8-8 8h-4l-3.994 3.99V18H9.756c-4.42 0-8.005-3.58-8.005-8z"></path></g></svg>')
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+def _wrap(inner: str, depth: int = 6) -> str:
+    """Nests content in X-style wrapper divs."""
+    for _ in range(depth):
+        inner = f'<div class="{_CLASSES}">{inner}</div>'
+    return inner
+
+def _image_src(image_host: str, seed: int) -> str:
+    name = hashlib.md5(str(seed).encode()).hexdigest()[:15]
+    return f"{image_host}/media/{name}.jpg"
+
+def _tweet(rng: random.Random, index: int, images: int, image_host: str, when: datetime) -> str:
+    status = STATUS_ID + index
+    media = "".join(
+        _wrap(f'<img alt="Image" draggable="true" src="{_image_src(image_host, index * 100 + n)}" class="css-9pa8cd">', 3)
+        for n in range(images)
+    )
+    actions = "".join(f'<div role="group" class="{_CLASSES}">{_SVG}<span>{rng.randint(0, 9999)}</span></div>'
+                      for _ in range(4))
+    return (
+        f'<article data-testid="tweet" role="article" tabindex="-1" class="{_CLASSES}">'
+        + _wrap(
+            '<div data-testid="User-Name"><a href="/BenchUser"><span>Bench User</span></a>'
+            f'<span>@BenchUser</span><span>·</span><a href="/BenchUser/status/{status}">'
+            f'<time datetime="{when.isoformat()}.000Z">{when:%b %d}</time></a></div>'
+            f'<img alt="" src="https://pbs.twimg.com/profile_images/1/avatar_normal.jpg">'
+            f'<div data-testid="tweetText" lang="en"><span>{_text(rng, rng.randint(20, 60))}</span></div>'
+            + media + actions
+        )
+        + "</article>"
+    )
+
+def _page(title: str, body: str) -> str:
+    styles = "\n".join(f".css-{i:x}r {{ display: flex; margin: {i}px; }}" for i in range(200))
+    scripts = "".join(f'<script nonce="n{i}">window.__INITIAL_STATE_{i}__ = {{"k": {i}}};</script>' for i in range(5))
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f"<title>{title}</title><style>{styles}</style>{scripts}</head>"
+        f'<body><div id="react-root"><main role="main">{body}</main></div></body></html>'
+    )
+
+def thread_html(tweets: int, images_per_tweet: int, image_host: str = "https://pbs.twimg.com", seed: int = 0) -> str:
+    """A conversation page: the focal tweet first, then the replies."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    body = "".join(_tweet(rng, i, images_per_tweet, image_host, start + timedelta(minutes=i)) for i in range(tweets))
+    return _page('Bench User on X: "Benchmark thread" / X', body)
+
+def article_html(paragraphs: int, images: int, image_host: str = "https://pbs.twimg.com", seed: int = 0) -> str:
+    """A longform X article: title, rich-text body with inline images."""
+    rng = random.Random(seed)
+    every = max(1, paragraphs // max(images, 1))
+    blocks = []
+    for i in range(paragraphs):
+        blocks.append(f'<div dir="auto"><span>{_text(rng, rng.randint(40, 120))}</span></div>')
+        if images and i % every == 0 and i // every < images:
+            blocks.append(_wrap(f'<img alt="Image" src="{_image_src(image_host, 10_000 + i)}">', 3))
+    body = (
+        f'<article data-testid="tweet" role="article" class="{_CLASSES}">'
+        '<div data-testid="User-Name"><span>@BenchUser</span>'
+        f'<a href="/BenchUser/status/{STATUS_ID}"><time datetime="2024-01-01T12:00:00.000Z">Jan 1</time></a></div>'
+        '<div data-testid="twitter-article-title">Benchmark longform article</div>'
+        f'<div data-testid="twitterArticleRichTextView">{"".join(blocks)}</div>'
+        "</article>"
+    )
+    return _page("Bench User on X: \"Benchmark longform article\" / X", body)
+
+def fixture_html(name: str, image_host: str = "https://pbs.twimg.com") -> str:
+    kind, size, images = FIXTURE_SIZES[name]
+    if kind == "article":
+        return article_html(size, images, image_host)
+    return thread_html(size, images, image_host)
+
+def load_fixture(name: str, image_host: str = None) -> str:
+    """Reads a saved fixture, optionally pointing its media at another host (e.g. the local asset server)."""
+    path = os.path.join(FIXTURES_DIR, f"{name}.html")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = fixture_html(name)
+    if image_host:
+        html = html.replace("https://pbs.twimg.com/media/", f"{image_host}/media/")
+    return html
+
+def make_records(count: int, folders: int = 100) -> list:
+    """RecordManager-shaped rows; folder names cycle over `folders` directories so large counts stay cheap on disk."""
+    start = datetime(2024, 1, 1)
+    records = []
+    for i in range(count):
+        when = start + timedelta(seconds=i * 37)
+        folder = f"Bench_{i % folders}"
+        records.append({
+            "url": f"https://x.com/user{i % 500}/status/{STATUS_ID + i}",
+            "title": f"Benchmark record {i}",
+            "author": f"user{i % 500}",
+            "published_date": when.strftime("%Y-%m-%d"),
+            "timestamp": when.isoformat(),
+            "status": "success" if i % 20 else "failed",
+            "folder_name": folder,
+            "local_path": f"{folder}/{folder}.html",
+            "failure_reason": "",
+        })
+    return records
+
+def make_image(size: int, seed: int = 0) -> bytes:
+    """JPEG-looking bytes of the requested size (valid SOI/EOI markers, random payload)."""
+    rng = random.Random(seed)
+    payload = rng.randbytes(max(size - 4, 0))
+    return b"\xff\xd8" + payload + b"\xff\xd9"
+
+def write_fixtures(out_dir: str = FIXTURES_DIR) -> list:
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name in FIXTURE_SIZES:
+        path = os.path.join(out_dir, f"{name}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(fixture_html(name))
+        written.append(path)
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate the saved benchmark HTML fixtures")
+    parser.add_argument("--out", default=FIXTURES_DIR, help="Output directory")
+    args = parser.parse_args()
+    for path in write_fixtures(args.out):
+        print(f"{path}: {os.path.getsize(path) // 1024} KB")
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark runner.
+
+Times the CPU and I/O hot spots of a download without touching X.com:
+XExtractor construction, get_clean_html, the full per-URL parse (time and
+peak traced memory), image localisation against the local
+asset server, Markdown conversion and IndexGenerator.generate at several
+record counts, plus the size and load time of the record store. Results are
+written as JSON so two commits can be compared:
+
+    python3 tests/benchmarks/run_benchmarks.py --output before.json
+    git checkout my-branch
+    python3 tests/benchmarks/run_benchmarks.py --output after.json --compare before.json
+
+These files are not collected by pytest (they are not named test_*.py).
+"""
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import itertools
+import statistics
+import tracemalloc
+import subprocess
+import contextlib
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(BENCH_DIR))
+for path in (PROJECT_ROOT, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from markdownify import markdownify as md
+
+from src.config import Config
+from src.logger import logger
+from src.indexer import IndexGenerator
+from src.plugins.x_com import XExtractor
+from src.main import XDownloader
+from src.rate_limiter import rate_limiter
+from src.record_manager import RecordManager, Record
+from fixtures import FIXTURE_SIZES, FIXTURE_URL, load_fixture, make_records
+from asset_server import AssetServer
+
+DEFAULT_RECORD_COUNTS = (1_000, 10_000, 100_000)
+# A benchmark counts as regressed when its median grows past this ratio
+REGRESSION_RATIO = 1.10
+
+def _time(fn, repeat: int, setup=None) -> list:
+    """Runs fn `repeat` times (after one untimed warm-up) and returns the durations."""
+    arg = setup() if setup else None
+    fn(arg) if setup else fn()
+    durations = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg) if setup else fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def _summarize(durations: list, **extra) -> dict:
+    result = {
+        "runs": len(durations),
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.fmean(durations),
+        "max": max(durations),
+    }
+    result.update(extra)
+    return result
+
+def _parse_url(html: str):
+    """Everything one URL costs in HTML parsing: the extractor and the clean document images are relinked in."""
+    extractor = XExtractor(html, FIXTURE_URL)
+    return extractor.get_clean_soup()
+
+def bench_extractor(html_by_fixture: dict, repeat: int) -> dict:
+    results = {}
+    for name, html in html_by_fixture.items():
+        results[f"extractor_init[{name}]"] = _summarize(
+            _time(lambda: XExtractor(html, FIXTURE_URL), repeat), html_bytes=len(html))
+
+        tracemalloc.start()
+        _parse_url(html)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f"parse_per_url[{name}]"] = _summarize(
+            _time(lambda: _parse_url(html), repeat), peak_bytes=peak, parser=Config.HTML_PARSER)
+
+        extractor = XExtractor(html, FIXTURE_URL)
+        results[f"get_clean_html[{name}]"] = _summarize(_time(extractor.get_clean_html, repeat))
+
+        clean_html = extractor.get_clean_html()
+        results[f"markdown[{name}]"] = _summarize(_time(lambda: md(clean_html), repeat), html_bytes=len(clean_html))
+    return results
+
+class _OfflinePage:
+    """
+    Stands in for a Playwright page: no browser and an empty cookie jar. A plain
+    class rather than a SimpleNamespace because XDownloader keys its per-page
+    state by weak reference.
+    """
+    def __init__(self):
+        self.context = SimpleNamespace(cookies=lambda: [])
+
+def bench_images(fixtures: list, repeat: int, server: AssetServer, work_dir: str) -> dict:
+    """
+    Times XDownloader._handle_images with every image served by the local asset
+    server (asset store off), then with every image already in the asset store.
+    """
+    results = {}
+    downloader = XDownloader(work_dir, records_path=os.path.join(work_dir, "records.csv"))
+    asset_store = downloader.asset_store
+    # No browser: empty cookie jar and no captured responses, so every image goes over HTTP
+    page = _OfflinePage()
+    try:
+        # The asset server is on loopback, which the SSRF guard rightly refuses
+        with patch("src.utils._is_public", return_value=True):
+            for name in fixtures:
+                html = load_fixture(name, image_host=server.base_url)
+                extractor = XExtractor(html, FIXTURE_URL)
+                counter = itertools.count()
+
+                def fresh_dir():
+                    # New article dir per run so nothing is skipped as already on disk
+                    path = os.path.join(work_dir, f"{name}_{next(counter)}")
+                    os.makedirs(path)
+                    return path
+
+                variants = [("handle_images", None)]
+                if asset_store is not None:
+                    variants.append(("handle_images_stored", asset_store))
+                for label, store in variants:
+                    downloader.asset_store = store
+                    if store is not None:
+                        # Seed the store so every timed run is served from it
+                        downloader._handle_images(page, extractor, fresh_dir())
+                    server.reset_stats()
+                    durations = _time(lambda article_dir: downloader._handle_images(page, extractor, article_dir),
+                                      repeat, setup=fresh_dir)
+                    results[f"{label}[{name}]"] = _summarize(
+                        durations,
+                        requests_per_run=server.requests // (repeat + 1),
+                        bytes_per_run=server.bytes_sent // (repeat + 1),
+                    )
+    finally:
+        downloader.close()
+    return results
+
+def bench_index(record_counts: list, repeat: int, work_dir: str) -> dict:
+    results = {}
+    output_root = os.path.join(work_dir, "index")
+    for folder in {rec["folder_name"] for rec in make_records(100)}:
+        os.makedirs(os.path.join(output_root, folder), exist_ok=True)
+    for count in record_counts:
+        records = make_records(count)
+        indexer = IndexGenerator(output_root)
+        with contextlib.redirect_stdout(io.StringIO()):
+            durations = _time(lambda: indexer.generate(records), repeat)
+        results[f"index_generate[{count}]"] = _summarize(
+            durations, index_bytes=os.path.getsize(os.path.join(output_root, "index.html")))
+    return results
+
+def _traced_bytes(build) -> tuple:
+    """Returns (object, bytes still allocated by build())."""
+    tracemalloc.start()
+    try:
+        obj = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return obj, current
+
+def bench_record_memory(record_counts: list, repeat: int, work_dir: str) -> dict:
+    """
+    Resident size of the record store before/after the compact representation:
+    plain ten-key dict rows (the old layout) vs. Record rows, plus the time and
+    traced memory of loading a full RecordManager (rows + indexes) from CSV.
+    """
+    results = {}
+    for count in record_counts:
+        # Rows as csv.DictReader yields them: fresh strings, nothing shared
+        rows = [{k: "".join(v) for k, v in row.items()} for row in make_records(count)]
+        dict_rows, dict_bytes = _traced_bytes(lambda: {r["url"]: {k: "".join(v) for k, v in r.items()} for r in rows})
+        del dict_rows
+        compact_rows, compact_bytes = _traced_bytes(
+            lambda: {r["url"]: Record.from_mapping({k: "".join(v) for k, v in r.items()}) for r in rows})
+        del compact_rows
+
+        csv_path = os.path.join(work_dir, f"records_{count}.csv")
+        seed = RecordManager(csv_path)
+        for row in rows:
+            seed.update_record_memory(row)
+        seed.close()
+        manager, store_bytes = _traced_bytes(lambda: RecordManager(csv_path))
+        manager.close()
+        results[f"record_store_load[{count}]"] = _summarize(
+            _time(lambda: RecordManager(csv_path), repeat),
+            dict_rows_bytes=dict_bytes,
+            record_rows_bytes=compact_bytes,
+            bytes_per_row_before=dict_bytes // count,
+            bytes_per_row_after=compact_bytes // count,
+            loaded_store_bytes=store_bytes,
+        )
+    return results
+
+def _git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=PROJECT_ROOT, capture_output=True,
+                                  text=True, timeout=10).stdout.strip()
+        except Exception:
+            return ""
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def compare(current: dict, baseline: dict, ratio: float = REGRESSION_RATIO) -> list:
+    """Prints median deltas against a previous run and returns the regressed benchmark names."""
+    regressed = []
+    print(f"\n{'benchmark':<40} {'before':>10} {'after':>10} {'ratio':>7}")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            print(f"{name:<40} {'-':>10} {result['median'] * 1000:>8.1f}ms {'new':>7}")
+            continue
+        change = result["median"] / before["median"] if before["median"] else float("inf")
+        flag = ""
+        if change > ratio:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {before['median'] * 1000:>8.1f}ms {result['median'] * 1000:>8.1f}ms {change:>6.2f}x{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the extraction and indexing hot paths")
+    parser.add_argument("--fixtures", default=",".join(FIXTURE_SIZES),
+                        help="Comma-separated fixture names (see fixtures.FIXTURE_SIZES)")
+    parser.add_argument("--records", default=",".join(str(n) for n in DEFAULT_RECORD_COUNTS),
+                        help="Comma-separated record counts for IndexGenerator.generate")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (after one warm-up)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Asset server latency per request (seconds)")
+    parser.add_argument("--bandwidth", type=float, default=5_000_000,
+                        help="Asset server bandwidth per connection (bytes/s, 0 = unlimited)")
+    parser.add_argument("--image-size", type=int, default=120_000, help="Bytes per served image")
+    parser.add_argument("--only", choices=["extractor", "images", "index", "records"], action="append",
+                        help="Run only these groups (repeatable)")
+    parser.add_argument("--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="Previous JSON results to compare medians against")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"Exit 1 when a median is more than {REGRESSION_RATIO:.2f}x the baseline")
+    args = parser.parse_args()
+
+    fixtures = [f for f in args.fixtures.split(",") if f]
+    record_counts = [int(n) for n in args.records.split(",") if n]
+    groups = set(args.only or ["extractor", "images", "index", "records"])
+
+    # Benchmarks measure our code, not log I/O or token-bucket sleeps
+    logger.setLevel(logging.WARNING)
+    rate_limiter._buckets = {}
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="x_bench_")
+    try:
+        if "extractor" in groups:
+            results.update(bench_extractor({name: load_fixture(name) for name in fixtures}, args.repeat))
+        if "images" in groups:
+            with AssetServer(args.latency, args.bandwidth, args.image_size) as server:
+                results.update(bench_images(fixtures, args.repeat, server, work_dir))
+        if "index" in groups:
+            results.update(bench_index(record_counts, args.repeat, work_dir))
+        if "records" in groups:
+            results.update(bench_record_memory(record_counts, args.repeat, work_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            **_git_revision(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "max_workers": Config.MAX_WORKERS,
+            "asset_server": {"latency": args.latency, "bandwidth": args.bandwidth, "image_size": args.image_size},
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressed = compare(report, json.load(f))
+        if regressed and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
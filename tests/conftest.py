@@ -1,11 +1,21 @@
 import sys
 import os
+import shutil
+import tempfile
 import pytest
 
 # Add project root to sys.path so we can import src modules
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
+# The logger opens its text and span (JSONL) files when src is first imported;
+# keep test runs out of the repo's logs/ (spawned workers inherit the variable)
+_log_dir = tempfile.mkdtemp(prefix="x_downloader_test_logs_")
+os.environ["X_DOWNLOADER_LOG_DIR"] = _log_dir
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_log_dir, ignore_errors=True)
+
 @pytest.fixture
 def mock_html_content():
     """Returns HTML content loaded from a static fixture file."""
@@ -15,3 +25,9 @@ def mock_html_content():
     )
     with open(fixture_path, "r", encoding="utf-8") as f:
         return f.read()
+
+@pytest.fixture(autouse=True)
+def unthrottled(monkeypatch):
+    """Disables the process-wide rate limiter so tests never sleep on token buckets."""
+    from src.rate_limiter import rate_limiter
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
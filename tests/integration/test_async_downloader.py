@@ -0,0 +1,94 @@
+import asyncio
+import argparse
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from src.async_downloader import AsyncXDownloader
+from src.models import ArticleMetadata, DownloadResult
+
+@pytest.fixture
+def downloader(tmp_path):
+    """Fixture to create AsyncXDownloader instance with temp output root."""
+    output_root = tmp_path / "output"
+    output_root.mkdir()
+    return AsyncXDownloader(str(output_root))
+
+def _async_page():
+    page = MagicMock()
+    page.content = AsyncMock(return_value="<html></html>")
+    page.evaluate = AsyncMock()
+    page.context.cookies = AsyncMock(return_value=[])
+    return page
+
+@patch('src.async_downloader.async_safe_navigate', new_callable=AsyncMock)
+def test_async_process_url_success(mock_navigate, downloader):
+    """Test that the async engine drives the same plugin/extractor contract."""
+    url = "https://x.com/test_success"
+    mock_plugin = MagicMock()
+    mock_extractor = MagicMock()
+    mock_meta = ArticleMetadata(url=url, title="Test", author="Author", folder_name="Author_Test")
+
+    mock_plugin.get_extractor.return_value = mock_extractor
+    mock_extractor.is_valid.return_value = True
+    mock_extractor.extract_metadata_obj.return_value = mock_meta
+    mock_extractor.get_clean_html.return_value = "<div>Content</div>"
+    mock_extractor.get_content_images.return_value = []
+
+    with patch.object(downloader, '_get_plugin', return_value=mock_plugin), \
+         patch.object(downloader.record_manager, 'save_record') as mock_save:
+        res = asyncio.run(downloader.process_url(_async_page(), url, scroll_count=0, timeout=30))
+
+    assert res is None
+    assert mock_meta.status == 'success'
+    assert mock_save.call_args[0][0]['status'] == 'success'
+
+@patch('src.async_downloader.async_safe_navigate', new_callable=AsyncMock)
+def test_async_process_url_extraction_error(mock_navigate, downloader):
+    """Test that extraction failures are recorded like in the sync engine."""
+    mock_plugin = MagicMock()
+    mock_plugin.get_extractor.return_value.is_valid.return_value = False
+
+    with patch.object(downloader, '_get_plugin', return_value=mock_plugin), \
+         patch.object(downloader.record_manager, 'save_record') as mock_save:
+        res = asyncio.run(downloader.process_url(_async_page(), "https://x.com/fail", scroll_count=0, timeout=30))
+
+    assert res.success is False
+    assert "No article content found" in res.error_msg
+    assert mock_save.call_args[0][0]['status'] == 'failed'
+
+@patch('src.async_downloader.async_playwright')
+def test_async_run_keeps_pages_in_flight(mock_playwright, downloader, tmp_path):
+    """Test that run() opens pages per context and shares one URL queue."""
+    p = MagicMock()
+    browser = MagicMock()
+    context = MagicMock()
+    mock_playwright.return_value.__aenter__ = AsyncMock(return_value=p)
+    mock_playwright.return_value.__aexit__ = AsyncMock(return_value=False)
+    p.chromium.launch = AsyncMock(return_value=browser)
+    browser.new_context = AsyncMock(return_value=context)
+    browser.close = AsyncMock()
+    context.add_cookies = AsyncMock()
+    context.new_page = AsyncMock(side_effect=lambda: _async_page())
+
+    urls = [f"https://x.com/user/status/{i}" for i in range(10)]
+    args = argparse.Namespace(
+        cookies=str(tmp_path / "missing_cookies.txt"), headless=True, scroll=0, timeout=30,
+        force=False, contexts=2, pages_per_context=3
+    )
+
+    in_flight = {"now": 0, "peak": 0}
+
+    async def fake_process(page, url, *a, **kw):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return DownloadResult(url=url, success=False, error_msg="x") if url.endswith("/9") else None
+
+    with patch.object(downloader, 'process_url', side_effect=fake_process) as mock_process:
+        failures = asyncio.run(downloader.run(args, urls))
+
+    assert sorted(c.args[1] for c in mock_process.call_args_list) == sorted(urls)
+    assert [f['url'] for f in failures] == [urls[9]]
+    assert browser.new_context.await_count == 2
+    assert context.new_page.await_count == 6
+    assert in_flight["peak"] == 6
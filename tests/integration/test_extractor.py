@@ -28,3 +28,71 @@ def test_folder_naming(mock_html_content):
     assert folder_name.startswith("TestUser_")
     assert "2024-01-01" in folder_name
     assert " " not in folder_name
+
+def test_clean_soup_keeps_only_the_anchored_article():
+    """Test that the clean document holds a sanitized copy of the URL's tweet and nothing else of the page."""
+    html = """<html><head><title>Page</title><style>.x{}</style></head><body>
+        <nav>sidebar</nav>
+        <article><a href="/someone/status/111">reply</a></article>
+        <article onclick="steal()"><a href="/someone/status/222">main</a>
+            <script>alert(1)</script><img src="https://pbs.twimg.com/media/a.jpg"></article>
+    </body></html>"""
+    extractor = XExtractor(html, "https://x.com/someone/status/222")
+    soup = extractor.get_clean_soup()
+
+    articles = soup.find_all("article")
+    assert len(articles) == 1 and "main" in articles[0].get_text()
+    assert not soup.find("script") and not articles[0].has_attr("onclick")
+    assert not soup.find("nav") and soup.title.string == "Page"
+    assert [src for _, src in extractor.get_content_images(soup)] == ["https://pbs.twimg.com/media/a.jpg"]
+    # Each call works on fresh copies, so relinking one result never leaks into the next
+    articles[0].img['src'] = "assets/a.jpg"
+    assert extractor.get_clean_html() == extractor.get_clean_html()
+    assert "pbs.twimg.com/media/a.jpg" in extractor.get_clean_html()
+
+def test_extraction_context_keeps_configured_priority():
+    """Test that compiled selector fallbacks stay in config order and invalid selectors are dropped."""
+    from bs4 import BeautifulSoup
+    from src.plugins.x_com import ExtractionContext
+
+    context = ExtractionContext({"article": ["div.old-layout", "bad[", "article"]})
+    soup = BeautifulSoup("<article>a</article><article>b</article>", "html.parser")
+
+    assert [sel for sel, _ in context.ordered("article")] == ["div.old-layout", "article"]
+    assert len(context.select_all(soup, "article")) == 2
+    assert [sel for sel, _ in context.ordered("article")] == ["div.old-layout", "article"]
+    assert context.select_one(soup, "missing") is None
+    assert context.template is context.template
+
+def test_extraction_does_not_depend_on_earlier_pages():
+    """Test that a fallback selector winning on one page never outranks the preferred one on the next."""
+    def page(body):
+        return (f'<html><head><title>t</title></head><body><article>'
+                f'<a href="/someone/status/1">link</a>{body}</article></body></html>')
+    url = "https://x.com/someone/status/1"
+    page_a = page("<h1>Fallback Title</h1>")
+    page_b = page("<h1>Body heading</h1><div data-testid='twitter-article-title'>Real Article Title</div>")
+
+    alone = XExtractor(page_b, url).extract_metadata_obj().title
+    XExtractor(page_a, url).extract_metadata_obj()
+    after_a = XExtractor(page_b, url).extract_metadata_obj().title
+
+    assert alone == after_a == "Real Article Title"
+
+def test_harvested_articles_assemble_the_authors_thread():
+    """Test that articles harvested while scrolling replace the final DOM and yield the author's self-thread."""
+    def tweet(handle, status, text):
+        return (f'<article><div data-testid="User-Name"><span>{handle}</span> <span>@{handle}</span></div>'
+                f'<a href="/{handle}/status/{status}"><time datetime="2024-01-01T00:00:00.000Z"></time></a>'
+                f'<div data-testid="tweetText">{text}</div></article>')
+    harvested = [tweet("alice", 1, "first"), tweet("alice", 2, "second"), tweet("alice", 3, "third"),
+                 tweet("bob", 4, "a reply"), tweet("alice", 5, "answering bob")]
+    # The page itself only still holds the last tweets (the rest were unmounted)
+    page = f"<html><head><title>Page</title></head><body>{harvested[3]}{harvested[4]}</body></html>"
+
+    extractor = XExtractor(page, "https://x.com/alice/status/2", harvested)
+    articles = extractor.get_clean_soup().find_all("article")
+
+    assert extractor.anchored
+    assert [a.find(attrs={"data-testid": "tweetText"}).get_text() for a in articles] == ["first", "second", "third"]
+    assert extractor.extract_metadata_obj().author == "alice"
@@ -0,0 +1,87 @@
+import os
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from src.plugins.x_com import XComPlugin
+from src.plugins.x_graphql import collect_tweets, build_thread
+from src.main import XDownloader
+
+URL = "https://x.com/alice/status/1002"
+
+@pytest.fixture
+def tweet_detail():
+    """A synthetic, hand-written TweetDetail response: alice's 4-part thread, a quoted tweet and a reply from carol."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "tweet_detail.json")
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_thread_is_the_authors_chain(tweet_detail):
+    tweets = collect_tweets([tweet_detail])
+    assert {"1001", "1002", "1003", "1004", "2001", "2002"} <= set(tweets)
+    assert [t.id for t in build_thread(tweets, "1002")] == ["1001", "1002", "1003", "1004"]
+    assert build_thread(tweets, "404") == []
+
+    focal = tweets["1002"]
+    assert focal.text.startswith("Part 2: see https://t.co/link1 & the chart")
+    assert focal.media == [("https://pbs.twimg.com/media/GabcDEF?format=jpg&name=large", "")]
+    assert focal.quoted.author == "bob"
+    # Long tweets come from note_tweet, video posts link their best mp4
+    assert tweets["1003"].text.endswith("end.")
+    assert tweets["1004"].media[0][1] == "https://video.twimg.com/556/high.mp4"
+
+def test_data_extractor_builds_article(tweet_detail):
+    extractor = XComPlugin().get_data_extractor([tweet_detail], URL)
+    assert extractor.is_valid()
+
+    meta = extractor.extract_metadata_obj()
+    assert (meta.author, meta.date) == ("alice", "2024-03-10")
+    assert meta.folder_name.startswith("alice_Part_2") and meta.folder_name.endswith("_1002_2024-03-10")
+
+    soup = extractor.get_clean_soup()
+    assert len(soup.find_all("article")) == 4
+    assert soup.find("a", href="https://example.com/post").get_text() == "example.com/post"
+    assert "Alice &amp; Co" in str(soup.title) or "Alice & Co" in soup.title.string
+    assert [src for _, src in extractor.get_content_images(soup)] == [
+        "https://pbs.twimg.com/media/GabcDEF?format=jpg&name=large",
+        "https://pbs.twimg.com/ext_tw_video_thumb/556/pu/img/thumb.jpg",
+    ]
+
+def test_data_extractor_falls_back_without_the_tweet(tweet_detail):
+    plugin = XComPlugin()
+    assert plugin.get_data_extractor([tweet_detail], "https://x.com/alice/status/404") is None
+    assert plugin.get_data_extractor([b"not json"], URL) is None
+    # X Articles keep their body outside TweetDetail
+    payload = json.loads(tweet_detail)
+    entries = payload["data"]["threaded_conversation_with_injections_v2"]["instructions"][1]["entries"]
+    entries[1]["content"]["itemContent"]["tweet_results"]["result"]["article"] = {"article_results": {}}
+    assert plugin.get_data_extractor([json.dumps(payload)], URL) is None
+
+    assert plugin.is_data_response("https://x.com/i/api/graphql/AbC-1/TweetDetail?variables=%7B%7D")
+    assert not plugin.is_data_response("https://x.com/i/api/graphql/AbC-1/HomeTimeline")
+
+@patch('src.main.Config.EXTRACTION_SOURCE', "data")
+@patch('src.main.scroll_page')
+@patch('src.main.safe_navigate')
+def test_process_url_uses_api_data_without_scrolling(mock_navigate, mock_scroll, tmp_path, tweet_detail):
+    """Test that captured TweetDetail data replaces scrolling and DOM extraction."""
+    downloader = XDownloader(str(tmp_path))
+    page = MagicMock()
+    page.context.cookies.return_value = []
+    response = MagicMock(url="https://x.com/i/api/graphql/AbC-1/TweetDetail", status=200)
+    response.request.resource_type = "xhr"
+    response.body.return_value = tweet_detail
+
+    def navigate(*args, **kwargs):
+        downloader._data_captures[page].on_response(response)
+    mock_navigate.side_effect = navigate
+
+    with patch.object(XDownloader, '_download_task', return_value=False), \
+         patch.object(downloader, '_extract_content') as mock_dom:
+        assert downloader.process_url(page, URL, scroll_count=3, timeout=30) is None
+
+    mock_scroll.assert_not_called()
+    mock_dom.assert_not_called()
+    assert downloader.record_manager.is_downloaded(URL)
+    record = next(iter(downloader.record_manager.query(tweet_id="1002")))
+    assert record['author'] == 'alice' and record['title'].startswith("Part 2: see example.com/post")
+    downloader.close()
@@ -55,3 +55,38 @@ def test_indexer_generates_pages(tmp_path):
     
     # Verify Date Rendering (Crucial Check)
     assert "2024-01-01" in content_1
+
+def test_indexer_incremental_update(tmp_path):
+    """Test that update() applies only changed records to the cached index."""
+    output_root = tmp_path / "output"
+    output_root.mkdir()
+    for name in ("Old", "New"):
+        (output_root / name).mkdir()
+
+    old = ArticleMetadata(url="http://test.com/old", title="Old Article", folder_name="Old", status="success").to_dict()
+    indexer = IndexGenerator(str(output_root))
+    indexer.generate(records=[old])
+
+    new = ArticleMetadata(url="http://test.com/new", title="New Article", folder_name="New", status="success").to_dict()
+    assert indexer.update([new]) is True
+    content = (output_root / "index.html").read_text(encoding='utf-8')
+    assert "Old Article" in content and "New Article" in content
+
+    # Failed records for unknown URLs do not trigger a re-render
+    assert indexer.update([{'url': 'http://test.com/x', 'status': 'failed'}]) is False
+
+def test_indexer_accepts_record_iterators(tmp_path):
+    """Test that lazy record iterators take the fast path, and an empty one falls back to the disk scan."""
+    output_root = tmp_path / "output"
+    (output_root / "Stored").mkdir(parents=True)
+    (output_root / "OnDisk").mkdir()
+    on_disk = ArticleMetadata(url="http://test.com/disk", title="Disk Article", folder_name="OnDisk")
+    (output_root / "OnDisk" / "meta.json").write_text(json.dumps(on_disk.to_dict()), encoding='utf-8')
+
+    stored = ArticleMetadata(url="http://test.com/s", title="Stored Article", folder_name="Stored", status="success")
+    IndexGenerator(str(output_root)).generate(records=iter([stored.to_dict()]))
+    content = (output_root / "index.html").read_text(encoding='utf-8')
+    assert "Stored Article" in content and "Disk Article" not in content
+
+    IndexGenerator(str(output_root)).generate(records=iter([]))
+    assert "Disk Article" in (output_root / "index.html").read_text(encoding='utf-8')
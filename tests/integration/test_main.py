@@ -1,4 +1,5 @@
 import os
+import threading
 import pytest
 from unittest.mock import MagicMock, patch, mock_open
 from src.main import XDownloader
@@ -71,3 +72,232 @@ def test_process_url_extraction_error(mock_navigate, downloader):
         assert res.success is False
         assert "No article content found" in res.error_msg
         assert downloader.record_manager.save_record.called
+
+@patch('src.main.IndexGenerator')
+@patch('src.main.sync_playwright')
+def test_process_urls_parallel_contexts(mock_playwright, mock_indexer, downloader, tmp_path):
+    """Test that every URL is processed exactly once across several contexts."""
+    from src.main import _process_urls_in_session
+    from src.models import DownloadResult
+    import argparse
+
+    urls = [f"https://x.com/user/status/{i}" for i in range(6)]
+    args = argparse.Namespace(
+        cookies=str(tmp_path / "missing_cookies.txt"), output=downloader.output_root,
+        headless=True, scroll=0, timeout=30, force=False, contexts=3
+    )
+
+    def fake_process(page, url, *a, **kw):
+        if url.endswith("/5"):
+            return DownloadResult(url=url, success=False, error_msg="boom")
+        return None
+
+    # MagicMock.call_count is not thread-safe; count launches from the worker threads explicitly
+    launches = []
+    chromium = mock_playwright.return_value.__enter__.return_value.chromium
+    chromium.launch.side_effect = lambda *a, **kw: launches.append(threading.current_thread().name) or MagicMock()
+
+    with patch.object(downloader, 'process_url', side_effect=fake_process) as mock_process:
+        failures = _process_urls_in_session(downloader, args, urls)
+
+    processed = sorted(c.args[1] for c in mock_process.call_args_list)
+    assert processed == sorted(urls)
+    assert [f['url'] for f in failures] == [urls[5]]
+    # One browser per context worker
+    assert len(launches) == 3 and len(set(launches)) == 3
+
+@patch('src.main.sync_playwright')
+def test_warm_session_reuses_browser_across_turns(mock_playwright, tmp_path):
+    """Test that interactive turns share one browser and refresh the index incrementally."""
+    from src.main import WarmSession
+    import argparse
+
+    args = argparse.Namespace(
+        cookies=str(tmp_path / "missing_cookies.txt"), output=str(tmp_path / "output"),
+        headless=True, scroll=0, timeout=30, force=False,
+        markdown=False, pdf=False, epub=False
+    )
+    browser = mock_playwright.return_value.start.return_value.chromium.launch.return_value
+    browser.is_connected.return_value = True
+    browser.new_context.return_value.new_page.return_value.is_closed.return_value = False
+
+    session = WarmSession(args)
+    with patch.object(session.downloader, 'process_url', return_value=None) as mock_process, \
+         patch.object(session.indexer, 'generate') as mock_generate, \
+         patch.object(session.indexer, 'update') as mock_update:
+        session.process(["https://x.com/a/status/1"])
+        session.process(["https://x.com/a/status/2"])
+
+    assert mock_process.call_count == 2
+    assert mock_playwright.return_value.start.call_count == 1
+    assert browser.new_context.call_count == 1
+    mock_generate.assert_called_once()
+    mock_update.assert_called_once()
+    session.close()
+    browser.close.assert_called_once()
+
+def test_closed_page_state_is_forgotten(downloader):
+    """Test that per-page state is keyed by the page and dropped on close, so a new page is always prepared."""
+    page, plugin = MagicMock(), MagicMock()
+    plugin.name = "x_com"
+    downloader._prepare_page(page, plugin)
+    assert page in downloader._prepared_pages and page in downloader._captures
+
+    close_handler = next(c.args[1] for c in page.on.call_args_list if c.args[0] == "close")
+    close_handler(page)
+    assert page not in downloader._prepared_pages and page not in downloader._captures
+
+    fresh = MagicMock()
+    downloader._prepare_page(fresh, plugin)
+    assert any(c.args[0] == "response" for c in fresh.on.call_args_list)
+
+@patch('src.main.Config.EXTRACTION_MODE', "browser")
+def test_extract_content_prefers_in_browser_extraction(downloader):
+    """Test that in browser mode the plugin's script result is parsed and page.content() is only the fallback."""
+    page = MagicMock()
+    page.content.return_value = "<html>whole page</html>"
+    plugin = MagicMock()
+    plugin.get_extraction_script.return_value = ("() => null", {"tweetId": "1"})
+
+    page.evaluate.return_value = "<article>only the tweet</article>"
+    downloader._extract_content(page, "https://x.com/a/status/1", plugin)
+    page.evaluate.assert_called_once_with("() => null", {"tweetId": "1"})
+    page.content.assert_not_called()
+    assert plugin.get_extractor.call_args[0][0] == "<article>only the tweet</article>"
+
+    # Script found nothing: the whole page is serialised as before
+    page.evaluate.return_value = None
+    downloader._extract_content(page, "https://x.com/a/status/1", plugin)
+    assert plugin.get_extractor.call_args[0][0] == "<html>whole page</html>"
+
+    with patch('src.main.Config.EXTRACTION_MODE', "soup"):
+        page.evaluate.reset_mock()
+        downloader._extract_content(page, "https://x.com/a/status/1", plugin)
+    page.evaluate.assert_not_called()
+
+@patch('src.main.Config.SCROLL_HARVEST', True)
+@patch('src.scroller.time.sleep')
+def test_scroll_harvests_articles_for_the_extractor(mock_sleep, downloader):
+    """Test that articles snapshotted before and during scrolling reach the extractor, deduplicated."""
+    page = MagicMock()
+    plugin = MagicMock()
+    plugin.get_harvest_script.return_value = ("harvest", {})
+    snapshots = iter([[["1", "<article>1</article>"]], [["2", "<article>2</article>"]], [], [["1", "<article>1</article>"]]])
+    page.evaluate.side_effect = lambda js, *a: next(snapshots) if js == "harvest" else None
+
+    with patch.object(downloader, 'scroll_mode', "fixed"):
+        harvested = downloader._scroll(page, "https://x.com/a/status/1", 3, plugin)
+    assert harvested == ["<article>1</article>", "<article>2</article>"]
+
+    page.evaluate.side_effect = None
+    page.evaluate.return_value = "<html></html>"
+    downloader._extract_content(page, "https://x.com/a/status/1", plugin, harvested)
+    assert plugin.get_extractor.call_args.kwargs["harvested"] == harvested
+
+@patch('tenacity.nap.time.sleep')
+def test_download_task_reports_each_throttled_attempt(mock_sleep, tmp_path):
+    """Test that a 429 reaches the rate limiter and the retry acquires a token again."""
+    from src.network import AssetClient
+    url = "https://pbs.twimg.com/media/a.jpg"
+    assert 429 not in AssetClient._build_session(1).get_adapter(url).max_retries.status_forcelist
+
+    def response(status):
+        r = MagicMock(status_code=status)
+        r.__enter__.return_value = r
+        r.iter_content.return_value = [b"image"]
+        if status >= 400:
+            import requests
+            r.raise_for_status.side_effect = requests.HTTPError(str(status))
+        return r
+
+    client = MagicMock()
+    client.get.side_effect = [response(429), response(200)]
+    with patch('src.main.is_safe_url', return_value=True), \
+         patch('src.main.rate_limiter') as limiter:
+        assert XDownloader._download_task(client, url, str(tmp_path / "a.jpg"))
+
+    assert limiter.acquire.call_count == 2
+    assert [c.args[1] for c in limiter.on_response.call_args_list] == [429, 200]
+
+def test_handle_images_prefers_browser_capture(downloader, tmp_path):
+    """Test that captured image bodies are written and only misses go over HTTP."""
+    from bs4 import BeautifulSoup
+    from src.network import AssetCapture
+
+    page = MagicMock()
+    page.context.cookies.return_value = []
+    captured_src = "https://pbs.twimg.com/media/hit.jpg"
+    missed_src = "https://pbs.twimg.com/media/miss.jpg"
+
+    capture = AssetCapture(["pbs.twimg.com"])
+    response = MagicMock(url=captured_src, status=200)
+    response.request.resource_type = "image"
+    response.body.return_value = b"browser-bytes"
+    capture.on_response(response)
+    downloader._captures[page] = capture
+
+    soup = BeautifulSoup(f'<img src="{captured_src}"><img src="{missed_src}">', "html.parser")
+    extractor = MagicMock()
+    extractor.get_clean_soup.return_value = soup
+    extractor.get_content_images.side_effect = lambda s: [(img, img['src']) for img in s.find_all("img")]
+
+    article_dir = str(tmp_path / "article")
+    with patch.object(XDownloader, '_download_task', return_value=False) as mock_download:
+        final_soup = downloader._handle_images(page, extractor, article_dir)
+
+    assert [c.args[1] for c in mock_download.call_args_list] == [missed_src]
+    srcs = [img['src'] for img in final_soup.find_all("img")]
+    assert srcs[0].startswith("assets/") and srcs[1] == missed_src
+    with open(os.path.join(article_dir, srcs[0]), "rb") as f:
+        assert f.read() == b"browser-bytes"
+
+@patch('src.main.safe_navigate')
+def test_process_url_pipeline_records_after_background_stage(mock_navigate, downloader):
+    """Test that pipelined URLs are committed only when the background stage finishes."""
+    import threading
+    url = "https://x.com/test_pipeline"
+    mock_plugin = MagicMock()
+    mock_extractor = MagicMock()
+    mock_meta = ArticleMetadata(url=url, title="Test", author="Author", folder_name="Author_Test")
+    mock_plugin.get_extractor.return_value = mock_extractor
+    mock_extractor.is_valid.return_value = True
+    mock_extractor.extract_metadata_obj.return_value = mock_meta
+
+    gate = threading.Event()
+    def slow_localize(*args, **kwargs):
+        gate.wait(2)
+        return MagicMock()
+
+    downloader.enable_pipeline()
+    with patch.object(downloader, '_get_plugin', return_value=mock_plugin), \
+         patch.object(downloader, '_localize_images', side_effect=slow_localize), \
+         patch.object(downloader, '_save_assets', return_value="html"), \
+         patch.object(downloader.record_manager, 'save_record') as mock_save:
+        os.makedirs(os.path.join(downloader.output_root, "Author_Test"))
+        res = downloader.process_url(MagicMock(), url, scroll_count=0, timeout=30)
+        assert res is None
+        assert not mock_save.called
+
+        gate.set()
+        assert downloader.drain_pipeline() == []
+        assert mock_save.call_args[0][0]['status'] == 'success'
+    downloader.close()
+
+@patch('src.main.IndexGenerator')
+@patch('src.main.sync_playwright')
+def test_duplicate_and_downloaded_urls_skip_the_browser(mock_playwright, mock_indexer, downloader, tmp_path):
+    """Test that URL variants are deduped by canonical key before any browser starts."""
+    from src.main import _process_urls_in_session
+    import argparse
+
+    downloader.record_manager.save_record({'url': 'https://twitter.com/a/status/1', 'status': 'success'})
+    args = argparse.Namespace(
+        cookies=str(tmp_path / "missing_cookies.txt"), output=downloader.output_root,
+        headless=True, scroll=0, timeout=30, force=False, contexts=1
+    )
+    urls = ["https://x.com/a/status/1?s=20", "https://x.com/a/status/1/photo/1"]
+    with patch.object(downloader, 'process_url') as mock_process:
+        _process_urls_in_session(downloader, args, urls)
+
+    mock_process.assert_not_called()
+    mock_playwright.assert_not_called()
@@ -0,0 +1,51 @@
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from src.main import XDownloader
+from src.sharding import run_sharded_batch
+from src.models import ArticleMetadata, DownloadResult
+
+def test_sharded_batch_merges_outcomes(tmp_path):
+    """Test that shard records and failures are merged into the main store."""
+    output_root = tmp_path / "output"
+    output_root.mkdir()
+    coordinator = XDownloader(str(output_root))
+    coordinator.record_manager.save_record({'url': 'https://x.com/a/status/0', 'status': 'success'})
+
+    urls = [f"https://x.com/a/status/{i}" for i in range(8)]
+    args = argparse.Namespace(
+        output=str(output_root), markdown=False, pdf=False, epub=False, force=False,
+        shards=3, contexts=1
+    )
+
+    def fake_run_queue(downloader, args, url_queue, num_contexts):
+        # The coordinator filtered the batch; shards never re-check their empty store
+        assert args.force
+        failures = []
+        while not url_queue.empty():
+            url = url_queue.get_nowait()
+            status = 'failed' if url.endswith("/7") else 'success'
+            downloader.record_manager.save_record(ArticleMetadata(url=url, status=status).to_dict())
+            if status == 'failed':
+                failures.append(DownloadResult(url=url, success=False, error_msg="boom").__dict__)
+        return failures
+
+    # Threads stand in for processes so the patched worker loop is visible to the shards
+    with patch('src.sharding.ProcessPoolExecutor', ThreadPoolExecutor), \
+         patch('src.sharding._run_url_queue', side_effect=fake_run_queue), \
+         patch.object(coordinator.record_manager, '_commit') as full_rewrite:
+        failures = run_sharded_batch(coordinator, args, urls)
+
+    # The default sqlite store upserts the merged rows instead of rewriting the table
+    full_rewrite.assert_not_called()
+
+    assert [f['url'] for f in failures] == [urls[7]]
+    stats = coordinator.record_manager.get_stats()
+    assert stats == {"total": 8, "success": 7, "failed": 1}
+    # Shard files are folded away after the merge
+    assert os.listdir(output_root / ".shards") == []
+    coordinator.close()
+    reopened = XDownloader(str(output_root)).record_manager
+    assert reopened.get_stats() == {"total": 8, "success": 7, "failed": 1}
+    reopened.close()
@@ -0,0 +1,61 @@
+import os
+from bs4 import BeautifulSoup
+from unittest.mock import MagicMock, patch
+from src.asset_store import AssetStore
+from src.main import XDownloader
+
+def _write(path, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+def test_adopt_links_articles_to_one_blob(tmp_path):
+    """Test that identical bytes are stored once and every article file links to the blob."""
+    store = AssetStore(str(tmp_path / ".assets"))
+    a = _write(str(tmp_path / "A" / "assets" / "1.jpg"), b"same-bytes")
+    b = _write(str(tmp_path / "B" / "assets" / "2.jpg"), b"same-bytes")
+
+    blob = store.adopt("https://pbs.twimg.com/media/1.jpg", a)
+    assert store.adopt("https://pbs.twimg.com/media/2.jpg", b) == blob
+    assert os.path.samefile(a, blob) and os.path.samefile(b, blob)
+
+    # The URL index survives a restart
+    reopened = AssetStore(str(tmp_path / ".assets"))
+    dest = str(tmp_path / "C" / "assets" / "x.jpg")
+    os.makedirs(os.path.dirname(dest))
+    assert reopened.link_url("https://pbs.twimg.com/media/2.jpg", dest)
+    assert open(dest, 'rb').read() == b"same-bytes"
+    assert not reopened.link_url("https://pbs.twimg.com/media/unknown.jpg", dest + "2")
+
+def test_prune_removes_unreferenced_blobs(tmp_path):
+    store = AssetStore(str(tmp_path / ".assets"))
+    kept = _write(str(tmp_path / "A" / "assets" / "1.jpg"), b"kept")
+    gone = _write(str(tmp_path / "B" / "assets" / "2.jpg"), b"gone")
+    store.adopt("u1", kept)
+    store.adopt("u2", gone)
+    os.remove(gone)
+
+    assert store.prune() == (1, 4)
+    assert store.lookup("u1") and store.lookup("u2") is None
+    assert AssetStore(str(tmp_path / ".assets")).lookup("u2") is None
+
+def test_stored_url_needs_no_request(tmp_path):
+    """Test that an image already in the store is linked into a new article without HTTP."""
+    downloader = XDownloader(str(tmp_path))
+    src = "https://pbs.twimg.com/media/abc.jpg"
+    seeded = _write(str(tmp_path / "First" / "assets" / "seed.jpg"), b"image")
+    downloader.asset_store.adopt(src, seeded)
+
+    extractor = MagicMock()
+    extractor.get_clean_soup.return_value = BeautifulSoup(f'<div><img src="{src}"></div>', "html.parser")
+    extractor.get_content_images.side_effect = lambda soup: [(img, img['src']) for img in soup.find_all("img")]
+    article_dir = str(tmp_path / "Second")
+    with patch.object(downloader, '_download_task') as mock_download:
+        soup = downloader._localize_images(extractor, article_dir, cookies=[])
+
+    mock_download.assert_not_called()
+    img = soup.find("img")
+    assert img['src'].startswith("assets/")
+    assert os.path.samefile(os.path.join(article_dir, img['src']), seeded)
+    downloader.close()
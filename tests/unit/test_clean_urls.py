@@ -38,3 +38,11 @@ def test_deduplicate_nonexistent_file(capsys):
     deduplicate_urls("non_existent_file.txt")
     captured = capsys.readouterr()
     assert "Error: File 'non_existent_file.txt' not found" in captured.out
+
+def test_deduplicate_urls_by_canonical_key(tmp_path):
+    """Test that host, query and sub-page variants of one tweet are duplicates."""
+    file_path = tmp_path / "urls.txt"
+    file_path.write_text("https://x.com/a/status/1\ntwitter.com/a/status/1\n"
+                         "https://x.com/a/status/1/photo/1?s=20\nhttps://x.com/a/status/2\n", encoding='utf-8')
+    deduplicate_urls(str(file_path))
+    assert file_path.read_text(encoding='utf-8').split() == ["https://x.com/a/status/1", "https://x.com/a/status/2"]
@@ -40,6 +40,7 @@ def test_to_epub_structure(tmp_path, mocker):
     assets_dir.mkdir()
     # Create a dummy image
     (assets_dir / "test.jpg").write_bytes(b"fake_image_data")
+    (assets_dir / "chart.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 16)
     
     html_content = """
     <html>
@@ -47,6 +48,7 @@ def test_to_epub_structure(tmp_path, mocker):
             <h1>Title</h1>
             <p>Text</p>
             <img src="assets/test.jpg" />
+            <img src="assets/chart.png" />
         </body>
     </html>
     """
@@ -78,3 +80,5 @@ def test_to_epub_structure(tmp_path, mocker):
     image_items = [item for item in book.items if item.media_type == 'image/jpeg']
     assert len(image_items) == 1
     assert image_items[0].uid == "test.jpg"
+    # Media types follow the real image type, not a hardcoded JPEG
+    assert [item.uid for item in book.items if item.media_type == 'image/png'] == ["chart.png"]
@@ -1,8 +1,8 @@
 import os
 import json
 import argparse
-from src.helper import cmd_sync
-from src.record_manager import RecordManager
+from src.helper import cmd_sync, cmd_query
+from src.record_manager import open_record_manager
 
 def test_cmd_sync_rebuilds_csv(tmp_path):
     """Test that 'sync' command scans directories and populates CSV."""
@@ -31,7 +31,7 @@ def test_cmd_sync_rebuilds_csv(tmp_path):
     cmd_sync(args)
     
     # 3. Verify CSV Content
-    rm = RecordManager(str(csv_path))
+    rm = open_record_manager(str(csv_path))
     assert rm.is_downloaded("http://test.com/sync")
     
     # Verify Metadata (need to peek into internal records or load them)
@@ -41,3 +41,21 @@ def test_cmd_sync_rebuilds_csv(tmp_path):
     assert record['author'] == "SyncedUser"
     assert record['status'] == "success"
     assert record['source'] == "sync_scan"
+
+def test_cmd_query_prints_page(tmp_path, capsys):
+    """Test that 'query' filters through the store and reports the page."""
+    csv_path = str(tmp_path / "records.csv")
+    rm = open_record_manager(csv_path)
+    for i in range(3):
+        rm.save_record({'url': f'https://x.com/u/status/{i}', 'status': 'success', 'author': 'u',
+                        'title': f'T{i}', 'date': f'2025-01-0{i + 1}'})
+    rm.save_record({'url': 'https://x.com/v/status/9', 'status': 'success', 'author': 'v', 'title': 'Other'})
+    rm.close()
+
+    args = argparse.Namespace(csv=csv_path, status=None, author='u', source=None, tweet_id=None, url=None,
+                              since='2025-01-02', until=None, count_by=None, order_by='published_date',
+                              asc=False, limit=1, page=1, json=False)
+    cmd_query(args)
+    out = capsys.readouterr().out
+    assert 'https://x.com/u/status/2' in out
+    assert 'Page 1/2 (1 of 2 matches)' in out
@@ -0,0 +1,62 @@
+import os
+import pytest
+from bs4 import BeautifulSoup
+from unittest.mock import MagicMock, patch
+from src.media import sniff_image_type, media_type_for, fix_extension, recompress
+from src.main import XDownloader
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+WEBP = b"RIFF\x00\x00\x00\x00WEBPVP8 " + b"\x00" * 32
+
+def test_sniff_image_type():
+    assert sniff_image_type(b"\xff\xd8\xff\xe0rest") == "image/jpeg"
+    assert sniff_image_type(PNG) == "image/png"
+    assert sniff_image_type(b"GIF89a...") == "image/gif"
+    assert sniff_image_type(WEBP) == "image/webp"
+    assert sniff_image_type(b"\x00\x00\x00\x1cftypavif") == "image/avif"
+    assert sniff_image_type(b'<?xml version="1.0"?><svg xmlns="...">') == "image/svg+xml"
+    assert sniff_image_type(b"<html>") is None
+    assert media_type_for("a.webp") == "image/webp" and media_type_for("a.unknown") == "image/jpeg"
+
+def test_fix_extension_renames_to_real_type(tmp_path):
+    path = tmp_path / "abc.jpg"
+    path.write_bytes(PNG)
+    assert fix_extension(str(path)) == str(tmp_path / "abc.png")
+    assert not path.exists()
+    # Unknown bytes keep their name
+    other = tmp_path / "def.jpg"
+    other.write_bytes(b"opaque")
+    assert fix_extension(str(other)) == str(other)
+
+def test_localized_images_get_their_real_extension(tmp_path):
+    """Test that a PNG is saved as .png and found again on the next run without a request."""
+    downloader = XDownloader(str(tmp_path))
+    src = "https://pbs.twimg.com/media/abc?format=png"
+    extractor = MagicMock()
+    extractor.get_clean_soup.side_effect = lambda: BeautifulSoup(f'<div><img src="{src}"></div>', "html.parser")
+    extractor.get_content_images.side_effect = lambda soup: [(img, img['src']) for img in soup.find_all("img")]
+    article_dir = str(tmp_path / "Article")
+
+    soup = downloader._localize_images(extractor, article_dir, cookies=[], captured_body=lambda url: PNG)
+    first = soup.find("img")['src']
+    assert first.endswith(".png")
+    with open(os.path.join(article_dir, first), "rb") as f:
+        assert f.read() == PNG
+
+    with patch.object(downloader, '_download_task') as mock_download:
+        soup = downloader._localize_images(extractor, article_dir, cookies=[])
+    mock_download.assert_not_called()
+    assert soup.find("img")['src'] == first
+    downloader.close()
+
+def test_recompress_keeps_smaller_result(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    path = str(tmp_path / "big.png")
+    Image.frombytes("RGB", (400, 200), os.urandom(400 * 200 * 3)).save(path)
+
+    result = recompress(path, convert_to="jpeg", quality=70, max_dimension=100)
+    assert result == str(tmp_path / "big.jpg") and not os.path.exists(path)
+    with Image.open(result) as image:
+        assert image.format == "JPEG" and max(image.size) == 100
+    # Already small and in the target format: left alone
+    assert recompress(result, convert_to="jpeg", max_dimension=100) is None
@@ -0,0 +1,65 @@
+import json
+import logging
+import pytest
+from src.metrics import Metrics, Span, metrics
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def test_span_records_duration_bytes_and_log_line():
+    """Test that a span feeds the counters and writes a structured JSONL record."""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    span_logger = logging.getLogger("x_downloader.spans")
+    span_logger.addHandler(handler)
+    try:
+        with metrics.span("images", "https://x.com/a/status/1") as span:
+            metrics.add_span_bytes(100)
+            metrics.add_span_bytes(28)
+    finally:
+        span_logger.removeHandler(handler)
+
+    assert span.bytes == 128
+    assert metrics.get("span.images.count") == 1
+    assert records[0].stage == "images"
+    assert records[0].url == "https://x.com/a/status/1"
+    assert records[0].bytes == 128
+
+    from src.logger import JsonFormatter
+    line = json.loads(JsonFormatter().format(records[0]))
+    assert line["stage"] == "images" and line["bytes"] == 128 and "duration_ms" in line
+
+def test_add_span_bytes_outside_span_is_noop():
+    metrics.add_span_bytes(10)
+    assert metrics.snapshot("span.") == {}
+
+def test_percentiles_and_slowest_urls():
+    """Test nearest-rank percentiles per stage and the slowest-URL ranking."""
+    m = Metrics()
+    for i in range(100):
+        span = Span("parse", f"u{i}")
+        span.duration = (i + 1) / 100
+        m.record_span(span)
+
+    pct = m.percentiles("parse")
+    assert pct[50] == pytest.approx(0.51)
+    assert pct[95] == pytest.approx(0.96)
+    assert pct[99] == pytest.approx(1.0)
+    assert [url for url, _ in m.slowest_urls(2)] == ["u99", "u98"]
+    assert any(line.startswith("Stage parse: n=100") for line in m.summary_lines())
+
+def test_merge_spans_from_shard():
+    """Test that span samples from another process join the percentile pool."""
+    shard = Metrics()
+    with shard.span("navigate", "u1"):
+        pass
+    metrics.merge(shard.snapshot())
+    metrics.merge_spans(shard.span_state())
+
+    assert metrics.get("span.navigate.count") == 1
+    assert metrics.percentiles("navigate")
+    assert metrics.slowest_urls()[0][0] == "u1"
@@ -0,0 +1,153 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from src.network import RouteFilter, AssetCapture, track_response_bytes
+from src.metrics import metrics
+from src.utils import host_resolver
+from src.plugins.x_com import XComPlugin
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    host_resolver.clear()
+    yield
+    metrics.reset()
+    host_resolver.clear()
+
+def _route(resource_type, url):
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    return route
+
+def test_route_filter_blocks_by_type_and_pattern():
+    """Test that resource types and glob URL patterns are both honoured."""
+    rf = RouteFilter(["media", "font"], ["*/jot/*", "*://*.doubleclick.net/*"])
+    assert rf.should_block("media", "https://video.twimg.com/a.mp4")
+    assert rf.should_block("xhr", "https://x.com/i/api/1.1/jot/client_event.json")
+    assert rf.should_block("script", "https://ad.doubleclick.net/x.js")
+    assert not rf.should_block("document", "https://x.com/user/status/1")
+    assert not rf.should_block("image", "https://pbs.twimg.com/media/abc.jpg")
+
+def test_route_filter_handler_counts_blocked():
+    """Test that the handler aborts blocked requests and reports them."""
+    rf = RouteFilter(["font"], [])
+    blocked = _route("font", "https://abs.twimg.com/font.woff2")
+    allowed = _route("script", "https://abs.twimg.com/main.js")
+
+    rf.handle(blocked)
+    rf.handle(allowed)
+
+    blocked.abort.assert_called_once()
+    allowed.continue_.assert_called_once()
+    assert metrics.get("network.blocked.font") == 1
+    assert "Blocked requests: 1 (font=1)" in metrics.summary_lines()
+
+def test_empty_rules_disable_filter():
+    assert RouteFilter.from_rules({}).enabled is False
+
+def test_x_plugin_exposes_configured_rules():
+    """Test that the X plugin surfaces its rules from config.yaml."""
+    rf = RouteFilter.from_rules(XComPlugin().get_route_filter_rules())
+    assert rf.enabled
+    assert rf.should_block("media", "https://video.twimg.com/v.mp4")
+
+def test_track_response_bytes():
+    response = MagicMock()
+    response.headers = {"content-length": "2048"}
+    track_response_bytes(response)
+    assert metrics.get("network.bytes_loaded") == 2048
+    assert metrics.get("network.responses") == 1
+
+def _response(url, status=200, resource_type="image"):
+    response = MagicMock()
+    response.url = url
+    response.status = status
+    response.request.resource_type = resource_type
+    return response
+
+def test_asset_capture_keeps_only_ok_images_from_allowed_hosts():
+    capture = AssetCapture(["pbs.twimg.com"])
+    capture.on_response(_response("https://pbs.twimg.com/media/a.jpg"))
+    capture.on_response(_response("https://pbs.twimg.com/media/b.jpg", status=304))
+    capture.on_response(_response("https://abs.twimg.com/x.png"))
+    capture.on_response(_response("https://pbs.twimg.com/c.js", resource_type="script"))
+
+    assert capture.lookup("https://pbs.twimg.com/media/a.jpg") is not None
+    assert capture.lookup("https://pbs.twimg.com/media/b.jpg") is None
+    assert capture.lookup("https://abs.twimg.com/x.png") is None
+    assert capture.lookup("https://pbs.twimg.com/c.js") is None
+
+    capture.reset()
+    assert capture.lookup("https://pbs.twimg.com/media/a.jpg") is None
+
+def test_asset_capture_snapshot_reads_only_requested_bodies():
+    """Test that only the article's images are read from the browser, never every captured response."""
+    capture = AssetCapture(["pbs.twimg.com"])
+    wanted = _response("https://pbs.twimg.com/media/a.jpg")
+    avatar = _response("https://pbs.twimg.com/profile_images/1/me.jpg")
+    wanted.body.return_value = b"article-image"
+    capture.on_response(wanted)
+    capture.on_response(avatar)
+
+    bodies = capture.snapshot_bodies(["https://pbs.twimg.com/media/a.jpg", "https://pbs.twimg.com/media/missing.jpg"])
+
+    assert bodies == {"https://pbs.twimg.com/media/a.jpg": b"article-image"}
+    avatar.body.assert_not_called()
+
+def test_asset_client_reuses_connections_and_scopes_cookies():
+    """Test that one pool serves several articles and cookies never carry over between them."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from src.network import AssetClient
+
+    seen_cookies = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            seen_cookies.append(self.headers.get("Cookie"))
+            self.send_response(200)
+            self.send_header("Set-Cookie", "tracker=1; Path=/")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/media/a.jpg"
+    client = AssetClient()
+    # The test server is on loopback, which the pinned connections refuse by default
+    with patch("src.utils._is_public", return_value=True):
+        first = client.cookie_jar([{'name': 'auth', 'value': 'one', 'domain': '127.0.0.1'}])
+        for _ in range(3):
+            assert client.get(url, cookies=first, timeout=5).content == b"ok"
+        assert client.get(url, timeout=5).content == b"ok"
+        client.close()
+    server.shutdown()
+    server.server_close()
+
+    assert seen_cookies == ["auth=one"] * 3 + [None]
+    assert metrics.get("assets.http_requests") == 4
+    assert metrics.get("assets.http_connections") == 1
+    assert any("75% reused" in line for line in metrics.summary_lines())
+
+def test_asset_client_pins_connections_to_checked_addresses():
+    """Test that a host resolving to a private address is refused at connect time, not just by is_safe_url."""
+    import requests
+    from src.network import AssetClient
+
+    client = AssetClient()
+    client.session.adapters["http://"].max_retries.total = 0
+    with patch("src.utils.socket.getaddrinfo", return_value=[(2, 1, 6, "", ("10.0.0.5", 80))]) as lookup:
+        with pytest.raises(requests.ConnectionError, match="unsafe or unresolvable"):
+            client.get("http://rebind.example/a.jpg", timeout=1)
+        with pytest.raises(requests.ConnectionError):
+            client.get("http://rebind.example/b.jpg", timeout=1)
+    client.close()
+    # The second refusal came from the negative cache
+    assert lookup.call_count == 1
+    assert metrics.get("dns.cache_hits") == 1
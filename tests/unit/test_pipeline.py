@@ -0,0 +1,31 @@
+import threading
+from src.pipeline import PostProcessPipeline
+
+def test_pipeline_collects_failures_on_drain():
+    """Test that job failures are returned by drain() once all jobs finished."""
+    pipeline = PostProcessPipeline(workers=2, depth=4)
+    done = []
+    for i in range(5):
+        pipeline.submit(lambda i=i: done.append(i) or ({'url': f"u{i}"} if i == 3 else None))
+    failures = pipeline.drain()
+    pipeline.shutdown()
+
+    assert sorted(done) == [0, 1, 2, 3, 4]
+    assert failures == [{'url': 'u3'}]
+
+def test_pipeline_applies_backpressure():
+    """Test that submit() blocks once `depth` jobs are in flight."""
+    pipeline = PostProcessPipeline(workers=1, depth=1)
+    release = threading.Event()
+    pipeline.submit(lambda: release.wait() and None)
+
+    submitted = threading.Event()
+    producer = threading.Thread(target=lambda: (pipeline.submit(lambda: None), submitted.set()))
+    producer.start()
+    assert not submitted.wait(0.2)
+
+    release.set()
+    assert submitted.wait(2)
+    producer.join()
+    assert pipeline.drain() == []
+    pipeline.shutdown()
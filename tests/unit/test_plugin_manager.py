@@ -22,3 +22,20 @@ def test_plugin_manager_get_plugin_failure():
     with pytest.raises(ValueError) as exc:
         pm.get_plugin(unsupported_url)
     assert "No plugin found" in str(exc.value)
+
+def test_canonical_key_merges_url_variants():
+    """Test that host, query and sub-page variants of one tweet share a key."""
+    pm = PluginManager()
+    variants = ["twitter.com/a/status/1", "https://x.com/a/status/1?s=20",
+                '"https://mobile.twitter.com/a/status/1/photo/1"']
+    assert {pm.canonical_key(u) for u in variants} == {"x_com:1"}
+    assert pm.canonical_key("https://x.com/A/") == pm.canonical_key("https://twitter.com/a")
+    assert pm.canonical_key("https://example.com/post") == "https://example.com/post"
+
+def test_extraction_script_targets_the_status():
+    """Test that the in-browser extraction script gets the configured article selectors and the URL's status ID."""
+    plugin = XComPlugin()
+    js, arg = plugin.get_extraction_script("https://x.com/someone/status/123?s=20")
+    assert "outerHTML" in js
+    assert arg["tweetId"] == "123" and arg["selectors"][0] == "article"
+    assert plugin.get_extraction_script("https://x.com/someone")[1]["tweetId"] == ""
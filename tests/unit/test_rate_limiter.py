@@ -0,0 +1,54 @@
+import pytest
+from src.rate_limiter import TokenBucket, RateLimiter
+from src.metrics import metrics
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+def test_token_bucket_burst_then_paced():
+    """Test that the burst is free and later requests are spaced by 1/rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    clock.now = 10
+    assert bucket.reserve() == 0
+
+def test_token_bucket_aimd_bounds():
+    bucket = TokenBucket(rate=1.0, min_rate=0.3, max_rate=1.1, increase=0.05, decrease=0.5)
+    bucket.on_throttle()
+    assert bucket.rate == pytest.approx(0.5)
+    bucket.on_throttle()
+    assert bucket.rate == pytest.approx(0.3)
+    for _ in range(50):
+        bucket.on_success()
+    assert bucket.rate == pytest.approx(1.1)
+
+def test_rate_limiter_matches_subdomains_and_reacts_to_429():
+    """Test host resolution, 429 backoff and the wait metrics."""
+    clock = FakeClock()
+    limiter = RateLimiter({"x.com": {"rate": 1.0, "burst": 1}}, clock=clock)
+
+    assert limiter.reserve("https://www.x.com/a/status/1") == 0
+    assert limiter.reserve("https://x.com/a/status/2") == pytest.approx(1.0)
+    assert limiter.reserve("https://example.com/") == 0
+
+    limiter.on_response("https://x.com/a/status/1", 429)
+    assert limiter.rates()["x.com"] == pytest.approx(0.5)
+    limiter.on_blocked("https://mobile.x.com/a")
+    assert limiter.rates()["x.com"] == pytest.approx(0.25)
+
+    assert metrics.get("ratelimit.wait_seconds.x.com") == pytest.approx(1.0)
+    assert metrics.get("ratelimit.throttled.x.com") == 2
+    assert any(line.startswith("Rate limiting (x.com)") for line in metrics.summary_lines())
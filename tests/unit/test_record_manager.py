@@ -2,7 +2,7 @@ import os
 import csv
 import pytest
 from unittest.mock import MagicMock, mock_open
-from src.record_manager import RecordManager
+from src.record_manager import RecordManager, Record, SQLiteRecordManager, SQLiteRecordQuery, open_record_manager
 
 @pytest.fixture
 def temp_csv(tmp_path):
@@ -15,7 +15,7 @@ def test_init_creates_csv(temp_csv):
     assert os.path.exists(temp_csv)
     with open(temp_csv, 'r') as f:
         header = f.readline().strip()
-        expected = "url,status,title,author,published_date,folder_name,local_path,timestamp,failure_reason,source"
+        expected = "url,status,title,author,published_date,folder_name,local_path,timestamp,failure_reason,source,key"
         assert header == expected
 
 def test_save_and_read_memory(temp_csv):
@@ -35,11 +35,15 @@ def test_save_and_read_memory(temp_csv):
     assert rm.is_downloaded('http://test.com/1')
     assert not rm.is_downloaded('http://test.com/2')
     
-    # Check File Persistence
+    # Check File Persistence: journaled now, compacted into the CSV on close
+    with open(temp_csv + ".journal", 'r') as f:
+        assert 'http://test.com/1' in f.read()
+    rm.close()
     with open(temp_csv, 'r') as f:
         content = f.read()
         assert 'http://test.com/1' in content
         assert 'Tester_Test_2024' in content
+    assert not os.path.exists(temp_csv + ".journal")
 
 def test_do_not_overwrite_success_with_failure(temp_csv):
     """Test that a 'success' record is not overwritten by a 'failed' one."""
@@ -78,3 +82,242 @@ def test_atomic_write_recovery(temp_csv, mocker):
     files = os.listdir(dir_path)
     backups = [f for f in files if "corrupted" in f]
     assert len(backups) > 0
+
+def test_journal_replay_after_crash(temp_csv):
+    """Test that journaled changes survive without a compaction (simulated crash)."""
+    rm = RecordManager(temp_csv, compact_every=1000)
+    rm.save_record({'url': 'http://test.com/a', 'status': 'success', 'title': 'A'})
+    rm.save_record({'url': 'http://test.com/b', 'status': 'failed'})
+    rm._journal.close()  # process dies here: no close(), CSV still holds only the header
+    with open(temp_csv + ".journal", 'a') as f:
+        f.write('{"url": "http://test.com/torn", "sta')
+
+    reloaded = RecordManager(temp_csv)
+    assert reloaded.is_downloaded('http://test.com/a')
+    assert reloaded._records['http://test.com/b']['status'] == 'failed'
+    assert 'http://test.com/torn' not in reloaded._records
+    # A change after the torn line is still readable on the next replay
+    reloaded.save_record({'url': 'http://test.com/c', 'status': 'success'})
+    reloaded._journal.close()
+    assert RecordManager(temp_csv).is_downloaded('http://test.com/c')
+    # Replay only fills memory; the owner's close() compacts into the CSV
+    reloaded._journal = None
+    reloaded.close()
+    assert not os.path.exists(temp_csv + ".journal")
+    assert 'http://test.com/a' in open(temp_csv).read()
+
+def test_journal_survives_schema_migration(temp_csv):
+    """Test that an old key-less CSV keeps its pending journal entries while being migrated."""
+    with open(temp_csv, 'w', newline='', encoding='utf-8') as f:
+        f.write("url,status,title\nhttps://x.com/a/status/1,failed,One\n")
+    with open(temp_csv + ".journal", 'w', encoding='utf-8') as f:
+        f.write('{"url": "https://x.com/a/status/1", "status": "success", "title": "One"}\n')
+        f.write('{"url": "https://x.com/a/status/2", "status": "success", "title": "Two"}\n')
+
+    rm = RecordManager(temp_csv)
+    assert {url: r.status for url, r in rm._records.items()} == {
+        'https://x.com/a/status/1': 'success', 'https://x.com/a/status/2': 'success'}
+    # Opening only replays into memory; the rewrite waits for close()
+    assert os.path.exists(temp_csv + ".journal")
+    assert open(temp_csv).read().startswith("url,status,title\n")
+    rm.close()
+
+    reopened = RecordManager(temp_csv)
+    assert reopened.get_stats() == {"total": 2, "success": 2, "failed": 0}
+    assert reopened._records['https://x.com/a/status/2'].key == 'x_com:2'
+    reopened.close()
+
+def test_second_process_leaves_the_live_journal_alone(temp_csv):
+    """Test that opening the store while another manager writes to it does not compact that writer's journal."""
+    writer = RecordManager(temp_csv)
+    writer.save_record({'url': 'http://test.com/1', 'status': 'success'})
+    snapshot = open(temp_csv).read()
+
+    reader = RecordManager(temp_csv)
+    assert reader.is_downloaded('http://test.com/1')
+    assert open(temp_csv).read() == snapshot
+    assert not os.path.exists(temp_csv + ".journal.compacting")
+
+    writer.save_record({'url': 'http://test.com/2', 'status': 'success'})
+    with open(temp_csv + ".journal") as f:
+        assert f.read().count('\n') == 2
+    writer.close()
+    assert set(RecordManager(temp_csv)._records) == {'http://test.com/1', 'http://test.com/2'}
+
+def test_background_compaction(temp_csv):
+    """Test that reaching compact_every rewrites the CSV off-thread and restarts the journal."""
+    rm = RecordManager(temp_csv, compact_every=3)
+    for i in range(4):
+        rm.save_record({'url': f'http://test.com/{i}', 'status': 'success'})
+    rm._wait_for_compaction()
+
+    content = open(temp_csv).read()
+    assert all(f'http://test.com/{i}' in content for i in range(3))
+    assert not os.path.exists(temp_csv + ".journal.compacting")
+    # The fourth change went to the fresh journal
+    with open(temp_csv + ".journal") as f:
+        assert f.read().count('\n') == 1
+    rm.close()
+    assert set(RecordManager(temp_csv)._records) == {f'http://test.com/{i}' for i in range(4)}
+
+def test_sqlite_upsert_and_preservation(tmp_path):
+    """Test that the SQLite backend upserts rows and never downgrades a success."""
+    db_path = str(tmp_path / "records.db")
+    rm = SQLiteRecordManager(db_path)
+    url = 'http://test.com/stable'
+    rm.save_record({'url': url, 'status': 'success', 'title': 'Good'})
+    rm.save_record({'url': url, 'status': 'failed', 'failure_reason': 'Network Error'})
+    rm.save_record({'url': 'http://test.com/other', 'status': 'failed'})
+    rm.close()
+
+    reopened = SQLiteRecordManager(db_path)
+    assert reopened.is_downloaded(url)
+    assert reopened._records[url]['title'] == 'Good'
+    assert reopened.get_stats() == {"total": 2, "success": 1, "failed": 1}
+    assert reopened._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    reopened.close()
+
+def test_sqlite_migrates_csv_once_and_exports(temp_csv, tmp_path):
+    """Test the one-time CSV import and the optional CSV export on close."""
+    legacy = RecordManager(temp_csv)
+    legacy.save_record({'url': 'http://test.com/legacy', 'status': 'success', 'title': 'Old'})
+
+    db_path = str(tmp_path / "records.db")
+    rm = SQLiteRecordManager(db_path, csv_path=temp_csv, export_csv=True)
+    assert rm.is_downloaded('http://test.com/legacy')
+    rm.save_record({'url': 'http://test.com/new', 'status': 'success', 'title': 'New'})
+    rm.close()
+
+    # The exported CSV carries both rows; reopening must not re-import it
+    assert set(RecordManager(temp_csv)._records) == {'http://test.com/legacy', 'http://test.com/new'}
+    with open(temp_csv, 'w') as f:
+        f.write("url,status\nhttp://test.com/ghost,success\n")
+    reopened = SQLiteRecordManager(db_path, csv_path=temp_csv)
+    assert not reopened.is_downloaded('http://test.com/ghost')
+    reopened.close()
+
+def test_sqlite_warns_once_when_csv_stops_updating(temp_csv, tmp_path, caplog):
+    """Test that importing records.csv without export_csv warns that the CSV is frozen, and only once."""
+    RecordManager(temp_csv).save_record({'url': 'http://test.com/legacy', 'status': 'success'})
+    db_path = str(tmp_path / "records.db")
+
+    SQLiteRecordManager(db_path, csv_path=temp_csv, export_csv=False).close()
+    assert any("will no longer be updated" in r.getMessage() for r in caplog.records if r.levelname == "WARNING")
+
+    caplog.clear()
+    SQLiteRecordManager(db_path, csv_path=temp_csv, export_csv=False).close()
+    assert not [r for r in caplog.records if r.levelname == "WARNING"]
+
+def test_open_record_manager_backends(temp_csv):
+    assert isinstance(open_record_manager(temp_csv, backend="sqlite"), SQLiteRecordManager)
+    assert type(open_record_manager(temp_csv, backend="csv")) is RecordManager
+
+def _seed(rm):
+    rm.save_record({'url': 'https://x.com/a/status/1', 'status': 'success', 'author': 'alice', 'date': '2024-12-30'})
+    rm.save_record({'url': 'https://x.com/a/status/2', 'status': 'success', 'author': 'alice', 'date': '2025-01-05'})
+    rm.save_record({'url': 'https://x.com/b/status/3', 'status': 'failed', 'author': 'bob', 'date': '2025-02-01'})
+    rm.save_record({'url': 'https://x.com/b/status/4', 'status': 'success', 'author': 'bob', 'source': 'sync_scan'})
+
+def test_query_filters_and_pagination(temp_csv):
+    """Test indexed filters, date ranges, ordering and paging."""
+    rm = RecordManager(temp_csv)
+    _seed(rm)
+
+    assert {r['url'] for r in rm.query(author='alice', since='2025-01-01')} == {'https://x.com/a/status/2'}
+    assert rm.count(status='success') == 3
+    assert rm.query(tweet_id='3')[0]['author'] == 'bob'
+    # 'NoDate' records never match a date range
+    assert rm.count(since='2000-01-01') == 3
+
+    page = rm.query(order_by='published_date', status='success', limit=2, offset=1)
+    assert [r['published_date'] for r in page] == ['2025-01-05', 'NoDate']
+    assert rm.count_by('status') == {'success': 3, 'failed': 1}
+    assert rm.count_by('author', status='success') == {'alice': 2, 'bob': 1}
+
+    with pytest.raises(ValueError):
+        rm.query(title='x')
+
+def test_indexes_follow_updates_and_removals(temp_csv):
+    """Test that index entries move with status changes, removals and reloads."""
+    rm = RecordManager(temp_csv)
+    _seed(rm)
+    rm.save_record({'url': 'https://x.com/b/status/3', 'status': 'success', 'author': 'bob', 'date': '2025-02-01'})
+    assert rm.remove_record('https://x.com/a/status/1')
+    assert rm.count_by('status') == {'success': 3}
+    assert rm.count(author='alice') == 1
+    rm._journal.close()
+
+    # Tombstones and updates replay from the journal
+    reloaded = RecordManager(temp_csv)
+    assert rm.get_stats() == reloaded.get_stats() == {"total": 3, "success": 3, "failed": 0}
+    assert not reloaded.query(tweet_id='1')
+
+def test_sqlite_remove_record(tmp_path):
+    db_path = str(tmp_path / "records.db")
+    rm = SQLiteRecordManager(db_path)
+    _seed(rm)
+    rm.remove_record('https://x.com/b/status/3')
+    rm.close()
+    assert SQLiteRecordManager(db_path).count_by('author') == {'alice': 2, 'bob': 1}
+
+def test_compact_record_reads_like_a_dict():
+    """Test that Record rows stay mapping-compatible while sharing repeated values."""
+    row = {'url': 'u1', 'status': 'success', 'author': 'alice', 'folder_name': 'F',
+           'local_path': 'F/F.html', 'title': 'T'}
+    a = Record.from_mapping(row)
+    b = Record.from_mapping({**row, 'url': 'u2', 'author': ''.join(['ali', 'ce'])})
+
+    assert a['title'] == 'T' and a.get('missing', 'x') == 'x' and a['failure_reason'] == ''
+    assert a['local_path'] == 'F/F.html' and a.local_path is None  # derived, not stored
+    assert a.author is b.author  # interned
+    assert dict(a) == a.to_dict() == a.copy()
+    assert len(a) == 11 and "key" in a
+    with pytest.raises(AttributeError):
+        a.status = 'failed'
+    with pytest.raises(KeyError):
+        a['nope']
+
+def test_get_all_records_is_lazy_snapshot(temp_csv):
+    rm = RecordManager(temp_csv)
+    rm.save_record({'url': 'http://test.com/1', 'status': 'success'})
+    records = rm.get_all_records()
+    rm.save_record({'url': 'http://test.com/2', 'status': 'success'})
+    assert not isinstance(records, list)
+    assert [r['url'] for r in records] == ['http://test.com/1']
+
+def test_canonical_key_dedupes_downloads(temp_csv):
+    """Test that any URL variant of a downloaded tweet counts as downloaded, and old rows get keys."""
+    with open(temp_csv, 'w') as f:
+        f.write("url,status\nhttps://twitter.com/a/status/7,success\n")
+    rm = RecordManager(temp_csv)
+    assert rm.query(key='x_com:7')[0]['url'] == 'https://twitter.com/a/status/7'
+    assert rm.is_downloaded('https://x.com/a/status/7?s=20')
+    assert rm.is_downloaded('https://x.com/a/status/7/photo/1')
+    assert not rm.is_downloaded('https://x.com/a/status/8')
+    assert rm.count(tweet_id='7') == 1
+    rm.close()
+    with open(temp_csv) as f:
+        assert f.readline().strip().endswith(',key') and 'x_com:7' in f.read()
+
+def test_sqlite_query_view_matches_the_loaded_store(temp_csv, tmp_path):
+    """Test that SQL queries on records.db (indexed, no full load) answer like the in-memory store."""
+    assert SQLiteRecordQuery.open(temp_csv) is None
+    rm = open_record_manager(temp_csv, backend="sqlite")
+    _seed(rm)
+    indexes = {row[1] for row in rm._conn.execute("PRAGMA index_list(records)")}
+    assert {"records_status", "records_author", "records_published_date", "records_key"} <= indexes
+
+    view = SQLiteRecordQuery.open(temp_csv)
+    cases = [dict(author='alice', since='2025-01-01'), dict(status='success'), dict(tweet_id='3'),
+             dict(since='2000-01-01'), dict(key='x_com:4'), dict(source='')]
+    for filters in cases:
+        assert {r['url'] for r in view.query(**filters)} == {r['url'] for r in rm.query(**filters)}, filters
+        assert view.count(**filters) == rm.count(**filters), filters
+    assert [r['url'] for r in view.query(order_by='published_date', descending=True, limit=2, offset=1)] == \
+           [r['url'] for r in rm.query(order_by='published_date', descending=True, limit=2, offset=1)]
+    for field in ('status', 'author', 'published_date', 'tweet_id'):
+        assert view.count_by(field) == rm.count_by(field), field
+    assert view.count_by('author', status='success') == rm.count_by('author', status='success')
+    assert isinstance(view.query(tweet_id='3')[0], Record)
+    view.close()
+    rm.close()
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from src.scroller import AdaptiveScrollPolicy, ArticleHarvest, scroll_page, PROBE_JS, SCROLL_JS
+from src.config import Config
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_policy_stops_when_page_is_stable():
+    """Test that unchanged height and article count end the loop."""
+    policy = AdaptiveScrollPolicy(max_steps=10, time_budget=60, stable_rounds=2, clock=FakeClock())
+    policy.start([1000, 1, False])
+    policy.end_step(policy.observe([2000, 2, False]), False)
+    assert policy.stop_reason() is None
+    policy.end_step(policy.observe([2000, 2, False]), False)
+    policy.end_step(policy.observe([2000, 2, False]), False)
+    assert policy.stop_reason() == "stable"
+    assert policy.steps == 3
+
+def test_policy_waits_while_loading_and_respects_budget():
+    """Test that a visible spinner defers the stop and the budget caps the URL."""
+    clock = FakeClock()
+    policy = AdaptiveScrollPolicy(max_steps=10, time_budget=5, stable_rounds=1, clock=clock)
+    policy.start([1000, 1, True])
+    policy.end_step(policy.observe([1000, 1, True]), True)
+    assert policy.stop_reason() is None
+    clock.now = 6
+    assert policy.stop_reason() == "budget"
+
+def test_policy_max_steps():
+    policy = AdaptiveScrollPolicy(max_steps=2, time_budget=60, clock=FakeClock())
+    policy.start([0, 0, False])
+    for height in (1, 2):
+        policy.end_step(policy.observe([height, 0, False]), False)
+    assert policy.stop_reason() == "max_steps"
+
+@patch.object(Config, 'SCROLL_SETTLE_TIMEOUT', 0)
+@patch('src.scroller.time.sleep')
+def test_scroll_page_adaptive_stops_early(mock_sleep):
+    """Test that a short tweet stops after the stable rounds instead of all steps."""
+    page = MagicMock()
+    page.evaluate.side_effect = lambda js, *a: [1000, 1, False] if js == PROBE_JS else None
+
+    stats = scroll_page(page, scroll_count=20, wait_selector=["article"], mode="adaptive")
+
+    assert stats.mode == "adaptive"
+    assert stats.reason == "stable"
+    scrolls = [c for c in page.evaluate.call_args_list if c.args[0] == SCROLL_JS]
+    assert len(scrolls) == stats.steps < 20
+
+@patch('src.scroller.time.sleep')
+def test_scroll_page_fixed_mode(mock_sleep):
+    page = MagicMock()
+    stats = scroll_page(page, scroll_count=3, wait_selector="article", mode="fixed")
+    assert stats.steps == 3
+    assert page.evaluate.call_count == 3
+    assert mock_sleep.call_count == 3
+
+def test_article_harvest_dedupes_by_id_in_first_seen_order():
+    harvest = ArticleHarvest()
+    assert harvest.add([["1", "<article>1</article>"], ["2", "<article>2</article>"]]) == 2
+    # A re-rendered tweet keeps its place; only unseen IDs count as new
+    assert harvest.add([["2", "<article>2 again</article>"], ["3", "<article>3</article>"]]) == 1
+    assert harvest.add(None) == 0
+    assert len(harvest) == 3
+    assert harvest.articles() == ["<article>1</article>", "<article>2 again</article>", "<article>3</article>"]
+
+@patch('src.scroller.time.sleep')
+def test_scroll_page_calls_on_step_after_each_step(mock_sleep):
+    page = MagicMock()
+    on_step = MagicMock()
+    scroll_page(page, scroll_count=3, wait_selector="article", mode="fixed", on_step=on_step)
+    assert on_step.call_count == 3
+
+@patch.object(Config, 'SCROLL_SETTLE_TIMEOUT', 0)
+@patch('src.scroller.time.sleep')
+def test_scroll_page_adaptive_stops_when_thread_is_complete(mock_sleep):
+    """Test that the plugin's done check ends scrolling while the page is still growing."""
+    page = MagicMock()
+    heights = iter(range(1000, 100000, 1000))
+    checks = iter([False, False, True])
+    page.evaluate.side_effect = lambda js, *a: (
+        [next(heights), 1, False] if js == PROBE_JS else next(checks) if js == "done" else None)
+
+    stats = scroll_page(page, scroll_count=20, wait_selector="article", mode="adaptive", done_script=("done", {}))
+
+    assert stats.reason == "complete"
+    assert stats.steps == 2
@@ -1,5 +1,15 @@
 import pytest
-from src.utils import is_safe_url
+from unittest.mock import patch
+from src.utils import is_safe_url, host_resolver, HostResolver
+from src.metrics import metrics
+
+@pytest.fixture(autouse=True)
+def clean_resolver():
+    host_resolver.clear()
+    metrics.reset()
+    yield
+    host_resolver.clear()
+    metrics.reset()
 
 def test_is_safe_url_public():
     # 8.8.8.8 is a public DNS IP
@@ -21,3 +31,26 @@ def test_is_safe_url_invalid_scheme():
 
 def test_is_safe_url_no_hostname():
     assert is_safe_url("https://") is False
+
+def _addrinfo(*ips):
+    return [(2, 1, 6, "", (ip, 443)) for ip in ips]
+
+def test_host_resolver_caches_positive_and_negative_results():
+    resolver = HostResolver(ttl=60, negative_ttl=60)
+    with patch("src.utils.socket.getaddrinfo", side_effect=[_addrinfo("8.8.8.8", "8.8.4.4"),
+                                                            _addrinfo("8.8.8.8", "192.168.0.9")]) as lookup:
+        assert resolver.safe_addresses("cdn.example") == ["8.8.8.8", "8.8.4.4"]
+        assert resolver.safe_addresses("cdn.example") == ["8.8.8.8", "8.8.4.4"]
+        # One private address among the results blocks the host
+        assert resolver.safe_addresses("mixed.example") is None
+        assert resolver.safe_addresses("mixed.example") is None
+    assert lookup.call_count == 2
+    assert metrics.get("dns.cache_hits") == 2 and metrics.get("dns.cache_misses") == 2
+    assert any("50% from cache" in line for line in metrics.summary_lines())
+
+def test_host_resolver_entries_expire():
+    resolver = HostResolver(ttl=0, negative_ttl=0)
+    with patch("src.utils.socket.getaddrinfo", return_value=_addrinfo("8.8.8.8")) as lookup:
+        resolver.safe_addresses("cdn.example")
+        resolver.safe_addresses("cdn.example")
+    assert lookup.call_count == 2